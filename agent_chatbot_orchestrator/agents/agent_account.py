@@ -1,31 +1,17 @@
 import sys
 import os
-import boto3
 import logging
 from strands import Agent
-from strands.models import BedrockModel
 from strands_tools import use_aws
 
 project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 sys.path.append(project_root)
 import config
+from bedrock.registry import get_bedrock_model
+from agent_chatbot_orchestrator.lazy import lazy_component
 
 logging.basicConfig(level=logging.INFO)
 
-boto_session = boto3.Session(
-    aws_access_key_id=config.AWS_ACCESS_KEY_ID,
-    aws_secret_access_key=config.AWS_SECRET_ACCESS_KEY,
-    aws_session_token=config.AWS_SESSION_TOKEN,
-    region_name=config.AWS_REGION
-)
-
-bedrock_model = BedrockModel(
-    boto_session=boto_session,
-    model_id=config.CHATBOT_AGENT_MODEL,
-    temperature=config.BEDROCK_TEMPERATURE,
-    max_tokens=config.BEDROCK_MAX_TOKENS,
-)
-
 MAIN_SYSTEM_PROMPT = """Bạn là AWS Account Resource Agent chuyên về quản lý và truy xuất thông tin tài nguyên AWS.
 
 Khả năng chính:
@@ -50,12 +36,16 @@ Khi người dùng yêu cầu thông tin tài nguyên, sử dụng công cụ us
 
 Luôn cung cấp thông tin chính xác và hữu ích về tài nguyên AWS."""
 
-account_agent = Agent(
-    model=bedrock_model,
-    system_prompt=MAIN_SYSTEM_PROMPT,
-    tools=[use_aws],
-    callback_handler=None
-)
+def create_account_agent() -> Agent:
+    """Tạo Account Agent (model dùng chung từ registry)"""
+    return Agent(
+        model=get_bedrock_model(prompt_cache=True),
+        system_prompt=MAIN_SYSTEM_PROMPT,
+        tools=[use_aws],
+        callback_handler=None
+    )
+
+account_agent = lazy_component("account_agent", create_account_agent)
 
 def get_account_agent(user_input: str) -> str:
     """Get agent"""
@@ -2,32 +2,17 @@
 
 import sys
 import os
-import boto3
 import logging
 from strands import Agent
-from strands.models import BedrockModel
-from strands_tools import diagram
 
 project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 sys.path.append(project_root)
 import config
+from bedrock.registry import get_bedrock_model
+from agent_chatbot_orchestrator.lazy import lazy_component
 
 logging.basicConfig(level=logging.INFO)
 
-boto_session = boto3.Session(
-    aws_access_key_id=config.AWS_ACCESS_KEY_ID,
-    aws_secret_access_key=config.AWS_SECRET_ACCESS_KEY,
-    aws_session_token=config.AWS_SESSION_TOKEN,
-    region_name=config.AWS_REGION
-)
-
-bedrock_model = BedrockModel(
-    boto_session=boto_session,
-    model_id=config.CHATBOT_AGENT_MODEL,
-    temperature=config.BEDROCK_TEMPERATURE,
-    max_tokens=config.BEDROCK_MAX_TOKENS,
-)
-
 MAIN_SYSTEM_PROMPT = """Bạn là AWS Architect Agent chuyên về vẽ sơ đồ kiến trúc AWS.
 
 Khả năng chính:
@@ -50,6 +35,9 @@ Luôn trả lời bằng tiếng Việt và cung cấp thông tin chi tiết v
 
 def get_diagram_tools():
     """Get diagram tools for AWS architecture"""
+    # Import tại đây: strands_tools.diagram kéo theo nhiều thư viện vẽ nặng
+    from strands_tools import diagram
+    
     if hasattr(diagram, 'diagram'):
         return [diagram.diagram]
     elif hasattr(diagram, 'tool'):
@@ -63,16 +51,20 @@ def get_diagram_tools():
         return tools
 
 
-print("🔧 Initializing AWS diagram tools...")
-diagram_tools = get_diagram_tools()
-print(f"✅ Got {len(diagram_tools)} AWS diagram tools")
-
-aws_architect_agent = Agent(
-    model=bedrock_model,
-    system_prompt=MAIN_SYSTEM_PROMPT,
-    tools=diagram_tools,
-    callback_handler=None
-)
+def create_architect_agent() -> Agent:
+    """Tạo AWS Architect Agent với diagram tools"""
+    print("🔧 Initializing AWS diagram tools...")
+    diagram_tools = get_diagram_tools()
+    print(f"✅ Got {len(diagram_tools)} AWS diagram tools")
+    
+    return Agent(
+        model=get_bedrock_model(prompt_cache=True),
+        system_prompt=MAIN_SYSTEM_PROMPT,
+        tools=diagram_tools,
+        callback_handler=None
+    )
+
+aws_architect_agent = lazy_component("aws_architect_agent", create_architect_agent)
 
 # def get_architect_agent(user_input: str) -> str:
 #     """Invoke AWS Architect Agent"""
@@ -2,32 +2,18 @@
 
 import sys
 import os
-import boto3
 import logging
 from strands import Agent
-from strands.models import BedrockModel
 
 project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 sys.path.append(project_root)
 import config
-from agent_chatbot_orchestrator.tools.mcp_pricing import get_pricing_tools, stdio_mcp_client
+from bedrock.registry import get_bedrock_model
+from agent_chatbot_orchestrator.lazy import lazy_component
+from agent_chatbot_orchestrator.tools.mcp_pricing import get_pricing_tools
 
 logging.basicConfig(level=logging.INFO)
 
-boto_session = boto3.Session(
-    aws_access_key_id=config.AWS_ACCESS_KEY_ID,
-    aws_secret_access_key=config.AWS_SECRET_ACCESS_KEY,
-    aws_session_token=config.AWS_SESSION_TOKEN,
-    region_name=config.AWS_REGION
-)
-
-bedrock_model = BedrockModel(
-    boto_session=boto_session,
-    model_id=config.CHATBOT_AGENT_MODEL,
-    temperature=config.BEDROCK_TEMPERATURE,
-    max_tokens=config.BEDROCK_MAX_TOKENS,
-)
-
 MAIN_SYSTEM_PROMPT = """Bạn là trợ lý AWS chuyên biệt về chi phí và thanh toán có thể trả lời các câu hỏi về:
 
 - Chi phí dịch vụ AWS và tính toán giá cả
@@ -41,16 +27,20 @@ Hãy sử dụng các công cụ pricing và billing để tìm kiếm thông ti
 
 Trả lời bằng tiếng Việt và cung cấp thông tin chi tiết, chính xác về chi phí."""
 
-print("💰 Initializing AWS Pricing tools...")
-pricing_tools = get_pricing_tools()
-print(f"✅ Got {len(pricing_tools)} AWS pricing tools")
+def create_pricing_agent() -> Agent:
+    """Tạo AWS Pricing Agent với MCP pricing tools"""
+    print("💰 Initializing AWS Pricing tools...")
+    pricing_tools = get_pricing_tools()
+    print(f"✅ Got {len(pricing_tools)} AWS pricing tools")
+    
+    return Agent(
+        model=get_bedrock_model(prompt_cache=True),
+        system_prompt=MAIN_SYSTEM_PROMPT,
+        tools=pricing_tools,
+        callback_handler=None
+    )
 
-aws_pricing_agent = Agent(
-    model=bedrock_model,
-    system_prompt=MAIN_SYSTEM_PROMPT,
-    tools=pricing_tools,
-    callback_handler=None
-)
+aws_pricing_agent = lazy_component("aws_pricing_agent", create_pricing_agent)
 
 def get_pricing_agent(user_input: str) -> str:
     """Get pricing agent response"""
@@ -72,7 +62,7 @@ def test_pricing_tools():
         
         # Create a simple agent without MCP tools for testing
         simple_agent = Agent(
-            model=bedrock_model,
+            model=get_bedrock_model(),
             system_prompt="You are a helpful AWS pricing assistant. Answer briefly.",
             tools=[],  # No tools for simple test
             callback_handler=None
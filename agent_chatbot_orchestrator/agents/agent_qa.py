@@ -2,32 +2,18 @@
 
 import sys
 import os
-import boto3
 import logging
 from strands import Agent
-from strands.models import BedrockModel
 
 project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 sys.path.append(project_root)
 import config
-from agent_chatbot_orchestrator.tools.mcp_docs_aws import get_aws_docs_tools, stdio_mcp_client
+from bedrock.registry import get_bedrock_model
+from agent_chatbot_orchestrator.lazy import lazy_component
+from agent_chatbot_orchestrator.tools.mcp_docs_aws import get_aws_docs_tools
 
 logging.basicConfig(level=logging.INFO)
 
-boto_session = boto3.Session(
-    aws_access_key_id=config.AWS_ACCESS_KEY_ID,
-    aws_secret_access_key=config.AWS_SECRET_ACCESS_KEY,
-    aws_session_token=config.AWS_SESSION_TOKEN,
-    region_name=config.AWS_REGION
-)
-
-bedrock_model = BedrockModel(
-    boto_session=boto_session,
-    model_id=config.CHATBOT_AGENT_MODEL,
-    temperature=config.BEDROCK_TEMPERATURE,
-    max_tokens=config.BEDROCK_MAX_TOKENS,
-)
-
 MAIN_SYSTEM_PROMPT = """Bạn là trợ lý AWS chuyên biệt có thể trả lời các câu hỏi về dịch vụ và tài liệu AWS.
 
 Khi người dùng hỏi về:
@@ -40,16 +26,20 @@ Hãy sử dụng các công cụ tìm kiếm tài liệu AWS để tìm kiếm t
 
 Trả lời bằng tiếng Việt và cung cấp thông tin chi tiết, chính xác."""
 
-print("🔧 Initializing AWS tools...")
-aws_tools = get_aws_docs_tools()
-print(f"✅ Got {len(aws_tools)} AWS tools")
+def create_docs_agent() -> Agent:
+    """Tạo AWS Documentation Agent với MCP tools"""
+    print("🔧 Initializing AWS tools...")
+    aws_tools = get_aws_docs_tools()
+    print(f"✅ Got {len(aws_tools)} AWS tools")
+    
+    return Agent(
+        model=get_bedrock_model(),
+        system_prompt=MAIN_SYSTEM_PROMPT,
+        tools=aws_tools,
+        callback_handler=None
+    )
 
-aws_docs_agent = Agent(
-    model=bedrock_model,
-    system_prompt=MAIN_SYSTEM_PROMPT,
-    tools=aws_tools,
-    callback_handler=None
-)
+aws_docs_agent = lazy_component("aws_docs_agent", create_docs_agent)
 
 # def get_docs_agent(user_input: str) -> str:
 #     """Get agent"""
@@ -73,8 +63,7 @@ aws_docs_agent = Agent(
 #                 continue
                 
 #             print("\n🔍 Đang tìm kiếm thông tin...")
-#             with stdio_mcp_client:
-#                 response = aws_docs_agent(user_input)
+#             response = aws_docs_agent(user_input)
 #             print(f"\n💡 Trả lời:\n{response}")
             
 #         except KeyboardInterrupt:
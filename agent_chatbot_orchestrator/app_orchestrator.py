@@ -10,7 +10,22 @@ from datetime import datetime
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from agent_chatbot_orchestrator.orchestrator_agent import orchestrator
+import config
+from agent_chatbot_orchestrator.orchestrator_agent import (
+    get_session_orchestrator, orchestrator_sessions, recent_fan_outs, get_router_stats, SPECIALIST_LABELS,
+    SESSION_PRELOAD
+)
+from agent_chatbot_orchestrator.passthrough import get_passthrough_stats
+from agent_chatbot_orchestrator.response_cache import get_response_cache_stats
+from agent_chatbot_orchestrator.single_flight import get_single_flight_stats
+from agent_chatbot_orchestrator.lazy import preload, get_startup_report
+from agent_chatbot_orchestrator.tools.mcp_pool import get_mcp_stats
+from agent_chatbot_orchestrator.tools.mcp_launcher import get_launch_stats
+
+@st.cache_resource
+def preload_agents():
+    """Preload the session factory once per server process (ORCHESTRATOR_PRELOAD / --preload)"""
+    return preload(SESSION_PRELOAD)
 
 def initialize_session():
     """Initialize session state variables"""
@@ -77,6 +92,11 @@ def display_message(message):
                     st.metric("Output Tokens", metrics.get('outputTokens', 0))
                 with col3:
                     st.metric("Latency (ms)", metrics.get('latencyMs', 0))
+                col4, col5 = st.columns(2)
+                with col4:
+                    st.metric("Cache Read Tokens", metrics.get('cacheReadInputTokens', 0))
+                with col5:
+                    st.metric("Cache Write Tokens", metrics.get('cacheWriteInputTokens', 0))
 
 def extract_content_from_response(response_data):
     """Extract content from complex Strands response structure"""
@@ -94,6 +114,9 @@ def extract_content_from_response(response_data):
             # Case 2: Result structure
             if 'result' in response_data:
                 result = response_data['result']
+                if isinstance(result, str):
+                    # Cached answer
+                    return result
                 if hasattr(result, 'message'):
                     message = result.message
                     if isinstance(message, dict) and 'content' in message:
@@ -132,6 +155,8 @@ def extract_metrics_from_response(response_data):
                         'inputTokens': getattr(metrics, 'accumulated_usage', {}).get('inputTokens', 0),
                         'outputTokens': getattr(metrics, 'accumulated_usage', {}).get('outputTokens', 0),
                         'totalTokens': getattr(metrics, 'accumulated_usage', {}).get('totalTokens', 0),
+                        'cacheReadInputTokens': getattr(metrics, 'accumulated_usage', {}).get('cacheReadInputTokens', 0),
+                        'cacheWriteInputTokens': getattr(metrics, 'accumulated_usage', {}).get('cacheWriteInputTokens', 0),
                         'latencyMs': getattr(metrics, 'accumulated_metrics', {}).get('latencyMs', 0),
                         'toolCalls': len(getattr(metrics, 'tool_metrics', {}))
                     }
@@ -142,6 +167,8 @@ def extract_metrics_from_response(response_data):
                 'inputTokens': getattr(metrics, 'accumulated_usage', {}).get('inputTokens', 0),
                 'outputTokens': getattr(metrics, 'accumulated_usage', {}).get('outputTokens', 0),
                 'totalTokens': getattr(metrics, 'accumulated_usage', {}).get('totalTokens', 0),
+                'cacheReadInputTokens': getattr(metrics, 'accumulated_usage', {}).get('cacheReadInputTokens', 0),
+                'cacheWriteInputTokens': getattr(metrics, 'accumulated_usage', {}).get('cacheWriteInputTokens', 0),
                 'latencyMs': getattr(metrics, 'accumulated_metrics', {}).get('latencyMs', 0),
                 'toolCalls': len(getattr(metrics, 'tool_metrics', {}))
             }
@@ -150,17 +177,41 @@ def extract_metrics_from_response(response_data):
     except Exception:
         return None
 
-async def process_streaming_response(prompt):
-    """Process streaming response from orchestrator"""
+def extract_specialist_delta(event):
+    """Text delta streamed by a specialist (directly routed or relayed through a tool), else None"""
+    if not isinstance(event, dict):
+        return None
+    if event.get('type') == 'tool_stream':
+        event = event.get('tool_stream_event', {}).get('data')
+        if not isinstance(event, dict):
+            return None
+    return event.get('specialist_delta')
+
+async def process_streaming_response(prompt, session_id):
+    """Process streaming response from the session's orchestrator"""
     try:
-        agent_stream = orchestrator.stream_async(prompt)
+        agent_stream = get_session_orchestrator(session_id).stream_async(prompt)
         
         response_parts = []
         steps = ["🚀 Bắt đầu xử lý câu hỏi"]
         current_content = ""
+        streamed_content = ""
+        final_metrics = None
         
         async for event in agent_stream:
             try:
+                # Specialist output streamed through as it is produced
+                delta = extract_specialist_delta(event)
+                if delta:
+                    streamed_content += delta
+                    yield {
+                        'type': 'content',
+                        'data': streamed_content,
+                        'steps': steps.copy(),
+                        'metrics': None
+                    }
+                    continue
+                
                 # Extract content from various event types
                 content = extract_content_from_response(event)
                 
@@ -168,16 +219,23 @@ async def process_streaming_response(prompt):
                     # This is actual content
                     current_content = content
                     steps.append("✅ Nhận được phản hồi từ agent")
+                    final_metrics = extract_metrics_from_response(event) or final_metrics
                     
                     yield {
                         'type': 'content',
                         'data': content,
                         'steps': steps.copy(),
-                        'metrics': extract_metrics_from_response(event)
+                        'metrics': final_metrics
                     }
                 else:
                     # This might be a tool call or other event
-                    if 'get_account_agent' in str(event):
+                    if isinstance(event, dict) and 'route' in event:
+                        route = event['route']
+                        labels = ", ".join(SPECIALIST_LABELS.get(name, name) for name in route['specialists'])
+                        steps.append(f"⚡ Route trực tiếp tới {labels} (confidence {route['confidence']})")
+                    elif 'ask_specialists' in str(event):
+                        steps.append("🔀 Đang gọi song song nhiều agent...")
+                    elif 'get_account_agent' in str(event):
                         steps.append("🔧 Đang gọi Account Agent...")
                     elif 'get_architect_agent' in str(event):
                         steps.append("🏗️ Đang gọi Architect Agent...")
@@ -206,7 +264,7 @@ async def process_streaming_response(prompt):
                 'type': 'complete',
                 'data': current_content,
                 'steps': steps,
-                'metrics': None
+                'metrics': final_metrics
             }
         else:
             yield {
@@ -231,6 +289,10 @@ def main():
     
     initialize_session()
     
+    if config.ORCHESTRATOR_PRELOAD:
+        with st.spinner("Đang khởi tạo agents..."):
+            preload_agents()
+    
     with st.sidebar:
         st.title("🗂️ Quản lý Session")
         
@@ -276,11 +338,42 @@ def main():
             help="Hiển thị thống kê về tokens và performance"
         )
         
+        if st.session_state.show_metrics:
+            with st.expander("⏱️ Thời gian khởi tạo", expanded=False):
+                for item in get_startup_report():
+                    if item['loaded']:
+                        st.write(f"✅ {item['name']}: {item['init_ms']} ms")
+                    else:
+                        st.write(f"💤 {item['name']}: chưa khởi tạo")
+            
+            with st.expander("🔌 MCP servers", expanded=False):
+                st.json({"sessions": get_mcp_stats(), "launch": get_launch_stats()})
+            
+            with st.expander("🧵 Agent sessions", expanded=False):
+                st.json(orchestrator_sessions.get_stats())
+            
+            with st.expander("⚡ Pre-router", expanded=False):
+                st.json(get_router_stats())
+            
+            with st.expander("↪️ Passthrough", expanded=False):
+                st.json(get_passthrough_stats())
+            
+            with st.expander("🗄️ Response cache", expanded=False):
+                st.json(get_response_cache_stats())
+            
+            with st.expander("🔗 Single-flight", expanded=False):
+                st.json(get_single_flight_stats())
+            
+            if recent_fan_outs:
+                with st.expander("🔀 Fan-out gần nhất", expanded=False):
+                    st.json(list(recent_fan_outs)[-5:])
+        
         if st.session_state.sessions and len(st.session_state.sessions) > 1:
             st.divider()
             if st.button("🗑️ Xóa Session Hiện Tại", use_container_width=True):
                 if st.session_state.current_session_id in st.session_state.sessions:
                     del st.session_state.sessions[st.session_state.current_session_id]
+                    orchestrator_sessions.remove(st.session_state.current_session_id)
                     if st.session_state.sessions:
                         st.session_state.current_session_id = list(st.session_state.sessions.keys())[0]
                     else:
@@ -330,7 +423,7 @@ def main():
                             # Show initial loading
                             response_placeholder.write("🔄 Đang xử lý...")
                             
-                            async for event in process_streaming_response(prompt):
+                            async for event in process_streaming_response(prompt, st.session_state.current_session_id):
                                 if event['type'] == 'content':
                                     final_response = event['data']
                                     response_placeholder.write(final_response)
@@ -372,7 +465,7 @@ def main():
                 else:
                     # Regular (non-streaming) approach
                     with st.spinner("Đang xử lý..."):
-                        response = orchestrator(prompt)
+                        response = get_session_orchestrator(st.session_state.current_session_id)(prompt)
                         
                         # Extract content from response
                         final_response = extract_content_from_response(response)
@@ -407,6 +500,11 @@ def main():
                             st.metric("Latency (ms)", final_metrics.get('latencyMs', 0))
                         with col4:
                             st.metric("Tool Calls", final_metrics.get('toolCalls', 0))
+                        col5, col6 = st.columns(2)
+                        with col5:
+                            st.metric("Cache Read Tokens", final_metrics.get('cacheReadInputTokens', 0))
+                        with col6:
+                            st.metric("Cache Write Tokens", final_metrics.get('cacheWriteInputTokens', 0))
                 
                 # Add to session
                 add_message_to_session("assistant", final_response, final_steps, final_metrics)
@@ -0,0 +1,187 @@
+"""Lazy construction of agents, models and MCP tools with startup timing"""
+
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+
+class LazyComponent:
+    """
+    Proxy that builds a component on first use
+
+    Calling the proxy or reading an attribute builds the component once
+    (thread-safe) and forwards to it, so `account_agent(user_input)` and
+    `orchestrator.stream_async(prompt)` keep working unchanged.
+    """
+
+    def __init__(self, name: str, factory: Callable[[], Any]):
+        self._name = name
+        self._factory = factory
+        self._instance = None
+        self._loaded = False
+        self._init_ms: Optional[float] = None
+        self._on_load: List[Callable[[Any], None]] = []
+        self._lock = threading.Lock()
+
+    @property
+    def name(self) -> str:
+        return self._name
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._loaded
+
+    @property
+    def init_ms(self) -> Optional[float]:
+        return self._init_ms
+
+    @property
+    def has_pending_callbacks(self) -> bool:
+        """True if on_load callbacks are waiting for the component to be built"""
+        with self._lock:
+            return bool(self._on_load)
+
+    def get(self) -> Any:
+        """Build the component if needed and return it"""
+        if not self._loaded:
+            with self._lock:
+                if not self._loaded:
+                    started = time.perf_counter()
+                    self._instance = self._factory()
+                    self._init_ms = (time.perf_counter() - started) * 1000
+                    for callback in self._on_load:
+                        callback(self._instance)
+                    self._on_load = []
+                    self._loaded = True
+        return self._instance
+
+    def on_load(self, callback: Callable[[Any], None]):
+        """Run `callback(component)` once it is built (immediately if it already is)"""
+        with self._lock:
+            if not self._loaded:
+                self._on_load.append(callback)
+                return
+        callback(self._instance)
+
+    def __call__(self, *args, **kwargs):
+        return self.get()(*args, **kwargs)
+
+    def __getattr__(self, attr: str):
+        return getattr(self.get(), attr)
+
+    def __repr__(self) -> str:
+        state = f"loaded in {self._init_ms:.0f} ms" if self._loaded else "not loaded"
+        return f"<LazyComponent {self._name} ({state})>"
+
+
+class PreloadHook:
+    """
+    Startup step run by preload() for its side effect
+
+    For work that builds nothing to hand out, e.g. warming the sub-agents of
+    an existing orchestrator or preparing a spare session: it is timed and
+    reported like a component but is not a proxy.
+    """
+
+    def __init__(self, name: str, func: Callable[[], None]):
+        self._name = name
+        self._func = func
+        self._init_ms: Optional[float] = None
+        self._lock = threading.Lock()
+
+    @property
+    def name(self) -> str:
+        return self._name
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._init_ms is not None
+
+    @property
+    def init_ms(self) -> Optional[float]:
+        return self._init_ms
+
+    def get(self):
+        """Run the step once (later calls do nothing)"""
+        with self._lock:
+            if self._init_ms is None:
+                started = time.perf_counter()
+                self._func()
+                self._init_ms = (time.perf_counter() - started) * 1000
+
+    def __repr__(self) -> str:
+        state = f"ran in {self._init_ms:.0f} ms" if self.is_loaded else "not run"
+        return f"<PreloadHook {self._name} ({state})>"
+
+
+# Registered components and preload hooks in registration order
+_components: Dict[str, Any] = {}
+
+
+def lazy_component(name: str, factory: Callable[[], Any]) -> LazyComponent:
+    """
+    Register a component that will be built on first use
+
+    Args:
+        name: Component name shown in the startup report
+        factory: Zero-argument callable that builds the component
+
+    Returns:
+        LazyComponent: Proxy for the component
+    """
+    component = LazyComponent(name, factory)
+    _components[name] = component
+    return component
+
+
+def preload_hook(name: str, func: Callable[[], None]) -> PreloadHook:
+    """
+    Register a startup step run by preload() (not on first use)
+
+    Args:
+        name: Step name shown in the startup report
+        func: Zero-argument callable run for its side effect
+
+    Returns:
+        PreloadHook: The registered step
+    """
+    hook = PreloadHook(name, func)
+    _components[name] = hook
+    return hook
+
+
+def preload(names: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+    """
+    Build components and run preload hooks up front instead of on first use
+
+    Args:
+        names: Components / hooks to run (default: all registered)
+
+    Returns:
+        List[Dict[str, Any]]: Startup report after preloading
+    """
+    for name in names or list(_components.keys()):
+        _components[name].get()
+    return get_startup_report()
+
+
+def get_startup_report() -> List[Dict[str, Any]]:
+    """Get init status and init time (ms) of every registered component"""
+    return [
+        {
+            "name": component.name,
+            "loaded": component.is_loaded,
+            "init_ms": round(component.init_ms, 1) if component.init_ms is not None else None
+        }
+        for component in _components.values()
+    ]
+
+
+def print_startup_report():
+    """Print the startup report"""
+    print("⏱️ Startup report:")
+    for item in get_startup_report():
+        if item["loaded"]:
+            print(f"  ✅ {item['name']}: {item['init_ms']} ms")
+        else:
+            print(f"  💤 {item['name']}: chưa khởi tạo")
@@ -2,50 +2,328 @@
 
 import sys
 import os
-import boto3
 import logging
 import asyncio
+import argparse
+import threading
+import time
+from collections import deque
+from contextlib import aclosing
+from typing import Any, AsyncIterator, Deque, Dict, List, Optional
 from strands import Agent, tool
-from strands.models import BedrockModel
+from strands.agent.conversation_manager import SlidingWindowConversationManager
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 import config
-from agent_chatbot_orchestrator.agents.agent_account import account_agent
-from agent_chatbot_orchestrator.agents.agent_architect import aws_architect_agent
-from agent_chatbot_orchestrator.agents.agent_qa import aws_docs_agent
-
-boto_session = boto3.Session(
-    aws_access_key_id=config.AWS_ACCESS_KEY_ID,
-    aws_secret_access_key=config.AWS_SECRET_ACCESS_KEY,
-    aws_session_token=config.AWS_SESSION_TOKEN,
-    region_name=config.AWS_REGION
-)
-
-bedrock_model = BedrockModel(
-    boto_session=boto_session,
-    model_id=config.CHATBOT_AGENT_MODEL,
-    temperature=config.BEDROCK_TEMPERATURE,
-    max_tokens=config.BEDROCK_MAX_TOKENS,
-)
-
-@tool  
-def get_account_agent(user_input: str) -> str:
-    """Get information about AWS account resources"""
-    response = account_agent(user_input)
-    return response
+from bedrock.registry import get_bedrock_model
+from agent_chatbot_orchestrator.lazy import LazyComponent, lazy_component, preload, preload_hook, print_startup_report
+from agent_chatbot_orchestrator.sessions import AgentSessionManager
+from agent_chatbot_orchestrator.router import create_default_router
+from agent_chatbot_orchestrator.passthrough import PassthroughHook, record_saved
+from agent_chatbot_orchestrator.response_cache import response_cache
+from agent_chatbot_orchestrator.single_flight import single_flight
+from agent_chatbot_orchestrator.agents.agent_account import create_account_agent
+from agent_chatbot_orchestrator.agents.agent_architect import create_architect_agent
+from agent_chatbot_orchestrator.agents.agent_qa import create_docs_agent
+
+logger = logging.getLogger(__name__)
+
+def _has_history(agent) -> bool:
+    """Whether a sub-agent already has conversation history (for an unbuilt LazyComponent: turns waiting in on_load)"""
+    if isinstance(agent, LazyComponent) and not agent.is_loaded:
+        return agent.has_pending_callbacks
+    return bool(agent.messages)
+
+def _cached_specialist_answer(agent, name: str, user_input: str) -> Optional[str]:
+    """
+    Câu trả lời từ response cache cho lượt đầu tiên của một sub-agent
+    
+    Sub-agent có lịch sử riêng theo session; câu hỏi sau phụ thuộc ngữ cảnh
+    (vd. "còn region us-west-2 thì sao?") nên chỉ lượt đầu mới dùng cache.
+    Lượt trả lời từ cache được ghi vào lịch sử sub-agent như một lượt bình thường.
+    """
+    if _has_history(agent):
+        return None
+    cached = response_cache.get(name, user_input)
+    if cached is None:
+        return None
+    
+    def remember(instance):
+        instance.messages.append({"role": "user", "content": [{"text": user_input}]})
+        instance.messages.append({"role": "assistant", "content": [{"text": cached}]})
+    
+    if isinstance(agent, LazyComponent):
+        agent.on_load(remember)
+    else:
+        remember(agent)
+    return cached
 
-@tool
-def get_architect_agent(user_input: str) -> str:
-    """Get AWS architecture design and recommendations"""  
-    response = aws_architect_agent(user_input)
+def invoke_agent_cached(agent, name: str, user_input: str):
+    """Invoke a sub-agent synchronously, answering its first turn from the response cache when possible"""
+    cached = _cached_specialist_answer(agent, name, user_input)
+    if cached is not None:
+        return cached
+    first_turn = not _has_history(agent)
+    response = agent(user_input)
+    if first_turn:
+        response_cache.put(name, user_input, str(response))
     return response
 
-@tool
-def get_docs_agent(user_input: str) -> str:
-    """Search AWS documentation and guides"""
-    response = aws_docs_agent(user_input) 
+async def invoke_agent_async(agent, user_input: str, name: Optional[str] = None):
+    """
+    Invoke a sub-agent without blocking the event loop
+    
+    A LazyComponent that is not built yet is built on a worker thread first
+    (model + MCP spawn), then the agent runs through its async API. With
+    `name`, the sub-agent's first turn is served from / stored in the response cache.
+    """
+    if name:
+        cached = _cached_specialist_answer(agent, name, user_input)
+        if cached is not None:
+            return cached
+    first_turn = not _has_history(agent)
+    if isinstance(agent, LazyComponent) and not agent.is_loaded:
+        await asyncio.to_thread(agent.get)
+    response = await agent.invoke_async(user_input)
+    if name and first_turn:
+        response_cache.put(name, user_input, str(response))
     return response
 
+async def stream_agent_events(agent, name: str, user_input: str) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Stream a sub-agent: text deltas as {"specialist", "specialist_delta"}, then its {"result"} event
+    
+    Args:
+        agent: Sub-agent (Agent hoặc LazyComponent)
+        name: Specialist name ("account", "architect", "docs")
+        user_input: User question
+    """
+    cached = _cached_specialist_answer(agent, name, user_input)
+    if cached is not None:
+        yield {"specialist": name, "specialist_delta": cached, "cached": True}
+        yield {"result": cached, "cached": True}
+        return
+    
+    first_turn = not _has_history(agent)
+    if isinstance(agent, LazyComponent) and not agent.is_loaded:
+        await asyncio.to_thread(agent.get)
+    async for event in agent.stream_async(user_input):
+        if not isinstance(event, dict):
+            continue
+        if "data" in event:
+            yield {"specialist": name, "specialist_delta": event["data"]}
+        elif "result" in event:
+            if first_turn:
+                response_cache.put(name, user_input, str(event["result"]))
+            yield event
+
+async def stream_specialist(agent, name: str, user_input: str) -> AsyncIterator[Any]:
+    """Body of a streaming specialist tool: relay deltas, then yield the answer (tool result)"""
+    answer = ""
+    async for event in stream_agent_events(agent, name, user_input):
+        if "result" in event:
+            answer = str(event["result"])
+        else:
+            yield event
+    yield answer
+
+SPECIALIST_LABELS = {
+    "account": "🔧 AWS Account",
+    "architect": "🏗️ AWS Architecture",
+    "docs": "📚 AWS Documentation"
+}
+
+# Event loop riêng (luồng nền) cho code đồng bộ cần chạy coroutine, vd. fan-out trong
+# OrchestratorSession.__call__: asyncio.run() lỗi khi luồng gọi đã có loop đang chạy
+# (Jupyter, handler FastAPI, tool đồng bộ của Agent)
+_sync_loop: Optional[asyncio.AbstractEventLoop] = None
+_sync_loop_lock = threading.Lock()
+
+def run_sync(coro):
+    """Run a coroutine to completion from synchronous code, also on a thread whose event loop is running"""
+    global _sync_loop
+    with _sync_loop_lock:
+        if _sync_loop is None:
+            _sync_loop = asyncio.new_event_loop()
+            threading.Thread(target=_sync_loop.run_forever, name="orchestrator-sync", daemon=True).start()
+    return asyncio.run_coroutine_threadsafe(coro, _sync_loop).result()
+
+# Tool của orchestrator -> specialist trả lời
+SPECIALIST_TOOLS = {
+    "get_account_agent": "account",
+    "get_architect_agent": "architect",
+    "get_docs_agent": "docs"
+}
+
+def _specialists_used(messages: List[Dict[str, Any]], user_input: str) -> Optional[List[str]]:
+    """
+    Specialists that answered the first orchestrator LLM turn, read from its tool calls
+    
+    Returns:
+        Optional[List[str]]: Specialist names, or None when it cannot be told (turn trimmed
+            by the sliding window, failed tool, ask_specialists whose branches are not visible, other tool)
+    """
+    first = messages[0].get("content", []) if messages else []
+    if not first or first[0].get("text") != user_input:
+        return None
+    specialists = set()
+    for message in messages:
+        for block in message.get("content", []):
+            if "toolResult" in block and block["toolResult"].get("status") != "success":
+                return None
+            if "toolUse" in block:
+                name = SPECIALIST_TOOLS.get(block["toolUse"].get("name"))
+                if name is None:
+                    return None
+                specialists.add(name)
+    return sorted(specialists)
+
+# Báo cáo các lần fan-out gần nhất (latency từng nhánh)
+recent_fan_outs: Deque[Dict[str, Any]] = deque(maxlen=50)
+
+async def fan_out(
+    agents: Dict[str, Any],
+    user_input: str,
+    specialists: Optional[List[str]] = None,
+    timeout: Optional[float] = None
+) -> Dict[str, Any]:
+    """
+    Run several specialists concurrently and merge their answers
+    
+    Args:
+        agents: Specialist name -> agent ("account", "architect", "docs")
+        user_input: User question, sent unchanged to every specialist
+        specialists: Specialists to run (default: all)
+        timeout: Per-specialist timeout in seconds (default: config.ORCHESTRATOR_FAN_OUT_TIMEOUT)
+    
+    Returns:
+        Dict[str, Any]: {"answer": merged text, "branches": [...], "latency_ms": wall-clock}
+    """
+    timeout = timeout or config.ORCHESTRATOR_FAN_OUT_TIMEOUT
+    specialists = [name for name in (specialists or list(agents.keys())) if name in agents]
+    if not specialists:
+        specialists = list(agents.keys())
+    started = time.perf_counter()
+    
+    async def run_branch(name: str) -> Dict[str, Any]:
+        branch_started = time.perf_counter()
+        try:
+            response = await asyncio.wait_for(invoke_agent_async(agents[name], user_input, name), timeout)
+            status, text = "ok", str(response)
+        except asyncio.TimeoutError:
+            status, text = "timeout", f"⏱️ {name} agent không phản hồi trong {timeout:.0f}s"
+        except Exception as e:
+            status, text = "error", f"❌ Lỗi từ {name} agent: {str(e)}"
+        return {
+            "specialist": name,
+            "status": status,
+            "latency_ms": int((time.perf_counter() - branch_started) * 1000),
+            "response": text
+        }
+    
+    branches = await asyncio.gather(*(run_branch(name) for name in specialists))
+    
+    if len(branches) == 1:
+        answer = branches[0]["response"]
+    else:
+        answer = "\n\n".join(
+            f"## {SPECIALIST_LABELS.get(branch['specialist'], branch['specialist'])}\n\n{branch['response']}"
+            for branch in branches
+        )
+    
+    report = {
+        "answer": answer,
+        "branches": branches,
+        "latency_ms": int((time.perf_counter() - started) * 1000)
+    }
+    recent_fan_outs.append({key: value for key, value in report.items() if key != "answer"})
+    logger.info(
+        "Fan-out %s ms | %s",
+        report["latency_ms"],
+        ", ".join(f"{b['specialist']}={b['latency_ms']}ms ({b['status']})" for b in branches)
+    )
+    return report
+
+def create_specialist_tools(account=None, architect=None, docs=None, use_async: Optional[bool] = None) -> List:
+    """
+    Tạo các tool gọi sub-agent
+    
+    Args:
+        account: Account agent (default: agent mới, khởi tạo khi gọi lần đầu)
+        architect: Architect agent (default: agent mới, khởi tạo khi gọi lần đầu)
+        docs: Docs agent (default: agent mới, khởi tạo khi gọi lần đầu)
+        use_async: Dùng async tools (await sub-agent, không chặn event loop)
+            thay vì gọi đồng bộ (default: config.ORCHESTRATOR_ASYNC_TOOLS)
+    
+    Returns:
+        List: [get_account_agent, get_architect_agent, get_docs_agent] (+ ask_specialists
+            khi bật config.ORCHESTRATOR_FAN_OUT)
+    """
+    if account is None:
+        account = LazyComponent("account_agent", create_account_agent)
+    if architect is None:
+        architect = LazyComponent("aws_architect_agent", create_architect_agent)
+    if docs is None:
+        docs = LazyComponent("aws_docs_agent", create_docs_agent)
+    if use_async is None:
+        use_async = config.ORCHESTRATOR_ASYNC_TOOLS
+    agents = {"account": account, "architect": architect, "docs": docs}
+    
+    @tool
+    async def ask_specialists(user_input: str, specialists: List[str]) -> str:
+        """Ask several specialists in parallel when a question spans account resources, architecture and/or documentation
+        
+        Args:
+            user_input: The user's question, unchanged
+            specialists: Two or more of "account", "architect", "docs"
+        """
+        report = await fan_out(agents, user_input, specialists)
+        return report["answer"]
+    
+    if use_async:
+        # Async generator tools: specialist deltas reach the caller as tool_stream events
+        @tool
+        async def get_account_agent(user_input: str) -> AsyncIterator[Any]:
+            """Get information about AWS account resources"""
+            async for event in stream_specialist(account, "account", user_input):
+                yield event
+        
+        @tool
+        async def get_architect_agent(user_input: str) -> AsyncIterator[Any]:
+            """Get AWS architecture design and recommendations"""
+            async for event in stream_specialist(architect, "architect", user_input):
+                yield event
+        
+        @tool
+        async def get_docs_agent(user_input: str) -> AsyncIterator[Any]:
+            """Search AWS documentation and guides"""
+            async for event in stream_specialist(docs, "docs", user_input):
+                yield event
+        
+        tools = [get_account_agent, get_architect_agent, get_docs_agent]
+        return tools + [ask_specialists] if config.ORCHESTRATOR_FAN_OUT else tools
+    
+    @tool  
+    def get_account_agent(user_input: str) -> str:
+        """Get information about AWS account resources"""
+        response = invoke_agent_cached(account, "account", user_input)
+        return response
+    
+    @tool
+    def get_architect_agent(user_input: str) -> str:
+        """Get AWS architecture design and recommendations"""  
+        response = invoke_agent_cached(architect, "architect", user_input)
+        return response
+    
+    @tool
+    def get_docs_agent(user_input: str) -> str:
+        """Search AWS documentation and guides"""
+        response = invoke_agent_cached(docs, "docs", user_input) 
+        return response
+    
+    tools = [get_account_agent, get_architect_agent, get_docs_agent]
+    return tools + [ask_specialists] if config.ORCHESTRATOR_FAN_OUT else tools
+
 MAIN_SYSTEM_PROMPT = """
 You are an AWS agent orchestrator. Your ONLY job is to route user questions to the appropriate specialist agent and return their exact response.
 
@@ -53,6 +331,7 @@ Route questions as follows:
 - AWS account/resources questions → use get_account_agent(user_input)
 - AWS architecture/design questions → use get_architect_agent(user_input)  
 - AWS documentation questions → use get_docs_agent(user_input)
+- Questions that clearly need more than one of the above (e.g. current resources AND a recommended architecture) → use ask_specialists(user_input, specialists=[...]) ONCE with every needed specialist ("account", "architect", "docs") instead of calling the tools one after another
 
 CRITICAL RULES:
 1. ALWAYS call the appropriate tool - never answer directly
@@ -63,12 +342,246 @@ CRITICAL RULES:
 Respond in the same language as the user's question.
 """
 
-orchestrator = Agent(
-    model=bedrock_model,
-    system_prompt=MAIN_SYSTEM_PROMPT,
-    tools=[get_account_agent, get_architect_agent, get_docs_agent],
-    callback_handler=None
-)
+def create_specialists() -> Dict[str, LazyComponent]:
+    """Tạo bộ sub-agent riêng cho một orchestrator (khởi tạo khi dùng lần đầu)"""
+    return {
+        "account": LazyComponent("account_agent", create_account_agent),
+        "architect": LazyComponent("aws_architect_agent", create_architect_agent),
+        "docs": LazyComponent("aws_docs_agent", create_docs_agent)
+    }
+
+def create_orchestrator_agent(specialists: Optional[Dict[str, Any]] = None) -> Agent:
+    """
+    Tạo Orchestrator Agent với bộ sub-agent riêng
+    
+    Mỗi orchestrator có lịch sử hội thoại riêng (kể cả các sub-agent); model và
+    MCP tools được dùng chung. Các sub-agent chỉ được khởi tạo khi tool được gọi lần đầu.
+    
+    Args:
+        specialists: Sub-agents {"account", "architect", "docs"} (default: bộ mới)
+    """
+    specialists = specialists or create_specialists()
+    tools = create_specialist_tools(**specialists)
+    # Kết quả specialist là câu trả lời cuối, không để model chép lại từng token
+    hooks = [PassthroughHook(tool.tool_name for tool in tools)] if config.ORCHESTRATOR_PASSTHROUGH else []
+    return Agent(
+        model=get_bedrock_model(),
+        system_prompt=MAIN_SYSTEM_PROMPT,
+        tools=tools,
+        hooks=hooks,
+        conversation_manager=SlidingWindowConversationManager(window_size=config.ORCHESTRATOR_WINDOW_SIZE),
+        callback_handler=None
+    )
+
+# Pre-router dùng chung (stateless ngoài counters)
+pre_router = lazy_component("pre_router", create_default_router)
+
+class OrchestratorSession:
+    """
+    Orchestrator của một session cùng các sub-agent của nó
+    
+    Câu hỏi mà pre-router phân loại đủ chắc chắn được gửi thẳng tới specialist
+    (hoặc fan-out khi nhiều ý), bỏ qua lượt LLM định tuyến của orchestrator.
+    Các câu còn lại đi qua orchestrator như trước. Lượt hỏi/đáp route trực
+    tiếp vẫn được ghi vào lịch sử của orchestrator để các câu hỏi sau có ngữ cảnh.
+    Các thuộc tính khác (messages, tool, ...) được chuyển tới Agent bên trong.
+    """
+    
+    def __init__(self, use_router: Optional[bool] = None):
+        self.specialists = create_specialists()
+        self.agent = create_orchestrator_agent(self.specialists)
+        self.use_router = config.ROUTER_ENABLED if use_router is None else use_router
+        self.last_route: Optional[Dict[str, Any]] = None
+        # Version của state (StateStore) mà lịch sử này tương ứng; None: chưa load
+        self.state_version: Optional[str] = None
+    
+    def warm(self):
+        """Khởi tạo ngay các sub-agent (model, MCP tools) thay vì lúc tool được gọi lần đầu"""
+        for specialist in self.specialists.values():
+            specialist.get()
+    
+    def __getattr__(self, name: str):
+        if name == "agent":
+            raise AttributeError(name)
+        return getattr(self.agent, name)
+    
+    def route(self, user_input: str) -> Optional[Dict[str, Any]]:
+        """Quyết định route trực tiếp; None nghĩa là để orchestrator LLM xử lý"""
+        if not self.use_router:
+            return None
+        decision = pre_router.route(user_input)
+        self.last_route = decision
+        logger.info(
+            "Pre-router: %s (%s, confidence %.2f, %.2f ms)",
+            "+".join(decision["specialists"]) or "-", decision["source"],
+            decision["confidence"], decision["latency_ms"]
+        )
+        return decision if decision["source"] != "llm" else None
+    
+    def _remember(self, user_input: str, answer: str):
+        """Ghi lượt không đi qua orchestrator LLM (route trực tiếp, cache) vào lịch sử orchestrator"""
+        self.agent.messages.append({"role": "user", "content": [{"text": user_input}]})
+        self.agent.messages.append({"role": "assistant", "content": [{"text": answer}]})
+    
+    def _cached_answer(self, user_input: str) -> Optional[str]:
+        """
+        Câu trả lời từ response cache cho lượt đầu tiên của session
+        
+        Chỉ lượt đầu mới dùng cache ở mức orchestrator: các câu hỏi sau phụ
+        thuộc ngữ cảnh hội thoại (vd. "còn region us-west-2 thì sao?").
+        """
+        if self.agent.messages:
+            return None
+        cached = response_cache.get("orchestrator", user_input)
+        if cached is not None:
+            self._remember(user_input, cached)
+        return cached
+    
+    def _cache_first_turn(self, user_input: str, answer: str, specialists: Optional[List[str]]):
+        """
+        Lưu câu trả lời lượt đầu vào response cache ở mức orchestrator
+        
+        TTL là TTL ngắn nhất trong số orchestrator và các specialist đã trả lời.
+        Không lưu khi không biết specialist nào đã chạy (None), khi có nhánh lỗi,
+        hoặc khi account tham gia (dữ liệu account thay đổi liên tục).
+        """
+        if specialists is None or "account" in specialists:
+            return
+        ttl = min([response_cache.ttl_for("orchestrator")] + [response_cache.ttl_for(name) for name in specialists])
+        response_cache.put("orchestrator", user_input, answer, ttl=ttl)
+    
+    def __call__(self, user_input: str):
+        cached = self._cached_answer(user_input)
+        if cached is not None:
+            return cached
+        first_turn = not self.agent.messages
+        
+        decision = self.route(user_input)
+        if decision is None:
+            result = self.agent(user_input)
+            answer = str(result)
+            specialists = _specialists_used(self.agent.messages, user_input) if first_turn else None
+        else:
+            specialists = decision["specialists"]
+            if len(specialists) == 1:
+                name = specialists[0]
+                result = invoke_agent_cached(self.specialists[name], name, user_input)
+                answer = str(result)
+            else:
+                report = run_sync(fan_out(self.specialists, user_input, specialists))
+                result = answer = report["answer"]
+                if any(branch["status"] != "ok" for branch in report["branches"]):
+                    specialists = None
+            self._remember(user_input, answer)
+            record_saved(answer, direct_route=True)
+        
+        if first_turn:
+            self._cache_first_turn(user_input, answer, specialists)
+        return result
+    
+    async def stream_async(self, user_input: str):
+        """
+        Stream events như Agent.stream_async; route trực tiếp khi pre-router chắc chắn
+        
+        Lượt đầu của session (chưa có lịch sử) dùng single-flight: các request
+        giống hệt đang chạy cùng lúc chia sẻ một lần thực thi trên một
+        OrchestratorSession riêng không thuộc user nào. Mọi session tham gia
+        (kể cả session khởi động lần thực thi) chỉ ghi câu trả lời cuối vào
+        lịch sử của mình, nên Agent của session không bị chiếm khi user ngắt
+        kết nối giữa chừng.
+        """
+        cached = self._cached_answer(user_input)
+        if cached is not None:
+            yield {"content": cached, "cached": True}
+            return
+        if self.agent.messages or not config.SINGLE_FLIGHT_ENABLED:
+            async for event in self._stream(user_input):
+                yield event
+            return
+        
+        events, _ = single_flight.subscribe(
+            "orchestrator", user_input, lambda: _stream_shared_turn(user_input, self.use_router)
+        )
+        answer = ""
+        async with aclosing(events):
+            async for event in events:
+                if isinstance(event, dict):
+                    if "route" in event:
+                        self.last_route = event["route"]
+                    elif "result" in event:
+                        answer = str(event["result"])
+                    elif "content" in event:
+                        answer = str(event["content"])
+                yield event
+        if answer:
+            self._remember(user_input, answer)
+    
+    async def _stream(self, user_input: str):
+        first_turn = not self.agent.messages
+        
+        answer = ""
+        decision = self.route(user_input)
+        if decision is None:
+            async for event in self.agent.stream_async(user_input):
+                if isinstance(event, dict) and "result" in event:
+                    answer = str(event["result"])
+                yield event
+            specialists = _specialists_used(self.agent.messages, user_input) if first_turn else None
+        else:
+            yield {"route": decision}
+            
+            specialists = decision["specialists"]
+            if len(specialists) > 1:
+                report = await fan_out(self.specialists, user_input, specialists)
+                answer = report["answer"]
+                if any(branch["status"] != "ok" for branch in report["branches"]):
+                    specialists = None
+                yield {"content": answer}
+            else:
+                name = decision["specialists"][0]
+                async for event in stream_agent_events(self.specialists[name], name, user_input):
+                    if "result" in event:
+                        answer = str(event["result"])
+                    yield event
+            
+            self._remember(user_input, answer)
+            record_saved(answer, direct_route=True)
+        
+        if first_turn:
+            self._cache_first_turn(user_input, answer, specialists)
+
+async def _stream_shared_turn(user_input: str, use_router: bool):
+    """Lần thực thi single-flight: chạy trên OrchestratorSession mới (không lịch sử, không thuộc user nào)"""
+    session = await asyncio.to_thread(OrchestratorSession, use_router)
+    async for event in session._stream(user_input):
+        yield event
+
+# Orchestrator dùng chung cho CLI; UI/API dùng get_session_orchestrator()
+orchestrator = lazy_component("orchestrator", OrchestratorSession)
+orchestrator_specialists = preload_hook("orchestrator_specialists", lambda: orchestrator.warm())
+
+orchestrator_sessions = AgentSessionManager(OrchestratorSession)
+
+def create_warm_session() -> OrchestratorSession:
+    """Tạo OrchestratorSession với các sub-agent đã khởi tạo sẵn"""
+    session = OrchestratorSession()
+    session.warm()
+    return session
+
+# Session dựng sẵn cho session mới đầu tiên của UI/API (warm model, MCP pool)
+session_template = preload_hook("session_template", lambda: orchestrator_sessions.prewarm(create_warm_session))
+
+# Thành phần --preload khởi tạo: CLI dùng `orchestrator`, UI/API dùng session factory
+CLI_PRELOAD = ["pre_router", "orchestrator", "orchestrator_specialists"]
+SESSION_PRELOAD = ["pre_router", "session_template"]
+
+def get_session_orchestrator(session_id: str) -> OrchestratorSession:
+    """Get the orchestrator owned by a session (created on first use, evicted when idle)"""
+    return orchestrator_sessions.get(session_id)
+
+def get_router_stats() -> Dict[str, Any]:
+    """Get pre-router hit rate and latency (empty until the router is used)"""
+    return pre_router.get_stats() if pre_router.is_loaded else {}
 
 async def process_streaming_response(user_input: str):
     """Process user input with streaming response"""
@@ -134,6 +647,19 @@ async def test_streaming():
 
 def main():
     """Test Agent Account get resource on Cloud AWS"""
+    parser = argparse.ArgumentParser(description="AWS Agent Orchestrator")
+    parser.add_argument(
+        "--preload",
+        action="store_true",
+        help="Khởi tạo orchestrator, sub-agents và MCP tools ngay khi start thay vì lúc dùng lần đầu"
+    )
+    args = parser.parse_args()
+    
+    if args.preload or config.ORCHESTRATOR_PRELOAD:
+        print("⏳ Preloading agents...")
+        preload(CLI_PRELOAD)
+        print_startup_report()
+    
     print("Nhập câu hỏi về AWS (hoặc 'quit' để thoát):")
     
     while True:
@@ -141,6 +667,7 @@ def main():
             user_input = input("\n❓ Câu hỏi: ").strip()
             
             if user_input.lower() in ['quit', 'exit', 'q', 'thoát']:
+                print_startup_report()
                 print("👋 Tạm biệt!")
                 break
                 
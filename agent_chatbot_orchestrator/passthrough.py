@@ -0,0 +1,91 @@
+"""Passthrough: return a specialist's answer as the orchestrator's final answer"""
+
+import logging
+import threading
+from typing import Any, Dict, Iterable, List, Optional
+
+from strands.hooks import AfterToolsEvent, HookProvider, HookRegistry
+
+from src.agents.memory import estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+_stats = {
+    "passthrough_turns": 0,
+    "direct_routes": 0,
+    "skipped_errors": 0,
+    "output_tokens_saved": 0
+}
+
+
+def record_saved(answer: str, direct_route: bool = False):
+    """
+    Count a turn whose answer was not re-generated by the orchestrator model
+
+    Args:
+        answer: Specialist answer returned unchanged
+        direct_route: True when the pre-router skipped the orchestrator entirely
+    """
+    with _lock:
+        _stats["direct_routes" if direct_route else "passthrough_turns"] += 1
+        _stats["output_tokens_saved"] += estimate_tokens(answer)
+
+
+def get_passthrough_stats() -> Dict[str, Any]:
+    """Get passthrough counters (output tokens saved are estimated, ~4 chars/token)"""
+    with _lock:
+        return dict(_stats)
+
+
+class PassthroughHook(HookProvider):
+    """
+    End the orchestrator turn with the specialist output
+
+    After a batch of tool calls that all belong to `tool_names` and all
+    succeeded, the tool results become the final assistant message
+    (AfterToolsEvent.end_turn) so the model is not called a second time just
+    to repeat the answer. If any tool failed, or another tool was called, the
+    model continues as usual.
+    """
+
+    def __init__(self, tool_names: Iterable[str]):
+        self.tool_names = set(tool_names)
+
+    def register_hooks(self, registry: HookRegistry, **kwargs: Any) -> None:
+        registry.add_callback(AfterToolsEvent, self.on_after_tools)
+
+    def _tool_uses(self, agent) -> List[Dict[str, Any]]:
+        # The assistant message that requested this batch is the last one in history
+        for message in reversed(agent.messages):
+            if message.get("role") == "assistant":
+                return [block["toolUse"] for block in message.get("content", []) if "toolUse" in block]
+        return []
+
+    def final_answer(self, event: AfterToolsEvent) -> Optional[str]:
+        """Answer to return directly, or None to let the model continue"""
+        tool_uses = self._tool_uses(event.agent)
+        if not tool_uses or any(tool_use.get("name") not in self.tool_names for tool_use in tool_uses):
+            return None
+
+        answers = []
+        for block in event.message.get("content", []):
+            tool_result = block.get("toolResult")
+            if tool_result is None:
+                continue
+            if tool_result.get("status") != "success":
+                with _lock:
+                    _stats["skipped_errors"] += 1
+                return None
+            answers.append("".join(item.get("text", "") for item in tool_result.get("content", [])))
+
+        answer = "\n\n".join(text for text in answers if text)
+        return answer or None
+
+    def on_after_tools(self, event: AfterToolsEvent) -> None:
+        answer = self.final_answer(event)
+        if answer is None:
+            return
+        event.end_turn = answer
+        record_saved(answer)
+        logger.info(f"Passthrough: returned specialist output directly (~{estimate_tokens(answer)} output tokens saved)")
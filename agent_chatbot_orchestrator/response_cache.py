@@ -0,0 +1,245 @@
+"""Response cache for the orchestrator and specialist agents"""
+
+import logging
+import math
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import config
+from agent_chatbot_orchestrator.router import normalize_text
+
+logger = logging.getLogger(__name__)
+
+Embedder = Callable[[str], List[float]]
+
+
+def normalize_prompt(prompt: str) -> str:
+    """Cache key text: lower-case, no diacritics, no punctuation, single spaces"""
+    text = normalize_text(prompt)
+    text = re.sub(r"[^\w\s]", " ", text)
+    return re.sub(r"\s+", " ", text).strip()
+
+
+def _cosine(a: List[float], b: List[float]) -> float:
+    dot = sum(x * y for x, y in zip(a, b))
+    norm = math.sqrt(sum(x * x for x in a)) * math.sqrt(sum(y * y for y in b))
+    return dot / norm if norm else 0.0
+
+
+def default_ttls() -> Dict[str, float]:
+    """TTL (seconds) per agent: live account data expires fast, documentation slowly"""
+    return {
+        "account": config.RESPONSE_CACHE_TTL_ACCOUNT,
+        "architect": config.RESPONSE_CACHE_TTL_ARCHITECT,
+        "docs": config.RESPONSE_CACHE_TTL_DOCS,
+        "orchestrator": config.RESPONSE_CACHE_TTL_ORCHESTRATOR
+    }
+
+
+def create_local_embedder(model_name: Optional[str] = None) -> Embedder:
+    """
+    Local sentence embedder for similarity matching (optional dependency)
+
+    The sentence-transformers model is loaded on first use; ImportError is
+    raised then if the package is not installed.
+
+    Args:
+        model_name: sentence-transformers model (default: config.RESPONSE_CACHE_EMBEDDER)
+
+    Returns:
+        Embedder: text -> normalized vector
+    """
+    model_name = model_name or config.RESPONSE_CACHE_EMBEDDER
+    state: Dict[str, Any] = {}
+    lock = threading.Lock()
+
+    def embed(text: str) -> List[float]:
+        with lock:
+            if "model" not in state:
+                from sentence_transformers import SentenceTransformer
+                state["model"] = SentenceTransformer(model_name)
+        return state["model"].encode(text, normalize_embeddings=True).tolist()
+
+    return embed
+
+
+class ResponseCache:
+    """
+    LRU cache of agent answers keyed by (agent, normalized prompt)
+
+    Lookups first try the exact normalized prompt. With an embedder, a miss
+    falls back to the most similar cached prompt of the same agent whose
+    cosine similarity reaches `similarity_threshold`. Entries expire after the
+    agent's TTL; the total number of entries is bounded by `max_entries`.
+    """
+
+    def __init__(
+        self,
+        max_entries: Optional[int] = None,
+        ttls: Optional[Dict[str, float]] = None,
+        default_ttl: Optional[float] = None,
+        embedder: Optional[Embedder] = None,
+        similarity_threshold: Optional[float] = None,
+        enabled: Optional[bool] = None
+    ):
+        self.max_entries = max_entries or config.RESPONSE_CACHE_MAX_ENTRIES
+        self.ttls = ttls if ttls is not None else default_ttls()
+        self.default_ttl = default_ttl if default_ttl is not None else config.RESPONSE_CACHE_TTL_DEFAULT
+        self.embedder = embedder
+        self.similarity_threshold = (
+            similarity_threshold if similarity_threshold is not None else config.RESPONSE_CACHE_SIMILARITY
+        )
+        self.enabled = config.RESPONSE_CACHE_ENABLED if enabled is None else enabled
+        # (agent, normalized prompt) -> {"response", "vector", "expires_at"}
+        self._entries: "OrderedDict[Tuple[str, str], Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats: Dict[str, Dict[str, int]] = {}
+
+    def _count(self, agent: str, key: str):
+        agent_stats = self._stats.setdefault(
+            agent, {"hits": 0, "semantic_hits": 0, "misses": 0, "stores": 0, "expired": 0, "evicted": 0}
+        )
+        agent_stats[key] += 1
+
+    def ttl_for(self, agent: str) -> float:
+        return self.ttls.get(agent, self.default_ttl)
+
+    def _embed(self, text: str) -> Optional[List[float]]:
+        if not self.embedder:
+            return None
+        try:
+            return self.embedder(text)
+        except ImportError:
+            logger.warning("sentence-transformers not installed, response cache uses exact matching only")
+            self.embedder = None
+            return None
+        except Exception as e:
+            logger.warning(f"Response cache embedder failed: {e}")
+            return None
+
+    def get(self, agent: str, prompt: str) -> Optional[str]:
+        """
+        Look up a cached answer
+
+        Args:
+            agent: Agent identity ("orchestrator", "account", "architect", "docs", ...)
+            prompt: Prompt sent to that agent
+
+        Returns:
+            Optional[str]: Cached answer, or None on a miss
+        """
+        if not self.enabled or self.ttl_for(agent) <= 0:
+            return None
+
+        key = (agent, normalize_prompt(prompt))
+        now = time.monotonic()
+        with self._lock:
+            self._evict_expired(now)
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self._count(agent, "hits")
+                return entry["response"]
+            candidates = [
+                (cached_key, cached["vector"]) for cached_key, cached in self._entries.items()
+                if cached_key[0] == agent and cached["vector"] is not None
+            ]
+
+        vector = self._embed(key[1]) if candidates else None
+        with self._lock:
+            if vector is not None:
+                best_key, best_score = None, 0.0
+                for cached_key, cached_vector in candidates:
+                    score = _cosine(vector, cached_vector)
+                    if score > best_score:
+                        best_key, best_score = cached_key, score
+                entry = self._entries.get(best_key) if best_score >= self.similarity_threshold else None
+                if entry is not None:
+                    self._entries.move_to_end(best_key)
+                    self._count(agent, "semantic_hits")
+                    return entry["response"]
+            self._count(agent, "misses")
+        return None
+
+    def contains(self, agent: str, prompt: str) -> bool:
+        """True if an unexpired answer is cached for the exact normalized prompt (no stats, no embedding)"""
+        if not self.enabled or self.ttl_for(agent) <= 0:
+            return False
+        with self._lock:
+            entry = self._entries.get((agent, normalize_prompt(prompt)))
+            return entry is not None and entry["expires_at"] > time.monotonic()
+
+    def put(self, agent: str, prompt: str, response: str, ttl: Optional[float] = None):
+        """
+        Store an answer (errors and empty answers should not be passed in)
+
+        Args:
+            agent: Agent identity
+            prompt: Prompt sent to that agent
+            response: Answer to cache
+            ttl: Seconds before expiry (default: the agent's TTL)
+        """
+        ttl = self.ttl_for(agent) if ttl is None else ttl
+        if not self.enabled or ttl <= 0 or not response:
+            return
+
+        normalized = normalize_prompt(prompt)
+        vector = self._embed(normalized)
+        with self._lock:
+            key = (agent, normalized)
+            self._entries[key] = {
+                "response": response,
+                "vector": vector,
+                "expires_at": time.monotonic() + ttl
+            }
+            self._entries.move_to_end(key)
+            self._count(agent, "stores")
+
+            while len(self._entries) > self.max_entries:
+                (evicted_agent, _), _ = self._entries.popitem(last=False)
+                self._count(evicted_agent, "evicted")
+
+    def _evict_expired(self, now: float):
+        expired = [key for key, entry in self._entries.items() if entry["expires_at"] <= now]
+        for key in expired:
+            del self._entries[key]
+            self._count(key[0], "expired")
+
+    def invalidate(self, agent: Optional[str] = None):
+        """Drop all entries (of one agent, or of every agent)"""
+        with self._lock:
+            for key in [key for key in self._entries if agent is None or key[0] == agent]:
+                del self._entries[key]
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get hit/miss counters per agent and overall hit rate"""
+        with self._lock:
+            by_agent = {agent: dict(counts) for agent, counts in self._stats.items()}
+            entries = len(self._entries)
+        hits = sum(counts["hits"] + counts["semantic_hits"] for counts in by_agent.values())
+        lookups = hits + sum(counts["misses"] for counts in by_agent.values())
+        return {
+            "enabled": self.enabled,
+            "entries": entries,
+            "max_entries": self.max_entries,
+            "semantic": self.embedder is not None,
+            "hit_rate": round(hits / lookups, 3) if lookups else 0.0,
+            "by_agent": by_agent
+        }
+
+
+def create_response_cache() -> ResponseCache:
+    """Response cache from config (with local embeddings when RESPONSE_CACHE_EMBEDDER is set)"""
+    embedder = create_local_embedder() if config.RESPONSE_CACHE_EMBEDDER else None
+    return ResponseCache(embedder=embedder)
+
+
+response_cache = create_response_cache()
+
+
+def get_response_cache_stats() -> Dict[str, Any]:
+    """Get response cache metrics"""
+    return response_cache.get_stats()
@@ -0,0 +1,225 @@
+"""Fast deterministic pre-router: send obvious queries straight to a specialist"""
+
+import json
+import logging
+import re
+import threading
+import time
+import unicodedata
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+import config
+
+logger = logging.getLogger(__name__)
+
+# Patterns are matched against lower-cased text with Vietnamese diacritics
+# removed, so "vẽ sơ đồ" and "ve so do" hit the same rule. A pattern is either
+# a regex (weight 1) or (regex, weight): weight 2 marks phrases that identify
+# the specialist on their own; a lone weight-1 match is never enough to skip
+# the LLM router.
+DEFAULT_RULES: Dict[str, List[Union[str, Tuple[str, int]]]] = {
+    "account": [
+        (r"\b(tai khoan|account) (cua toi|hien tai)\b", 2),
+        (r"\bmy (\w+ )?(account|resources?|instances?|buckets?|functions?|databases?|vpcs?)\b", 2),
+        r"\b(in|trong) (my|cua toi|account)\b",
+        r"\b(resources?|tai nguyen|instances?|buckets?) .*(cua toi|hien co|dang co|dang chay)\b",
+        r"\b(dang chay|running|trang thai|status of)\b",
+        r"\b(co nhung|how many|bao nhieu) .*(resource|tai nguyen|instance|bucket|lambda|ec2|s3|rds)",
+    ],
+    "architect": [
+        (r"\b(ve|tao|draw|generate|create) .*(so do|diagram)\b", 2),
+        r"\b(so do|diagram)\b",
+        r"\b(kien truc|architecture)\b",
+        r"\b(thiet ke|design) .*(kien truc|architecture|he thong|system|giai phap|solution)\b",
+    ],
+    "docs": [
+        r"\b(la gi|what is|what are)\b",
+        r"\b(how (do|to|can)|lam (the nao|sao)|cach (nao|de|lam|cau hinh|thiet lap|su dung))\b",
+        r"\b(huong dan|tai lieu|documentation|docs|guide)\b",
+        r"\b(best practices?|giai thich|explain|khac nhau|differences?|so sanh|compare)\b",
+        r"\b(gioi han|limits?|quotas?)\b",
+    ],
+}
+
+
+CONJUNCTION = re.compile(r"\b(and|then|also|va|kem|dong thoi|sau do)\b")
+
+
+def normalize_text(text: str) -> str:
+    """Lower-case, strip Vietnamese diacritics and collapse whitespace"""
+    text = text.lower().replace("đ", "d")
+    text = unicodedata.normalize("NFD", text)
+    text = "".join(ch for ch in text if unicodedata.category(ch) != "Mn")
+    return re.sub(r"\s+", " ", text).strip()
+
+
+class PreRouter:
+    """
+    Classify a query into specialists without calling the orchestrator LLM
+
+    Rules score each specialist by the weights of the patterns it matches. A
+    single specialist scoring 2 or more gives high confidence; several matching
+    specialists mean a multi-intent question (fan-out). When the rules are
+    not confident, an optional small-model classifier is asked. Anything
+    still below the threshold falls back to the LLM router.
+    """
+
+    def __init__(
+        self,
+        rules: Optional[Dict[str, List[Union[str, Tuple[str, int]]]]] = None,
+        classifier: Optional[Callable[[str], Tuple[List[str], float]]] = None,
+        threshold: Optional[float] = None
+    ):
+        self.rules = {
+            name: [
+                (re.compile(pattern), 1) if isinstance(pattern, str) else (re.compile(pattern[0]), pattern[1])
+                for pattern in patterns
+            ]
+            for name, patterns in (rules or DEFAULT_RULES).items()
+        }
+        self.classifier = classifier
+        self.threshold = threshold if threshold is not None else config.ROUTER_CONFIDENCE_THRESHOLD
+        self._lock = threading.Lock()
+        self._stats = {
+            "total": 0,
+            "hits": 0,
+            "fallbacks": 0,
+            "rule_hits": 0,
+            "classifier_hits": 0,
+            "classifier_errors": 0,
+            "latency_ms_total": 0.0,
+            "by_specialist": {}
+        }
+
+    def score(self, text: str) -> Dict[str, int]:
+        """Summed weight of matched patterns per specialist"""
+        normalized = normalize_text(text)
+        return {
+            name: sum(weight for pattern, weight in patterns if pattern.search(normalized))
+            for name, patterns in self.rules.items()
+        }
+
+    def _rule_decision(self, text: str) -> Tuple[List[str], float]:
+        scores = self.score(text)
+        matched = sorted((name for name, score in scores.items() if score), key=lambda name: -scores[name])
+
+        if not matched:
+            return [], 0.0
+        if len(matched) == 1:
+            # Score 1 -> 0.65 (below the default threshold), 2 -> 0.85, 3+ -> 0.95
+            return matched, min(0.95, 0.45 + 0.2 * scores[matched[0]])
+
+        # Several specialists: multi-intent when each one matched strongly, or when
+        # the query joins two asks ("... and ...", "... và ...") and one of them is
+        # strong; otherwise let the LLM decide
+        if all(scores[name] >= 2 for name in matched):
+            return matched, 0.85
+        if scores[matched[0]] >= 2 and CONJUNCTION.search(normalize_text(text)):
+            return matched, 0.8
+        return matched, 0.4
+
+    def route(self, text: str) -> Dict[str, Any]:
+        """
+        Decide where a query should go
+
+        Args:
+            text: User query
+
+        Returns:
+            Dict[str, Any]: {"specialists": [...], "confidence": float,
+                "source": "rules" | "classifier" | "llm", "latency_ms": float}
+                source "llm" means: fall back to the orchestrator LLM
+        """
+        started = time.perf_counter()
+        specialists, confidence = self._rule_decision(text)
+        source = "rules"
+
+        if confidence < self.threshold and self.classifier:
+            try:
+                specialists, confidence = self.classifier(text)
+                specialists = [name for name in specialists if name in self.rules]
+                source = "classifier"
+            except Exception as e:
+                logger.warning(f"Router classifier failed: {e}")
+                with self._lock:
+                    self._stats["classifier_errors"] += 1
+
+        if confidence < self.threshold or not specialists:
+            source = "llm"
+
+        latency_ms = (time.perf_counter() - started) * 1000
+        self._record(source, specialists, latency_ms)
+        return {
+            "specialists": specialists,
+            "confidence": round(confidence, 2),
+            "source": source,
+            "latency_ms": round(latency_ms, 2)
+        }
+
+    def _record(self, source: str, specialists: List[str], latency_ms: float):
+        with self._lock:
+            self._stats["total"] += 1
+            self._stats["latency_ms_total"] += latency_ms
+            if source == "llm":
+                self._stats["fallbacks"] += 1
+                return
+            self._stats["hits"] += 1
+            self._stats[f"{'rule' if source == 'rules' else 'classifier'}_hits"] += 1
+            key = "+".join(specialists)
+            self._stats["by_specialist"][key] = self._stats["by_specialist"].get(key, 0) + 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get hit rate and latency counters"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats["by_specialist"] = dict(self._stats["by_specialist"])
+        total = stats["total"]
+        stats["hit_rate"] = round(stats["hits"] / total, 3) if total else 0.0
+        stats["avg_latency_ms"] = round(stats.pop("latency_ms_total") / total, 3) if total else 0.0
+        return stats
+
+
+CLASSIFIER_PROMPT = """Classify the AWS question into one or more specialists:
+- "account": the user's own AWS account resources (list, status, usage)
+- "architect": architecture design or diagrams
+- "docs": AWS documentation, concepts, how-to, best practices
+
+Reply with JSON only: {"specialists": ["..."], "confidence": 0.0-1.0}"""
+
+
+def create_llm_classifier(model_id: Optional[str] = None) -> Callable[[str], Tuple[List[str], float]]:
+    """
+    Build a small-model classifier for the pre-router
+
+    Args:
+        model_id: Bedrock model ID of a small, fast model (default: config.ROUTER_CLASSIFIER_MODEL)
+
+    Returns:
+        Callable: text -> (specialists, confidence)
+    """
+    from bedrock.claude import ClaudeClient
+
+    model_id = model_id or config.ROUTER_CLASSIFIER_MODEL
+    client = ClaudeClient()
+
+    def classify(text: str) -> Tuple[List[str], float]:
+        reply = client.chat(
+            message=text,
+            model_id=model_id,
+            max_tokens=100,
+            temperature=0.0,
+            system_prompt=CLASSIFIER_PROMPT
+        )
+        match = re.search(r"\{.*\}", reply, re.DOTALL)
+        if not match:
+            raise ValueError(f"Unexpected classifier reply: {reply[:200]}")
+        data = json.loads(match.group(0))
+        return list(data.get("specialists", [])), float(data.get("confidence", 0.0))
+
+    return classify
+
+
+def create_default_router() -> PreRouter:
+    """Pre-router with the default rules (+ small-model classifier if configured)"""
+    classifier = create_llm_classifier() if config.ROUTER_CLASSIFIER_MODEL else None
+    return PreRouter(classifier=classifier)
@@ -0,0 +1,142 @@
+"""Session-scoped agent instances with LRU and idle-TTL eviction"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional
+
+import config
+
+
+class AgentSessionManager:
+    """
+    Hand out one agent per session id
+
+    Each session gets its own agent built by `factory` (same model, prompt and
+    tools, separate message history). Sessions idle for longer than
+    `ttl_seconds` are dropped, and when more than `max_sessions` are alive the
+    least recently used one is evicted. prewarm() builds one spare agent up
+    front that the next new session takes over instead of waiting for the factory.
+    """
+
+    def __init__(
+        self,
+        factory: Callable[[], Any],
+        max_sessions: Optional[int] = None,
+        ttl_seconds: Optional[float] = None
+    ):
+        self._factory = factory
+        self.max_sessions = max_sessions or config.ORCHESTRATOR_MAX_SESSIONS
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else config.ORCHESTRATOR_SESSION_TTL
+        # session_id -> (agent, last_used)
+        self._sessions: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._spare: Any = None
+        self._created = 0
+        self._evicted_lru = 0
+        self._evicted_ttl = 0
+
+    def get(self, session_id: str) -> Any:
+        """
+        Get the agent of a session, creating it if needed
+
+        Args:
+            session_id: Session identifier (Streamlit session, API user, ...)
+
+        Returns:
+            Agent owned by this session
+        """
+        now = time.monotonic()
+        with self._lock:
+            self._evict_expired(now)
+
+            entry = self._sessions.get(session_id)
+            if entry is not None:
+                self._sessions[session_id] = (entry[0], now)
+                self._sessions.move_to_end(session_id)
+                return entry[0]
+
+            agent, self._spare = self._spare, None
+
+        if agent is None:
+            # Build outside the lock: agent construction may be slow
+            agent = self._factory()
+
+        with self._lock:
+            entry = self._sessions.get(session_id)
+            if entry is not None:
+                # Another thread created it first: keep ours as the spare
+                if self._spare is None:
+                    self._spare = agent
+                agent = entry[0]
+            else:
+                self._created += 1
+            self._sessions[session_id] = (agent, now)
+            self._sessions.move_to_end(session_id)
+
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+                self._evicted_lru += 1
+
+        return agent
+
+    def prewarm(self, factory: Optional[Callable[[], Any]] = None):
+        """
+        Build a spare agent for the next new session
+
+        Args:
+            factory: Builds the spare (default: the session factory), e.g. one
+                that also initializes the agent's sub-agents and tools
+        """
+        agent = (factory or self._factory)()
+        with self._lock:
+            if self._spare is None:
+                self._spare = agent
+
+    def peek(self, session_id: str) -> Any:
+        """Get the agent of a session without creating it or refreshing its idle time (None if absent)"""
+        with self._lock:
+            entry = self._sessions.get(session_id)
+            return entry[0] if entry is not None else None
+
+    def remove(self, session_id: str):
+        """Drop a session and its conversation history"""
+        with self._lock:
+            self._sessions.pop(session_id, None)
+
+    def evict_expired(self):
+        """Drop sessions idle for longer than the TTL"""
+        with self._lock:
+            self._evict_expired(time.monotonic())
+
+    def _evict_expired(self, now: float):
+        if not self.ttl_seconds:
+            return
+        # OrderedDict is kept in last-used order, so expired sessions are at the front
+        while self._sessions:
+            session_id, (_, last_used) = next(iter(self._sessions.items()))
+            if now - last_used <= self.ttl_seconds:
+                break
+            self._sessions.popitem(last=False)
+            self._evicted_ttl += 1
+
+    def __contains__(self, session_id: str) -> bool:
+        with self._lock:
+            return session_id in self._sessions
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._sessions)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get session counts and eviction counters"""
+        with self._lock:
+            return {
+                "active_sessions": len(self._sessions),
+                "max_sessions": self.max_sessions,
+                "ttl_seconds": self.ttl_seconds,
+                "created": self._created,
+                "spare_ready": self._spare is not None,
+                "evicted_lru": self._evicted_lru,
+                "evicted_ttl": self._evicted_ttl
+            }
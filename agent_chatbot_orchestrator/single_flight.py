@@ -0,0 +1,203 @@
+"""Single-flight: concurrent identical requests share one in-flight execution"""
+
+import asyncio
+import concurrent.futures
+import logging
+import threading
+from contextlib import aclosing
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Set, Tuple
+
+from agent_chatbot_orchestrator.response_cache import normalize_prompt
+
+logger = logging.getLogger(__name__)
+
+
+class FlightAborted(RuntimeError):
+    """The shared execution was cancelled while followers were still listening"""
+
+
+class _Flight:
+    """
+    One in-flight execution and the events it produced so far
+
+    Subscribers may live on different event loops (Streamlit runs one
+    asyncio.run per request), so they are woken with call_soon_threadsafe.
+    """
+
+    def __init__(self):
+        self.events: List[Any] = []
+        self.done = False
+        self.error: Optional[BaseException] = None
+        self.subscribers = 0
+        self.task: Optional[concurrent.futures.Future] = None
+        self._waiters: Set[Tuple[asyncio.AbstractEventLoop, asyncio.Event]] = set()
+        self._lock = threading.Lock()
+
+    def publish(self, event: Any = None, done: bool = False, error: Optional[BaseException] = None):
+        with self._lock:
+            if done:
+                self.done = True
+                self.error = error
+            else:
+                self.events.append(event)
+            waiters = list(self._waiters)
+        for loop, wake in waiters:
+            try:
+                loop.call_soon_threadsafe(wake.set)
+            except RuntimeError:
+                # Loop của subscriber đã đóng
+                pass
+
+    async def follow(self) -> AsyncIterator[Any]:
+        """Replay the events produced so far, then yield new ones until the execution ends"""
+        waiter = (asyncio.get_running_loop(), asyncio.Event())
+        with self._lock:
+            self._waiters.add(waiter)
+        index = 0
+        try:
+            while True:
+                with self._lock:
+                    pending = self.events[index:]
+                    done, error = self.done, self.error
+                    # Clear trong lock: publish sau lần đọc này chắc chắn set lại
+                    waiter[1].clear()
+                for event in pending:
+                    yield event
+                index += len(pending)
+                if done:
+                    if error is not None:
+                        raise error
+                    return
+                await waiter[1].wait()
+        finally:
+            with self._lock:
+                self._waiters.discard(waiter)
+
+
+class SingleFlight:
+    """
+    Coalesce concurrent identical requests into one execution
+
+    Requests are identical when they target the same agent with the same
+    normalized prompt. The first request (leader) starts the execution;
+    requests arriving while it runs (followers) receive every event it
+    produced, replayed from the start, then the live ones. The execution
+    keeps running while at least one subscriber is listening, so a leader
+    that disconnects does not break the followers.
+
+    The execution runs on a dedicated event loop thread, not on the leader's
+    loop: Streamlit ends the leader's asyncio.run when its script run ends,
+    which would cancel the execution under the followers.
+    """
+
+    def __init__(self):
+        self._flights: Dict[Tuple[str, str], _Flight] = {}
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._stats = {"executions": 0, "shared": 0, "abandoned": 0, "aborted": 0}
+
+    def _runner_loop(self) -> asyncio.AbstractEventLoop:
+        """Event loop (background thread) running the shared executions, started on first use"""
+        with self._lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                threading.Thread(target=loop.run_forever, name="single-flight", daemon=True).start()
+                self._loop = loop
+            return self._loop
+
+    def subscribe(
+        self,
+        agent: str,
+        prompt: str,
+        factory: Callable[[], AsyncIterator[Any]]
+    ) -> Tuple[AsyncIterator[Any], bool]:
+        """
+        Join the in-flight execution of (agent, prompt) or start a new one
+
+        Args:
+            agent: Agent name (part of the key)
+            prompt: User prompt (normalized for the key)
+            factory: Creates the event stream when this request is the leader
+
+        Returns:
+            Tuple[AsyncIterator, bool]: Event stream, True if this request started the execution
+        """
+        key = (agent, normalize_prompt(prompt))
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+                self._stats["executions"] += 1
+            else:
+                self._stats["shared"] += 1
+                logger.info("Single-flight: joined in-flight %s request (%s)", agent, key[1][:60])
+            flight.subscribers += 1
+        if leader:
+            flight.task = asyncio.run_coroutine_threadsafe(
+                self._produce(key, flight, factory()), self._runner_loop()
+            )
+        return self._listen(flight), leader
+
+    def in_flight(self, agent: str, prompt: str) -> bool:
+        """True if a request would join an execution already running"""
+        with self._lock:
+            return (agent, normalize_prompt(prompt)) in self._flights
+
+    async def _produce(self, key: Tuple[str, str], flight: _Flight, events: AsyncIterator[Any]):
+        error: Optional[BaseException] = None
+        try:
+            async with aclosing(events):
+                async for event in events:
+                    flight.publish(event)
+        except asyncio.CancelledError:
+            # Follower không bị huỷ: nhận lỗi thường thay vì CancelledError
+            error = FlightAborted("Shared execution was cancelled")
+        except BaseException as e:
+            error = e
+            if not isinstance(e, Exception):
+                raise
+        finally:
+            with self._lock:
+                if self._flights.get(key) is flight:
+                    del self._flights[key]
+                if isinstance(error, FlightAborted) and flight.subscribers:
+                    self._stats["aborted"] += 1
+            flight.publish(done=True, error=error)
+
+    async def _listen(self, flight: _Flight) -> AsyncIterator[Any]:
+        try:
+            async with aclosing(flight.follow()) as events:
+                async for event in events:
+                    yield event
+        finally:
+            with self._lock:
+                flight.subscribers -= 1
+                abandoned = flight.subscribers == 0 and not flight.done
+                if abandoned:
+                    self._stats["abandoned"] += 1
+                    # Request mới không được nối vào execution sắp bị huỷ
+                    for key, current in list(self._flights.items()):
+                        if current is flight:
+                            del self._flights[key]
+            if abandoned and flight.task is not None:
+                # Không còn ai nghe: huỷ execution (Future.cancel huỷ task trên loop riêng)
+                flight.task.cancel()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get executions started, requests served by a shared execution and in-flight count"""
+        with self._lock:
+            total = self._stats["executions"] + self._stats["shared"]
+            return {
+                **self._stats,
+                "in_flight": len(self._flights),
+                "shared_rate": round(self._stats["shared"] / total, 3) if total else 0.0
+            }
+
+
+single_flight = SingleFlight()
+
+
+def get_single_flight_stats() -> Dict[str, Any]:
+    """Get single-flight counters"""
+    return single_flight.get_stats()
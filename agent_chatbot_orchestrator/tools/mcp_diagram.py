@@ -1,71 +1,42 @@
-import platform
 import os
 import sys
-import atexit
-from mcp import stdio_client, StdioServerParameters
-from strands.tools.mcp import MCPClient
+from mcp import stdio_client
+
+import config
+from agent_chatbot_orchestrator.tools.mcp_launcher import get_server_parameters
+from agent_chatbot_orchestrator.tools.mcp_pool import mcp_pool
 
 # Detect platform
 is_windows = sys.platform.startswith('win')
-print(f"Detected platform: {'Windows' if is_windows else 'Non-Windows (Linux/macOS)'}")
 
-# Create MCP client based on platform
-try:
-    if is_windows:
-        # Windows-specific configuration
-        print("Using Windows-specific MCP configuration...")
-        aws_diagram_mcp_client = MCPClient(lambda: stdio_client(
-            StdioServerParameters(
-                command="uv",
-                args=["tool", "run", "--from", "awslabs.aws-diagram-mcp-server@latest", "awslabs.aws-diagram-mcp-server.exe"],
-                env={
-                    "FASTMCP_LOG_LEVEL": "ERROR",
-                    "AWS_PROFILE": os.getenv("AWS_PROFILE", "default"),
-                    "AWS_REGION": os.getenv("AWS_REGION", "us-east-1")
-                }
-            )
-        ))
-    else:
-        # Non-Windows configuration (Linux/macOS)
-        print("Using standard MCP configuration for Linux/macOS...")
-        aws_diagram_mcp_client = MCPClient(lambda: stdio_client(
-            StdioServerParameters(
-                command="uvx", 
-                args=["awslabs.aws-diagram-mcp-server@latest"],
-                env={
-                    "FASTMCP_LOG_LEVEL": "ERROR",
-                    "AWS_PROFILE": os.getenv("AWS_PROFILE", "default"),
-                    "AWS_REGION": os.getenv("AWS_REGION", "us-east-1")
-                }
-            )
-        ))
+SERVER_NAME = "aws_diagram"
+_resolved_parameters = None
+
+def _server_parameters():
+    """Resolve the pinned AWS Diagram MCP server (installed once into the launcher cache)"""
+    global _resolved_parameters
+    _resolved_parameters = get_server_parameters(
+        "awslabs.aws-diagram-mcp-server",
+        version=config.MCP_DIAGRAM_SERVER_VERSION,
+        env={
+            "FASTMCP_LOG_LEVEL": "ERROR",
+            "AWS_PROFILE": os.getenv("AWS_PROFILE", "default"),
+            "AWS_REGION": os.getenv("AWS_REGION", "us-east-1")
+        }
+    )
+    return _resolved_parameters
+
+def _create_transport():
+    """Create stdio transport for the AWS Diagram MCP server"""
+    # Reuse what prepare() resolved before this spawn instead of resolving twice
+    return stdio_client(_resolved_parameters or _server_parameters())
 
-    # Start MCP client
-    print("Starting AWS Diagram MCP client...")
-    aws_diagram_mcp_client.start()
-    print("AWS Diagram MCP client started successfully.")
-    
-except Exception as e:
-    error_message = str(e)
-    print(f"Error initializing MCP client: {error_message}")
-    
-    if is_windows:
-        print("\nWindows-specific troubleshooting tips:")
-        print("1. Ensure you have installed the 'uv' package: pip install uv")
-        print("2. Check if you have proper permissions to execute the commands")
-        print("3. Verify your network connection and firewall settings")
-    else:
-        print("\nTroubleshooting tips:")
-        print("1. Ensure you have installed uvx: pip install uv")
-        print("2. Check your network connection")
-    
-    # Re-raise the exception
-    raise
+mcp_pool.register(SERVER_NAME, _create_transport, prepare=_server_parameters)
 
 def get_diagram_tools():
-    """Get AWS diagram tools from MCP server"""
+    """Get AWS diagram tools from the pooled MCP server (kept alive for the whole process)"""
     try:
-        tools = aws_diagram_mcp_client.list_tools_sync()
+        tools = mcp_pool.get_tools(SERVER_NAME)
         print(f"🎨 Diagram MCP Tools found: {len(tools) if tools else 0}")
         
         if tools:
@@ -75,18 +46,15 @@ def get_diagram_tools():
         return tools
     except Exception as e:
         print(f"❌ Error getting diagram tools: {e}")
+        
+        if is_windows:
+            print("\nWindows-specific troubleshooting tips:")
+            print("1. Ensure you have installed the 'uv' package: pip install uv")
+            print("2. Check if you have proper permissions to execute the commands")
+            print("3. Verify your network connection and firewall settings")
+        else:
+            print("\nTroubleshooting tips:")
+            print("1. Ensure you have installed uvx: pip install uv")
+            print("2. Check your network connection")
+        
         return []
-
-# Export the client for use in other modules
-stdio_mcp_client = aws_diagram_mcp_client
-
-# Register cleanup handler
-def cleanup():
-    try:
-        if hasattr(aws_diagram_mcp_client, '__exit__'):
-            aws_diagram_mcp_client.__exit__(None, None, None)
-        print("AWS Diagram MCP client stopped")
-    except Exception as e:
-        print(f"Error stopping AWS Diagram MCP client: {e}")
-
-atexit.register(cleanup)
@@ -1,39 +1,40 @@
-import platform
-from mcp import stdio_client, StdioServerParameters
-from strands import Agent
-from strands.tools.mcp import MCPClient
-
-stdio_mcp_client = MCPClient(lambda: stdio_client(
-    StdioServerParameters(
-        command="uvx", 
-        args=["awslabs.aws-documentation-mcp-server@latest"]
+from mcp import stdio_client
+
+import config
+from agent_chatbot_orchestrator.tools.mcp_launcher import get_server_parameters
+from agent_chatbot_orchestrator.tools.mcp_pool import mcp_pool
+
+SERVER_NAME = "aws_docs"
+_resolved_parameters = None
+
+
+def _server_parameters():
+    """Resolve the pinned AWS Documentation MCP server (installed once into the launcher cache)"""
+    global _resolved_parameters
+    _resolved_parameters = get_server_parameters(
+        "awslabs.aws-documentation-mcp-server",
+        version=config.MCP_DOCS_SERVER_VERSION
     )
-))
-
-if platform.system() == "Windows":
-    stdio_mcp_client = MCPClient(lambda: stdio_client(
-        StdioServerParameters(
-            command="uvx", 
-            args=[
-                "--from", 
-                "awslabs.aws-documentation-mcp-server@latest", 
-                "awslabs.aws-documentation-mcp-server.exe"
-            ]
-        )
-    ))
+    return _resolved_parameters
+
+def _create_transport():
+    """Create stdio transport for the AWS Documentation MCP server"""
+    # Reuse what prepare() resolved before this spawn instead of resolving twice
+    return stdio_client(_resolved_parameters or _server_parameters())
+
+mcp_pool.register(SERVER_NAME, _create_transport, prepare=_server_parameters)
 
 def get_aws_docs_tools():
-    """Get AWS documentation tools from MCP server"""
+    """Get AWS documentation tools from the pooled MCP server (kept alive for the whole process)"""
     try:
-        with stdio_mcp_client:
-            tools = stdio_mcp_client.list_tools_sync()
-            print(f"🔍 MCP Tools found: {len(tools) if tools else 0}")
-            
-            if tools:
-                for i, tool in enumerate(tools):
-                    print(f"  {i+1}. {tool.tool_name}")
-            
-            return tools
+        tools = mcp_pool.get_tools(SERVER_NAME)
+        print(f"🔍 MCP Tools found: {len(tools) if tools else 0}")
+
+        if tools:
+            for i, tool in enumerate(tools):
+                print(f"  {i+1}. {tool.tool_name}")
+
+        return tools
     except Exception as e:
         print(f"❌ Error getting AWS docs tools: {e}")
         return []
@@ -0,0 +1,211 @@
+"""Pinned, pre-resolved launcher for stdio MCP servers
+
+Instead of `uvx <package>@latest` on every spawn (re-resolves the package
+index, fails offline), each server package is installed once into a local
+virtualenv under config.MCP_CACHE_DIR and its console script is exec'd
+directly afterwards.
+"""
+
+import json
+import logging
+import os
+import re
+import shutil
+import subprocess
+import sys
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from mcp import StdioServerParameters
+
+import config
+
+logger = logging.getLogger(__name__)
+
+is_windows = sys.platform.startswith('win')
+
+MANIFEST_FILE = "manifest.json"
+
+_lock = threading.Lock()
+_launch_stats: Dict[str, Dict[str, Any]] = {}
+
+
+def _uv_command() -> List[str]:
+    """Locate the uv executable (PATH first, then the pip-installed module)"""
+    uv = shutil.which("uv")
+    return [uv] if uv else [sys.executable, "-m", "uv"]
+
+
+def _normalize(package: str) -> str:
+    return re.sub(r"[-_.]+", "-", package).lower()
+
+
+def _bin_dir(env_dir: str) -> str:
+    return os.path.join(env_dir, "Scripts" if is_windows else "bin")
+
+
+def _entry_point(env_dir: str, executable: str) -> str:
+    return os.path.join(_bin_dir(env_dir), f"{executable}.exe" if is_windows else executable)
+
+
+def _installed_version(env_dir: str, package: str) -> Optional[str]:
+    """Read the installed version of `package` from the environment"""
+    python = os.path.join(_bin_dir(env_dir), "python.exe" if is_windows else "python")
+    result = subprocess.run(
+        _uv_command() + ["pip", "freeze", "--python", python],
+        capture_output=True, text=True, check=True, timeout=60
+    )
+    for line in result.stdout.splitlines():
+        name, _, version = line.partition("==")
+        if _normalize(name) == _normalize(package):
+            return version.strip()
+    return None
+
+
+def _install(package: str, version: Optional[str], env_dir: str) -> Optional[str]:
+    """
+    Install package (optionally pinned) into its own virtualenv
+
+    The manifest is written last, so an environment without a manifest is an
+    interrupted install and gets rebuilt. A lock file keeps concurrent
+    processes (e.g. API workers) from installing into the same directory.
+    """
+    lock_path = f"{env_dir}.lock"
+    deadline = time.monotonic() + config.MCP_INSTALL_TIMEOUT
+
+    while True:
+        try:
+            lock_fd = os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            break
+        except FileExistsError:
+            try:
+                if time.time() - os.path.getmtime(lock_path) > config.MCP_INSTALL_TIMEOUT:
+                    # Left behind by a process that died mid-install
+                    os.remove(lock_path)
+                    continue
+            except FileNotFoundError:
+                continue
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"Timed out waiting for install lock {lock_path}")
+            time.sleep(0.5)
+
+    try:
+        manifest_path = os.path.join(env_dir, MANIFEST_FILE)
+        if os.path.exists(manifest_path):
+            # Installed by another process while we were waiting
+            with open(manifest_path, encoding="utf-8") as f:
+                return json.load(f).get("version", version)
+
+        shutil.rmtree(env_dir, ignore_errors=True)
+        requirement = f"{package}=={version}" if version else package
+        python = os.path.join(_bin_dir(env_dir), "python.exe" if is_windows else "python")
+
+        subprocess.run(
+            _uv_command() + ["venv", "--quiet", env_dir],
+            check=True, capture_output=True, timeout=config.MCP_INSTALL_TIMEOUT
+        )
+        subprocess.run(
+            _uv_command() + ["pip", "install", "--quiet", "--python", python, requirement],
+            check=True, capture_output=True, timeout=config.MCP_INSTALL_TIMEOUT
+        )
+        resolved_version = _installed_version(env_dir, package) or version
+
+        with open(manifest_path, "w", encoding="utf-8") as f:
+            json.dump({"package": package, "version": resolved_version}, f)
+        return resolved_version
+    finally:
+        os.close(lock_fd)
+        os.remove(lock_path)
+
+
+def resolve_server(package: str, version: Optional[str] = None, executable: Optional[str] = None) -> List[str]:
+    """
+    Resolve an MCP server package to a directly executable command
+
+    The first call installs the package into config.MCP_CACHE_DIR; every later
+    call (and every later process) reuses that install without touching the
+    package index.
+
+    Args:
+        package: PyPI package, e.g. "awslabs.aws-documentation-mcp-server"
+        version: Pinned version; empty means "resolve latest once, then keep it"
+        executable: Console script name (default: same as package)
+
+    Returns:
+        List[str]: Command line (entry point path)
+    """
+    executable = executable or package
+    env_dir = os.path.join(config.MCP_CACHE_DIR, _normalize(package), version or "latest")
+    entry_point = _entry_point(env_dir, executable)
+
+    with _lock:
+        started = time.perf_counter()
+        manifest_path = os.path.join(env_dir, MANIFEST_FILE)
+        cached = os.path.exists(manifest_path) and os.path.exists(entry_point)
+
+        if cached:
+            with open(manifest_path, encoding="utf-8") as f:
+                resolved_version = json.load(f).get("version", version)
+        else:
+            logger.info(f"Installing MCP server {package}{'==' + version if version else ''} into {env_dir}")
+            os.makedirs(os.path.dirname(env_dir), exist_ok=True)
+            resolved_version = _install(package, version, env_dir)
+
+        previous = _launch_stats.get(package)
+        if previous and previous["command"] == entry_point:
+            # Respawn of an already resolved server: keep the first resolution
+            # (install miss and its resolve time) visible in the stats
+            previous["resolves"] += 1
+        else:
+            _launch_stats[package] = {
+                "version": resolved_version,
+                "cached": cached,
+                "resolve_ms": round((time.perf_counter() - started) * 1000, 1),
+                "command": entry_point,
+                "resolves": 1
+            }
+
+    return [entry_point]
+
+
+def get_server_parameters(
+    package: str,
+    version: Optional[str] = None,
+    executable: Optional[str] = None,
+    env: Optional[Dict[str, str]] = None
+) -> StdioServerParameters:
+    """
+    Build StdioServerParameters for an MCP server package
+
+    Falls back to `uvx` when the package cannot be installed into the cache
+    (e.g. first run without uv available) so behaviour never gets worse than
+    before.
+
+    Args:
+        package: PyPI package name
+        version: Pinned version (empty: latest, resolved once)
+        executable: Console script name (default: same as package)
+        env: Environment variables for the server process
+
+    Returns:
+        StdioServerParameters: Parameters for stdio_client()
+    """
+    try:
+        command = resolve_server(package, version, executable)
+        return StdioServerParameters(command=command[0], args=command[1:], env=env)
+    except Exception as e:
+        logger.warning(f"Could not pre-resolve MCP server {package}, falling back to uvx: {e}")
+        spec = f"{package}@{version or 'latest'}"
+        args = ["--from", spec, f"{executable or package}.exe"] if is_windows else [spec]
+        with _lock:
+            _launch_stats[package] = {
+                "version": version, "cached": False, "resolve_ms": None, "command": "uvx", "resolves": 1
+            }
+        return StdioServerParameters(command="uvx", args=args, env=env)
+
+
+def get_launch_stats() -> Dict[str, Dict[str, Any]]:
+    """Get resolved version, cache hit and resolve time of each launched server"""
+    with _lock:
+        return {package: dict(stats) for package, stats in _launch_stats.items()}
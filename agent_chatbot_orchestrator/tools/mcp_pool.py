@@ -0,0 +1,329 @@
+"""Persistent pool of stdio MCP server sessions with health checks and auto-restart"""
+
+import asyncio
+import atexit
+import itertools
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from strands.tools.mcp import MCPAgentTool, MCPClient
+
+import config
+
+logger = logging.getLogger(__name__)
+
+
+class PooledMCPClient(MCPClient):
+    """MCPClient that records spawn, health-check and tool-call latency"""
+
+    def __init__(
+        self,
+        server_name: str,
+        transport_callable: Callable[[], Any],
+        prepare: Optional[Callable[[], Any]] = None
+    ):
+        super().__init__(transport_callable)
+        self.server_name = server_name
+        self.prepare = prepare
+        self.ready = False
+        self.restarts = 0
+        self.last_error: Optional[str] = None
+        self.spawn_ms: Optional[float] = None
+        self.ping_ms: Optional[float] = None
+        self.tool_calls = 0
+        self.tool_errors = 0
+        self.tool_call_ms_total = 0.0
+        self.tools: List[Any] = []
+        self.lock = threading.Lock()
+        self.restarting = False
+
+    @property
+    def alive(self) -> bool:
+        """Started and its background session still running"""
+        return self.ready and self._is_session_active()
+
+    @property
+    def started(self) -> bool:
+        """Spawned at least once (a session that is not alive then needs a restart)"""
+        return self.spawn_ms is not None
+
+    def call_tool_sync(self, *args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return super().call_tool_sync(*args, **kwargs)
+        except Exception:
+            self.tool_errors += 1
+            raise
+        finally:
+            self._record_tool_call(started)
+
+    async def call_tool_async(self, *args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return await super().call_tool_async(*args, **kwargs)
+        except Exception:
+            self.tool_errors += 1
+            raise
+        finally:
+            self._record_tool_call(started)
+
+    def _record_tool_call(self, started: float):
+        self.tool_calls += 1
+        self.tool_call_ms_total += (time.perf_counter() - started) * 1000
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "ready": self.ready,
+            "spawn_ms": round(self.spawn_ms, 1) if self.spawn_ms is not None else None,
+            "ping_ms": round(self.ping_ms, 1) if self.ping_ms is not None else None,
+            "restarts": self.restarts,
+            "tool_calls": self.tool_calls,
+            "tool_errors": self.tool_errors,
+            "avg_tool_call_ms": round(self.tool_call_ms_total / self.tool_calls, 1) if self.tool_calls else None,
+            "last_error": self.last_error
+        }
+
+
+class PooledMCPTool(MCPAgentTool):
+    """
+    MCP tool of a pooled server, not bound to one session
+
+    Agents are built once and keep their tools, so each call asks the pool
+    for a live session of the server instead of reusing the session the
+    tool was listed from. Load spreads over every session of the server
+    and a dead session is replaced without rebuilding the agent.
+    """
+
+    def __init__(self, pool: "MCPPool", server_name: str, tool: MCPAgentTool):
+        super().__init__(tool.mcp_tool, tool.mcp_client, name_override=tool.tool_name, timeout=tool.timeout)
+        self.pool = pool
+        self.server_name = server_name
+
+    async def stream(self, tool_use, invocation_state, **kwargs):
+        # get_client có thể spawn/restart server: chạy ngoài event loop
+        client = await asyncio.to_thread(self.pool.get_client, self.server_name)
+        bound = MCPAgentTool(self.mcp_tool, client, name_override=self.tool_name, timeout=self.timeout)
+        async for event in bound.stream(tool_use, invocation_state, **kwargs):
+            yield event
+
+
+class MCPPool:
+    """
+    Keep stdio MCP server processes alive for the life of the process
+
+    Each registered server gets up to `sessions` client sessions. A session is
+    spawned on first use, health-checked in the background and restarted in
+    place when its process dies. get_tools() hands out pool-level tools: each
+    call goes to the next live session (round robin), so every session of a
+    server serves the agents built from them.
+    """
+
+    def __init__(self):
+        self._servers: Dict[str, List[PooledMCPClient]] = {}
+        self._round_robin: Dict[str, Any] = {}
+        self._tools: Dict[str, List[PooledMCPTool]] = {}
+        self._lock = threading.RLock()
+        self._monitor: Optional[threading.Thread] = None
+        self._stop_monitor = threading.Event()
+        self._closed = False
+
+    def register(
+        self,
+        name: str,
+        transport_callable: Callable[[], Any],
+        sessions: Optional[int] = None,
+        prepare: Optional[Callable[[], Any]] = None
+    ):
+        """
+        Register an MCP server
+
+        Args:
+            name: Server name, e.g. "aws_docs"
+            transport_callable: Callable returning the MCP transport (e.g. stdio_client(...))
+            sessions: Number of concurrent sessions (default: config.MCP_SESSIONS_PER_SERVER)
+            prepare: Called before each spawn, outside the MCP startup timeout
+                (e.g. installing the server package on first run)
+        """
+        sessions = sessions or config.MCP_SESSIONS_PER_SERVER
+        with self._lock:
+            if name in self._servers:
+                return
+            self._servers[name] = [PooledMCPClient(name, transport_callable, prepare) for _ in range(sessions)]
+            self._round_robin[name] = itertools.cycle(range(sessions))
+
+    def get_client(self, name: str) -> PooledMCPClient:
+        """
+        Get the next live session of a server (round robin)
+
+        A session never started is spawned when its turn comes. A dead one is
+        skipped and restarted in the background; only when no session of the
+        server is alive does the caller wait for a restart.
+        """
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("MCP pool is shut down")
+            if name not in self._servers:
+                raise ValueError(f"MCP server not registered: {name}")
+            sessions = self._servers[name]
+            start = next(self._round_robin[name])
+            candidates = sessions[start:] + sessions[:start]
+
+        dead = [client for client in candidates if client.started and not client.alive]
+        chosen = next((client for client in candidates if client not in dead), None)
+        if chosen is None:
+            # Không còn session nào sống: caller chờ restart session đầu tiên
+            chosen = dead.pop(0)
+        for client in dead:
+            self._restart_in_background(client)
+        return chosen if chosen.alive else self._ensure_started(chosen)
+
+    def _ensure_started(self, client: PooledMCPClient) -> PooledMCPClient:
+        with client.lock:
+            if not client.alive:
+                if client.started:
+                    client.restarts += 1
+                    logger.warning(f"Restarting MCP server '{client.server_name}'")
+                    self._stop(client)
+                self._start(client)
+        if config.MCP_HEALTH_CHECK_INTERVAL > 0:
+            self.start_health_monitor()
+        return client
+
+    def _restart_in_background(self, client: PooledMCPClient):
+        with client.lock:
+            if client.restarting:
+                return
+            client.restarting = True
+
+        def run():
+            try:
+                self._ensure_started(client)
+            except Exception as e:
+                logger.error(f"Failed to restart MCP server '{client.server_name}': {e}")
+            finally:
+                client.restarting = False
+
+        threading.Thread(target=run, name=f"mcp-restart-{client.server_name}", daemon=True).start()
+
+    def get_tools(self, name: str) -> List[Any]:
+        """
+        Get the tools of a server
+
+        Args:
+            name: Server name
+
+        Returns:
+            List of PooledMCPTool; each call runs on a live session picked by the pool
+        """
+        with self._lock:
+            tools = self._tools.get(name)
+        if tools is None:
+            listed = self.get_client(name).tools
+            with self._lock:
+                tools = self._tools.setdefault(name, [PooledMCPTool(self, name, tool) for tool in listed])
+        return tools
+
+    def _start(self, client: PooledMCPClient):
+        try:
+            if client.prepare:
+                client.prepare()
+            started = time.perf_counter()
+            client.start()
+            client.tools = client.list_tools_sync()
+            client.spawn_ms = (time.perf_counter() - started) * 1000
+            client.ready = True
+            client.last_error = None
+            logger.info(f"MCP server '{client.server_name}' ready in {client.spawn_ms:.0f} ms")
+        except Exception as e:
+            client.ready = False
+            client.last_error = str(e)
+            self._stop(client)
+            raise
+
+    def _stop(self, client: PooledMCPClient):
+        client.ready = False
+        try:
+            client.stop(None, None, None)
+        except Exception as e:
+            logger.warning(f"Error stopping MCP server '{client.server_name}': {e}")
+
+    def restart(self, client: PooledMCPClient):
+        """Restart a session in place (same MCPClient object, new server process)"""
+        with client.lock:
+            logger.warning(f"Restarting MCP server '{client.server_name}'")
+            self._stop(client)
+            client.restarts += 1
+            self._start(client)
+
+    def check_health(self) -> Dict[str, Any]:
+        """Ping every started session and restart the ones that stopped responding"""
+        with self._lock:
+            if self._closed:
+                return self.get_stats()
+            clients = [client for sessions in self._servers.values() for client in sessions]
+
+        for client in clients:
+            if not client.ready and client.spawn_ms is None:
+                # Never started: stays lazy until first use
+                continue
+            started = time.perf_counter()
+            try:
+                if not client.ready:
+                    raise RuntimeError(client.last_error or "session not ready")
+                client.list_tools_sync()
+                client.ping_ms = (time.perf_counter() - started) * 1000
+            except Exception as e:
+                client.last_error = str(e)
+                try:
+                    self.restart(client)
+                except Exception as restart_error:
+                    logger.error(f"Failed to restart MCP server '{client.server_name}': {restart_error}")
+
+        return self.get_stats()
+
+    def start_health_monitor(self, interval: Optional[float] = None):
+        """Run check_health() on a daemon thread every `interval` seconds"""
+        interval = interval or config.MCP_HEALTH_CHECK_INTERVAL
+        with self._lock:
+            if self._monitor and self._monitor.is_alive():
+                return
+
+            def monitor():
+                while not self._stop_monitor.wait(interval):
+                    try:
+                        self.check_health()
+                    except Exception as e:
+                        logger.error(f"MCP health check failed: {e}")
+
+            self._stop_monitor.clear()
+            self._monitor = threading.Thread(target=monitor, name="mcp-health-monitor", daemon=True)
+            self._monitor.start()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get readiness and latency stats of every session, grouped by server"""
+        with self._lock:
+            return {
+                name: [client.get_stats() for client in sessions]
+                for name, sessions in self._servers.items()
+            }
+
+    def shutdown(self):
+        """Stop the health monitor and every server process (later tool calls fail)"""
+        self._stop_monitor.set()
+        with self._lock:
+            self._closed = True
+            for sessions in self._servers.values():
+                for client in sessions:
+                    if client.ready:
+                        self._stop(client)
+
+
+mcp_pool = MCPPool()
+atexit.register(mcp_pool.shutdown)
+
+
+def get_mcp_stats() -> Dict[str, Any]:
+    """Get stats of the shared MCP pool"""
+    return mcp_pool.get_stats()
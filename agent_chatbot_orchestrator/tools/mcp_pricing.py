@@ -1,58 +1,42 @@
-import platform
 import os
 import sys
-import atexit
-from mcp import stdio_client, StdioServerParameters
-from strands.tools.mcp import MCPClient
+from mcp import stdio_client
+
+import config
+from agent_chatbot_orchestrator.tools.mcp_launcher import get_server_parameters
+from agent_chatbot_orchestrator.tools.mcp_pool import mcp_pool
 
 # Detect platform
 is_windows = sys.platform.startswith('win')
-print(f"Detected platform: {'Windows' if is_windows else 'Non-Windows (Linux/macOS)'}")
 
-# Initialize MCP client configuration but don't start it yet
-if is_windows:
-    print("Using Windows-specific MCP configuration...")
-    aws_pricing_mcp_client = MCPClient(lambda: stdio_client(
-        StdioServerParameters(
-            command="uvx",
-            args=["--from", "awslabs.billing-cost-management-mcp-server@latest", "awslabs.billing-cost-management-mcp-server.exe"],
-            env={
-                "FASTMCP_LOG_LEVEL": "ERROR",
-                "AWS_PROFILE": os.getenv("AWS_PROFILE", "default"),
-                "AWS_REGION": os.getenv("AWS_REGION", "us-east-1")
-            }
-        )
-    ))
-else:
-    print("Using standard MCP configuration for Linux/macOS...")
-    aws_pricing_mcp_client = MCPClient(lambda: stdio_client(
-        StdioServerParameters(
-            command="uvx", 
-            args=["awslabs.billing-cost-management-mcp-server@latest"],
-            env={
-                "FASTMCP_LOG_LEVEL": "ERROR",
-                "AWS_PROFILE": os.getenv("AWS_PROFILE", "default"),
-                "AWS_REGION": os.getenv("AWS_REGION", "us-east-1")
-            }
-        )
-    ))
+SERVER_NAME = "aws_pricing"
+_resolved_parameters = None
+
+def _server_parameters():
+    """Resolve the pinned AWS Billing & Cost Management MCP server (installed once into the launcher cache)"""
+    global _resolved_parameters
+    _resolved_parameters = get_server_parameters(
+        "awslabs.billing-cost-management-mcp-server",
+        version=config.MCP_PRICING_SERVER_VERSION,
+        env={
+            "FASTMCP_LOG_LEVEL": "ERROR",
+            "AWS_PROFILE": os.getenv("AWS_PROFILE", "default"),
+            "AWS_REGION": os.getenv("AWS_REGION", "us-east-1")
+        }
+    )
+    return _resolved_parameters
+
+def _create_transport():
+    """Create stdio transport for the AWS Billing & Cost Management MCP server"""
+    # Reuse what prepare() resolved before this spawn instead of resolving twice
+    return stdio_client(_resolved_parameters or _server_parameters())
 
-# Global variable to track if client is started
-_client_started = False
+mcp_pool.register(SERVER_NAME, _create_transport, prepare=_server_parameters)
 
 def get_pricing_tools():
-    """Get AWS pricing and billing tools from MCP server"""
-    global _client_started
-    
+    """Get AWS pricing and billing tools from the pooled MCP server (kept alive for the whole process)"""
     try:
-        # Start MCP client only if not already started
-        if not _client_started:
-            print("Starting AWS Pricing MCP client...")
-            aws_pricing_mcp_client.start()
-            print("AWS Pricing MCP client started successfully.")
-            _client_started = True
-        
-        tools = aws_pricing_mcp_client.list_tools_sync()
+        tools = mcp_pool.get_tools(SERVER_NAME)
         print(f"💰 Pricing MCP Tools found: {len(tools) if tools else 0}")
         
         if tools:
@@ -78,15 +62,3 @@ def get_pricing_tools():
             print("3. Verify your AWS credentials are configured")
         
         return []
-
-stdio_mcp_client = aws_pricing_mcp_client
-
-def cleanup():
-    try:
-        if hasattr(aws_pricing_mcp_client, '__exit__'):
-            aws_pricing_mcp_client.__exit__(None, None, None)
-        print("AWS Pricing MCP client stopped")
-    except Exception as e:
-        print(f"Error stopping AWS Pricing MCP client: {e}")
-
-atexit.register(cleanup)
\ No newline at end of file
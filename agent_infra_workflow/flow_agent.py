@@ -1,14 +1,13 @@
 """Test Strands Agent Workflow - Multi-agent workflow management"""
 import sys
 import os
-import boto3
 import logging
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 import config
+from bedrock.registry import get_bedrock_model
 
 from strands import Agent
-from strands.models import BedrockModel
 from strands_tools import workflow
 
 try:
@@ -19,20 +18,8 @@ except ImportError:
 
 logging.basicConfig(level=logging.INFO)
 
-boto_session = boto3.Session(
-    aws_access_key_id=config.AWS_ACCESS_KEY_ID,
-    aws_secret_access_key=config.AWS_SECRET_ACCESS_KEY,
-    aws_session_token=config.AWS_SESSION_TOKEN,
-    region_name=config.AWS_REGION
-)
-
 # Create Bedrock model
-bedrock_model = BedrockModel(
-    boto_session=boto_session,
-    model_id=config.CHATBOT_AGENT_MODEL,
-    temperature=config.BEDROCK_TEMPERATURE,
-    max_tokens=config.BEDROCK_MAX_TOKENS,
-)
+bedrock_model = get_bedrock_model()
 
 # Create specialized agents
 researcher = Agent(
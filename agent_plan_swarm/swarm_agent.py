@@ -2,28 +2,15 @@
 
 import sys
 import os
-import boto3
 import logging
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 import config
+from bedrock.registry import get_bedrock_model
 from strands import Agent
-from strands.models import BedrockModel
 from strands.multiagent import Swarm
 
-boto_session = boto3.Session(
-    aws_access_key_id=config.AWS_ACCESS_KEY_ID,
-    aws_secret_access_key=config.AWS_SECRET_ACCESS_KEY,
-    aws_session_token=config.AWS_SESSION_TOKEN,
-    region_name=config.AWS_REGION
-)
-
-bedrock_model = BedrockModel(
-    boto_session=boto_session,
-    model_id=config.CHATBOT_AGENT_MODEL,
-    temperature=config.BEDROCK_TEMPERATURE,
-    max_tokens=config.BEDROCK_MAX_TOKENS,
-)
+bedrock_model = get_bedrock_model()
 
 swarm = Swarm(
     [researcher, coder, reviewer, architect],
@@ -2,7 +2,6 @@
 
 import sys
 import os
-import boto3
 import logging
 import json
 import re
@@ -10,22 +9,10 @@ from typing import Dict, List, Any
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 import config
+from bedrock.registry import get_bedrock_model
 from strands import Agent, tool
-from strands.models import BedrockModel
-
-boto_session = boto3.Session(
-    aws_access_key_id=config.AWS_ACCESS_KEY_ID,
-    aws_secret_access_key=config.AWS_SECRET_ACCESS_KEY,
-    aws_session_token=config.AWS_SESSION_TOKEN,
-    region_name=config.AWS_REGION
-)
-
-bedrock_model = BedrockModel(
-    boto_session=boto_session,
-    model_id=config.CHATBOT_AGENT_MODEL,
-    temperature=0.1,  
-    max_tokens=5000,
-)
+
+bedrock_model = get_bedrock_model(temperature=0.1, max_tokens=5000, prompt_cache=True)
 
 @tool
 def classify_document_type(extracted_text: str) -> str:
@@ -1,13 +1,18 @@
 """FastAPI application for the chatbot"""
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, AsyncIterator
 import asyncio
+import json
+import os
+from contextlib import aclosing
 
-from src.core.strands_manager import StrandsManager
+from src.core.strands_manager import AdmissionError, StrandsManager
 from src.core.message_handler import MessageHandler
 from src.agents.chatbot_agent import ChatbotAgent
+from src.core.state_store import InMemoryStateStore, create_state_store
 from src.utils.config import Config
 from src.utils.logger import setup_logger
 
@@ -35,13 +40,17 @@ app = FastAPI(
 # Global variables
 strands_manager = None
 message_handler = None
+state_store = None
 logger = None
 
+# Gửi comment keep-alive khi stream im lặng quá lâu (proxy/load balancer hay cắt kết nối idle)
+STREAM_KEEPALIVE_SECONDS = 15
+
 
 @app.on_event("startup")
 async def startup_event():
     """Initialize the application on startup"""
-    global strands_manager, message_handler, logger
+    global strands_manager, message_handler, state_store, logger
     
     # Load configuration
     config = Config()
@@ -59,15 +68,22 @@ async def startup_event():
     strands_manager = StrandsManager()
     message_handler = MessageHandler(strands_manager)
     
+    # Conversation state dùng chung giữa các worker process
+    state_store = create_state_store(config.get("state", {}))
+    workers = int(os.getenv("WEB_CONCURRENCY", "1"))
+    if workers > 1 and isinstance(state_store, InMemoryStateStore):
+        logger.warning(f"{workers} workers with an in-memory state store: conversations are not shared between workers")
+    
     # Create and register chatbot agent
     agent_config = config.get("agent", {})
     chatbot = ChatbotAgent(
         name=agent_config.get("name", "ChatbotAgent"),
-        config=agent_config
+        config=agent_config,
+        state_store=state_store
     )
     strands_manager.register_agent(chatbot)
     
-    logger.info(f"API initialized with agent: {chatbot.name}")
+    logger.info(f"API initialized with agent: {chatbot.name} (pid {os.getpid()}, {workers} worker(s))")
 
 
 @app.post("/chat", response_model=MessageResponse)
@@ -87,15 +103,198 @@ async def chat(request: MessageRequest):
             timestamp=datetime.now().isoformat()
         )
     
+    except AdmissionError as e:
+        raise admission_error(e)
+    
+    except asyncio.TimeoutError:
+        logger.warning(f"Chat request of user {request.user_id} timed out")
+        raise HTTPException(status_code=504, detail="Request timed out")
+    
+    except asyncio.CancelledError:
+        raise HTTPException(status_code=499, detail="Request cancelled")
+    
     except Exception as e:
         logger.error(f"Error processing chat message: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
+def admission_error(error: AdmissionError) -> HTTPException:
+    """429/503 with Retry-After for a request refused by admission control"""
+    logger.warning(f"Request refused ({error.status_code}): {error}")
+    return HTTPException(
+        status_code=error.status_code,
+        detail=str(error),
+        headers={"Retry-After": str(error.retry_after)}
+    )
+
+
+async def next_event(events: AsyncIterator[Dict[str, Any]], keepalive: float) -> AsyncIterator[Optional[Dict[str, Any]]]:
+    """
+    Relay events, yielding None whenever no event arrived for `keepalive` seconds
+
+    The pending __anext__ is awaited again after a keep-alive instead of
+    being cancelled, so a slow model call is never interrupted.
+    """
+    pending = None
+    try:
+        while True:
+            if pending is None:
+                pending = asyncio.ensure_future(events.__anext__())
+            done, _ = await asyncio.wait({pending}, timeout=keepalive)
+            if not done:
+                yield None
+                continue
+            try:
+                event = pending.result()
+            except StopAsyncIteration:
+                return
+            finally:
+                pending = None
+            yield event
+    finally:
+        if pending is not None:
+            pending.cancel()
+            # Chờ task dừng hẳn trước khi caller gọi aclose() trên generator gốc
+            await asyncio.gather(pending, return_exceptions=True)
+
+
+def format_sse(event: Dict[str, Any]) -> str:
+    """Encode one stream event as a Server-Sent Event (event name = event type)"""
+    data = json.dumps(event, ensure_ascii=False)
+    return f"event: {event.get('type', 'message')}\ndata: {data}\n\n"
+
+
+async def sse_source(events: AsyncIterator[Dict[str, Any]], http_request: Request, user_id: str) -> AsyncIterator[str]:
+    """
+    Encode an event stream as SSE with keep-alives, closing `events` when the client goes away
+
+    The relay is closed first (its finally cancels and awaits a pending
+    __anext__ left by a keep-alive), so events.aclose() never finds the
+    generator still running and the agent run is cancelled right away.
+    """
+    try:
+        async with aclosing(next_event(events, STREAM_KEEPALIVE_SECONDS)) as relay:
+            async for event in relay:
+                if await http_request.is_disconnected():
+                    logger.info(f"Client disconnected, cancelling stream for user {user_id}")
+                    break
+                yield ": keep-alive\n\n" if event is None else format_sse(event)
+    except Exception as e:
+        logger.error(f"Error streaming chat message: {e}")
+        yield format_sse({"type": "error", "error": str(e)})
+    finally:
+        await events.aclose()
+
+
+@app.post("/chat/stream")
+async def chat_stream(request: MessageRequest, http_request: Request):
+    """
+    Process chat message and stream the answer as Server-Sent Events
+
+    Events (see MessageHandler.stream_message):
+        delta      {"text", "specialist"?}   model output as it is generated
+        route      {"specialists", "source"} question sent straight to specialist(s)
+        tool_start {"tool", "tool_use_id"}   a tool / specialist agent was called
+        tool_end   {"tool", "tool_use_id", "status"}
+        usage      {"inputTokens", "outputTokens", "totalTokens", "latencyMs", "durationMs"}
+        done       {"response"}              full answer, end of stream
+        error      {"error"}
+
+    The generator pulls the next event only after the previous one was
+    written to the socket, so a slow client slows the agent down instead
+    of growing a buffer. The agent run is cancelled when the client disconnects.
+    A saturated server answers 429/503 with Retry-After before the stream starts.
+    """
+    # Tính lane một lần: check_admission và stream phải dùng cùng một lane
+    priority = await message_handler.priority(request.message, request.user_id)
+    try:
+        await message_handler.check_admission(request.message, request.user_id, priority)
+    except AdmissionError as e:
+        raise admission_error(e)
+    events = message_handler.stream_message(request.message, request.user_id, request.context, priority)
+
+    return StreamingResponse(
+        sse_source(events, http_request, request.user_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@app.websocket("/ws/chat")
+async def chat_websocket(websocket: WebSocket):
+    """
+    Chat over a WebSocket
+
+    Client sends {"message", "user_id", "context"?} to start a turn and
+    {"type": "cancel"} to stop the current one. The server answers with the
+    same events as /chat/stream, one JSON object per frame. One turn runs at
+    a time per connection; disconnecting cancels it.
+    """
+    await websocket.accept()
+    current: Optional[asyncio.Task] = None
+
+    async def run_turn(payload: Dict[str, Any]):
+        events = message_handler.stream_message(payload["message"], payload["user_id"], payload.get("context"))
+        try:
+            async for event in events:
+                await websocket.send_json(event)
+        except asyncio.CancelledError:
+            try:
+                await websocket.send_json({"type": "cancelled"})
+            except Exception:
+                # Client đã ngắt kết nối
+                pass
+            raise
+        except Exception as e:
+            logger.error(f"Error streaming chat message: {e}")
+            await websocket.send_json({"type": "error", "error": str(e)})
+        finally:
+            await events.aclose()
+
+    try:
+        while True:
+            payload = await websocket.receive_json()
+
+            if payload.get("type") == "cancel":
+                if current and not current.done():
+                    current.cancel()
+                continue
+
+            if not payload.get("message") or not payload.get("user_id"):
+                await websocket.send_json({"type": "error", "error": "message and user_id are required"})
+                continue
+            if current and not current.done():
+                await websocket.send_json({"type": "error", "error": "A response is already streaming; send cancel first"})
+                continue
+
+            current = asyncio.create_task(run_turn(payload))
+
+    except WebSocketDisconnect:
+        logger.info("WebSocket client disconnected")
+    finally:
+        if current and not current.done():
+            current.cancel()
+
+
+@app.post("/chat/{user_id}/cancel")
+async def cancel_chat(user_id: str):
+    """Cancel the running requests of a user"""
+    return {"user_id": user_id, "cancelled": message_handler.cancel(user_id)}
+
+
+@app.get("/metrics")
+async def metrics():
+    """Dispatch metrics: active/queued requests, timeouts, wait and run times"""
+    if strands_manager:
+        return {**strands_manager.get_metrics(), "pid": os.getpid(), "state_store": state_store.get_stats()}
+    return {}
+
+
 @app.get("/health")
 async def health_check():
-    """Health check endpoint"""
-    return {"status": "healthy", "service": "Strands Agent Chatbot"}
+    """Health check endpoint (never queued: answers even when chat requests are refused)"""
+    saturated = strands_manager.is_saturated() if strands_manager else False
+    return {"status": "healthy", "service": "Strands Agent Chatbot", "saturated": saturated}
 
 
 @app.get("/agents")
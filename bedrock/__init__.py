@@ -1,12 +1,35 @@
 """Bedrock integration modules"""
 
 from .session import AWSSession, create_aws_session_from_env
-from .claude import ClaudeClient, chat_with_claude, ask_claude
+from .claude import ClaudeClient, chat_with_claude, ask_claude, get_shared_claude_client
+from .async_claude import AsyncClaudeClient
+from .registry import get_boto_session, get_client, get_bedrock_model, get_registry_stats
+from .cache import RequestCache, get_request_cache, make_cache_key
+from .batch import BatchRunner, run_batch
+from .catalog import ModelCatalog, get_model_catalog
+from .rate_limit import AdaptiveRateLimiter, RateLimitTimeout, get_rate_limiter, get_rate_limiter_stats
 
 __all__ = [
     'AWSSession',
     'create_aws_session_from_env',
     'ClaudeClient',
     'chat_with_claude',
-    'ask_claude'
+    'ask_claude',
+    'get_shared_claude_client',
+    'AsyncClaudeClient',
+    'get_boto_session',
+    'get_client',
+    'get_bedrock_model',
+    'get_registry_stats',
+    'RequestCache',
+    'get_request_cache',
+    'make_cache_key',
+    'BatchRunner',
+    'run_batch',
+    'AdaptiveRateLimiter',
+    'RateLimitTimeout',
+    'get_rate_limiter',
+    'get_rate_limiter_stats',
+    'ModelCatalog',
+    'get_model_catalog'
 ]
\ No newline at end of file
@@ -0,0 +1,215 @@
+"""Async Claude client for AWS Bedrock"""
+
+import asyncio
+import functools
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from .claude import ClaudeClient, get_shared_claude_client
+import config
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncClaudeClient:
+    """
+    Async client for Claude models on AWS Bedrock
+
+    Same surface as ClaudeClient (chat, chat_with_context, generate_response)
+    but awaitable. boto3 has no native asyncio support, so each request runs
+    on a dedicated thread pool over one shared ClaudeClient (one session, one
+    HTTP connection pool). A semaphore bounds the number of in-flight Bedrock
+    requests; callers beyond the limit wait without holding a thread.
+    """
+
+    def __init__(
+        self,
+        client: Optional[ClaudeClient] = None,
+        max_concurrency: Optional[int] = None
+    ):
+        """
+        Initialize async Claude client
+
+        Args:
+            client: Blocking client to run requests on (default: shared process-wide client)
+            max_concurrency: Maximum concurrent Bedrock requests (default: config.CLAUDE_ASYNC_MAX_CONCURRENCY)
+        """
+        self.client = client or get_shared_claude_client()
+        self.max_concurrency = max_concurrency or config.CLAUDE_ASYNC_MAX_CONCURRENCY
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.max_concurrency,
+            thread_name_prefix="claude-async"
+        )
+        # asyncio.Semaphore is bound to one event loop: keep one per loop
+        self._semaphores: Dict[asyncio.AbstractEventLoop, asyncio.Semaphore] = {}
+        self._in_flight = 0
+        self._waiting = 0
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        semaphore = self._semaphores.get(loop)
+        if semaphore is None:
+            # Drop semaphores of loops that are gone (e.g. previous asyncio.run calls)
+            self._semaphores = {known: sem for known, sem in self._semaphores.items() if not known.is_closed()}
+            semaphore = self._semaphores[loop] = asyncio.Semaphore(self.max_concurrency)
+        return semaphore
+
+    async def _run(self, func, **kwargs) -> Any:
+        """Run a blocking client call on the pool once a concurrency slot is free"""
+        semaphore = self._get_semaphore()
+        self._waiting += 1
+        try:
+            await semaphore.acquire()
+        finally:
+            self._waiting -= 1
+
+        self._in_flight += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, functools.partial(func, **kwargs))
+        finally:
+            self._in_flight -= 1
+            semaphore.release()
+
+    async def chat(
+        self,
+        message: str,
+        model_id: Optional[str] = None,
+        max_tokens: Optional[int] = None,
+        temperature: Optional[float] = None,
+        system_prompt: Optional[str] = None,
+        conversation_history: Optional[List[Dict[str, str]]] = None
+    ) -> str:
+        """
+        Send a chat message to Claude
+
+        Args:
+            message: User message
+            model_id: Claude model ID (default from config)
+            max_tokens: Maximum tokens to generate
+            temperature: Temperature for response generation
+            system_prompt: System prompt for Claude
+            conversation_history: Previous conversation messages
+
+        Returns:
+            str: Claude's response
+        """
+        return await self._run(
+            self.client.chat,
+            message=message,
+            model_id=model_id,
+            max_tokens=max_tokens,
+            temperature=temperature,
+            system_prompt=system_prompt,
+            conversation_history=conversation_history
+        )
+
+    async def chat_with_context(
+        self,
+        message: str,
+        context: str,
+        model_id: Optional[str] = None,
+        max_tokens: Optional[int] = None,
+        temperature: Optional[float] = None
+    ) -> str:
+        """
+        Chat with Claude providing additional context
+
+        Args:
+            message: User message
+            context: Additional context for the conversation
+            model_id: Claude model ID
+            max_tokens: Maximum tokens to generate
+            temperature: Temperature for response generation
+
+        Returns:
+            str: Claude's response
+        """
+        return await self._run(
+            self.client.chat_with_context,
+            message=message,
+            context=context,
+            model_id=model_id,
+            max_tokens=max_tokens,
+            temperature=temperature
+        )
+
+    async def generate_response(
+        self,
+        prompt: str,
+        model_id: Optional[str] = None,
+        max_tokens: Optional[int] = None,
+        temperature: Optional[float] = None
+    ) -> str:
+        """
+        Generate a response from Claude (simple prompt completion)
+
+        Args:
+            prompt: Input prompt
+            model_id: Claude model ID
+            max_tokens: Maximum tokens to generate
+            temperature: Temperature for response generation
+
+        Returns:
+            str: Generated response
+        """
+        return await self._run(
+            self.client.generate_response,
+            prompt=prompt,
+            model_id=model_id,
+            max_tokens=max_tokens,
+            temperature=temperature
+        )
+
+    async def generate_many(self, prompts: List[str], **kwargs) -> List[str]:
+        """
+        Run many prompts concurrently with asyncio.gather (bounded by max_concurrency)
+
+        Args:
+            prompts: Input prompts
+            **kwargs: model_id, max_tokens, temperature for every prompt
+
+        Returns:
+            List[str]: Responses in input order
+        """
+        return await asyncio.gather(*(self.generate_response(prompt, **kwargs) for prompt in prompts))
+
+    async def astream(self, message: str, **kwargs) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Stream response events (see ClaudeClient.chat_stream) within the concurrency limit
+
+        Args:
+            message: User message
+            **kwargs: Same keyword arguments as ClaudeClient.chat_stream()
+
+        Yields:
+            Dict[str, Any]: text / tool_use / usage / error events
+        """
+        semaphore = self._get_semaphore()
+        self._waiting += 1
+        try:
+            await semaphore.acquire()
+        finally:
+            self._waiting -= 1
+
+        self._in_flight += 1
+        try:
+            # The blocking reader runs on this client's pool, like the other requests
+            async for event in self.client.astream(message, executor=self._executor, **kwargs):
+                yield event
+        finally:
+            self._in_flight -= 1
+            semaphore.release()
+
+    def get_stats(self) -> Dict[str, int]:
+        """Get current concurrency (in-flight and waiting requests)"""
+        return {
+            "max_concurrency": self.max_concurrency,
+            "in_flight": self._in_flight,
+            "waiting": self._waiting
+        }
+
+    def close(self):
+        """Shut down the worker threads"""
+        self._executor.shutdown(wait=False)
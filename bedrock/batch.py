@@ -0,0 +1,273 @@
+"""Batch inference for offline workloads (many prompts through ClaudeClient)"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Union
+
+from .claude import ClaudeClient, get_shared_claude_client
+from .rate_limit import BATCH, backoff_delay, is_retryable_error, is_throttling_error
+import config
+
+logger = logging.getLogger(__name__)
+
+PromptSpec = Union[str, Dict[str, Any]]
+
+
+def _prompt_kwargs(prompt: PromptSpec) -> Dict[str, Any]:
+    """A prompt is either the message text or a dict of ClaudeClient.chat() arguments"""
+    return {"message": prompt} if isinstance(prompt, str) else dict(prompt)
+
+
+def _prompt_key(prompt: PromptSpec) -> str:
+    raw = json.dumps(_prompt_kwargs(prompt), sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:16]
+
+
+class AdaptiveConcurrency:
+    """
+    AIMD concurrency limit
+
+    Each throttled request halves the limit (never below 1); every `limit`
+    consecutive successes raise it by one, up to `max_limit`. The batch
+    settles at the concurrency the account's Bedrock quota can sustain.
+    """
+
+    def __init__(self, max_limit: int):
+        self.max_limit = max(1, max_limit)
+        self.limit = self.max_limit
+        self._successes = 0
+        self._lock = threading.Lock()
+
+    def on_success(self):
+        with self._lock:
+            self._successes += 1
+            if self._successes >= self.limit and self.limit < self.max_limit:
+                self.limit += 1
+                self._successes = 0
+
+    def on_throttle(self):
+        with self._lock:
+            self.limit = max(1, self.limit // 2)
+            self._successes = 0
+
+
+class BatchRunner:
+    """
+    Run many prompts through Claude with a concurrency-limited worker pool
+
+    Results are streamed back as they complete (or in input order), every
+    result is appended to an optional JSONL checkpoint, and a rerun with the
+    same checkpoint skips prompts that already succeeded.
+    """
+
+    def __init__(
+        self,
+        client: Optional[ClaudeClient] = None,
+        max_concurrency: Optional[int] = None,
+        max_retries: Optional[int] = None,
+        checkpoint_path: Optional[str] = None,
+        **chat_kwargs
+    ):
+        """
+        Initialize batch runner
+
+        Args:
+            client: Claude client (default: shared process-wide client)
+            max_concurrency: Upper bound of concurrent requests (default: config.BATCH_MAX_CONCURRENCY)
+            max_retries: Retries per prompt for throttling/transient errors (default: config.BATCH_MAX_RETRIES)
+            checkpoint_path: JSONL file to record results and resume from
+            **chat_kwargs: Defaults for every prompt (model_id, max_tokens, temperature, system_prompt)
+        """
+        self.client = client or get_shared_claude_client()
+        self.max_concurrency = max_concurrency or config.BATCH_MAX_CONCURRENCY
+        self.max_retries = config.BATCH_MAX_RETRIES if max_retries is None else max_retries
+        self.checkpoint_path = checkpoint_path
+        self.chat_kwargs = chat_kwargs
+        self.concurrency = AdaptiveConcurrency(self.max_concurrency)
+        self._stats_lock = threading.Lock()
+        self._stats = {
+            "submitted": 0,
+            "completed": 0,
+            "failed": 0,
+            "resumed": 0,
+            "retries": 0,
+            "throttled": 0
+        }
+        self._started: Optional[float] = None
+
+    def _count(self, key: str, value: int = 1):
+        with self._stats_lock:
+            self._stats[key] += value
+
+    def _call(self, index: int, prompt: PromptSpec) -> Dict[str, Any]:
+        """Run one prompt with retries (on a worker thread)"""
+        kwargs = {**self.chat_kwargs, **_prompt_kwargs(prompt)}
+        started = time.perf_counter()
+        attempt = 0
+
+        while True:
+            try:
+                # Batch nhường lượt cho request interactive trong rate limiter dùng chung;
+                # retry do runner đảm nhận (limiter không retry thêm) để AdaptiveConcurrency
+                # thấy từng lần throttle và số lần gọi không bị nhân lên
+                response = self.client.chat(raise_errors=True, priority=BATCH, max_retries=0, **kwargs)
+                self.concurrency.on_success()
+                return self._result(index, prompt, response, None, attempt + 1, started)
+            except Exception as e:
+                if is_throttling_error(e):
+                    self._count("throttled")
+                    self.concurrency.on_throttle()
+                if attempt >= self.max_retries or not is_retryable_error(e):
+                    return self._result(index, prompt, None, str(e), attempt + 1, started)
+                self._count("retries")
+                delay = backoff_delay(attempt, config.BATCH_BASE_BACKOFF, config.BATCH_MAX_BACKOFF)
+                logger.warning(f"Batch prompt {index} failed ({e}), retry {attempt + 1} in {delay:.1f}s")
+                time.sleep(delay)
+                attempt += 1
+
+    @staticmethod
+    def _result(
+        index: int,
+        prompt: PromptSpec,
+        response: Optional[str],
+        error: Optional[str],
+        attempts: int,
+        started: float
+    ) -> Dict[str, Any]:
+        return {
+            "index": index,
+            "key": _prompt_key(prompt),
+            "response": response,
+            "error": error,
+            "attempts": attempts,
+            "latency_ms": int((time.perf_counter() - started) * 1000)
+        }
+
+    def _load_checkpoint(self) -> Dict[int, Dict[str, Any]]:
+        """Successful results recorded by a previous run, by input index"""
+        done: Dict[int, Dict[str, Any]] = {}
+        if not self.checkpoint_path or not os.path.exists(self.checkpoint_path):
+            return done
+        with open(self.checkpoint_path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    # Last line of an interrupted run may be incomplete
+                    continue
+                if record.get("error") is None:
+                    done[record["index"]] = record
+        return done
+
+    def run(self, prompts: Iterable[PromptSpec], ordered: bool = False) -> Iterator[Dict[str, Any]]:
+        """
+        Run prompts and yield one result per prompt
+
+        Args:
+            prompts: Message strings or dicts of ClaudeClient.chat() arguments;
+                consumed lazily, so generators of any size are fine
+            ordered: Yield results in input order instead of completion order
+
+        Yields:
+            Dict[str, Any]: {"index", "key", "response", "error", "attempts", "latency_ms"}
+                (+ "resumed": True for results taken from the checkpoint)
+        """
+        self._started = time.perf_counter()
+        done = self._load_checkpoint()
+        checkpoint = open(self.checkpoint_path, "a", encoding="utf-8") if self.checkpoint_path else None
+        executor = ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix="bedrock-batch")
+
+        pending: Set[Future] = set()
+        buffered: Dict[int, Dict[str, Any]] = {}
+        next_index = 0
+        source = enumerate(prompts)
+        exhausted = False
+
+        def emit(result: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+            nonlocal next_index
+            if not ordered:
+                yield result
+                return
+            buffered[result["index"]] = result
+            while next_index in buffered:
+                yield buffered.pop(next_index)
+                next_index += 1
+
+        try:
+            while True:
+                # Fill free slots up to the current adaptive limit
+                while not exhausted and len(pending) < self.concurrency.limit:
+                    try:
+                        index, prompt = next(source)
+                    except StopIteration:
+                        exhausted = True
+                        break
+                    previous = done.get(index)
+                    if previous is not None and previous.get("key") == _prompt_key(prompt):
+                        self._count("resumed")
+                        yield from emit({**previous, "resumed": True})
+                        continue
+                    pending.add(executor.submit(self._call, index, prompt))
+                    self._count("submitted")
+
+                if not pending:
+                    if exhausted:
+                        break
+                    continue
+
+                finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    result = future.result()
+                    self._count("failed" if result["error"] else "completed")
+                    if checkpoint:
+                        checkpoint.write(json.dumps(result, ensure_ascii=False) + "\n")
+                        checkpoint.flush()
+                    yield from emit(result)
+        finally:
+            for future in pending:
+                future.cancel()
+            executor.shutdown(wait=True, cancel_futures=True)
+            if checkpoint:
+                checkpoint.close()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get progress, retry/throttle counters, current concurrency and throughput"""
+        with self._stats_lock:
+            stats = dict(self._stats)
+        elapsed = time.perf_counter() - self._started if self._started else 0.0
+        stats.update({
+            "concurrency_limit": self.concurrency.limit,
+            "max_concurrency": self.max_concurrency,
+            "elapsed_s": round(elapsed, 2),
+            "throughput_per_s": round(stats["completed"] / elapsed, 2) if elapsed else 0.0
+        })
+        return stats
+
+
+def run_batch(
+    prompts: Iterable[PromptSpec],
+    checkpoint_path: Optional[str] = None,
+    ordered: bool = True,
+    **kwargs
+) -> List[Dict[str, Any]]:
+    """
+    Run a batch and collect every result
+
+    Args:
+        prompts: Message strings or dicts of ClaudeClient.chat() arguments
+        checkpoint_path: JSONL checkpoint to resume an interrupted batch
+        ordered: Return results in input order (default) or completion order
+        **kwargs: BatchRunner arguments (client, max_concurrency, model_id, ...)
+
+    Returns:
+        List[Dict[str, Any]]: One result per prompt
+    """
+    runner = BatchRunner(checkpoint_path=checkpoint_path, **kwargs)
+    results = list(runner.run(prompts, ordered=ordered))
+    logger.info(f"Batch finished: {runner.get_stats()}")
+    return results
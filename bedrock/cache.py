@@ -0,0 +1,240 @@
+"""Exact-match request cache for Claude on Bedrock (memory LRU + SQLite)"""
+
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+import config
+
+logger = logging.getLogger(__name__)
+
+
+def make_cache_key(model_id: str, body: Dict[str, Any]) -> str:
+    """
+    Hash of everything that determines the model output
+
+    Args:
+        model_id: Bedrock model ID
+        body: Anthropic Messages request body
+
+    Returns:
+        str: SHA-256 hex digest of (model_id, system, messages, max_tokens, temperature)
+    """
+    payload = {
+        "model_id": model_id,
+        "system": body.get("system"),
+        "messages": body.get("messages"),
+        "max_tokens": body.get("max_tokens"),
+        "temperature": body.get("temperature")
+    }
+    raw = json.dumps(payload, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class RequestCache:
+    """
+    Two-tier cache of Claude responses
+
+    Hot entries live in an in-memory LRU; every entry is also written to a
+    SQLite file so later processes (batch jobs, test runs) hit the cache
+    without calling Bedrock. The disk tier is bounded by entry count and
+    total response size, evicting least recently used rows first.
+    """
+
+    def __init__(
+        self,
+        db_path: Optional[str] = None,
+        memory_entries: Optional[int] = None,
+        max_entries: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+        ttl_seconds: Optional[float] = None,
+        max_temperature: Optional[float] = None
+    ):
+        """
+        Initialize request cache
+
+        Args:
+            db_path: SQLite file, ":memory:" for a non-persistent store (default: config.CLAUDE_CACHE_DB)
+            memory_entries: Size of the in-memory LRU tier
+            max_entries: Maximum rows kept on disk
+            max_bytes: Maximum total response size kept on disk
+            ttl_seconds: Entry lifetime; 0 means never expire
+            max_temperature: Only requests at or below this temperature are cached
+        """
+        self.db_path = db_path or config.CLAUDE_CACHE_DB
+        self.memory_entries = memory_entries or config.CLAUDE_CACHE_MEMORY_ENTRIES
+        self.max_entries = max_entries or config.CLAUDE_CACHE_MAX_ENTRIES
+        self.max_bytes = max_bytes or config.CLAUDE_CACHE_MAX_BYTES
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else config.CLAUDE_CACHE_TTL
+        self.max_temperature = max_temperature if max_temperature is not None else config.CLAUDE_CACHE_MAX_TEMPERATURE
+
+        self._memory: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "misses": 0,
+            "stores": 0,
+            "skipped": 0,
+            "memory_evictions": 0,
+            "disk_evictions": 0,
+            "expired": 0
+        }
+
+        if self.db_path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(self.db_path)), exist_ok=True)
+        self._db = sqlite3.connect(self.db_path, check_same_thread=False, timeout=30)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            """CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                model_id TEXT,
+                response TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            )"""
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS idx_responses_last_access ON responses(last_access)")
+        self._db.commit()
+
+    def cacheable(self, body: Dict[str, Any]) -> bool:
+        """Only (near-)deterministic requests are worth caching"""
+        temperature = body.get("temperature")
+        return temperature is None or temperature <= self.max_temperature
+
+    def _expired(self, created_at: float, now: float) -> bool:
+        return bool(self.ttl_seconds) and now - created_at > self.ttl_seconds
+
+    def _remember(self, key: str, entry: Dict[str, Any]):
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+            self._stats["memory_evictions"] += 1
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        Look up a response
+
+        Args:
+            key: Key from make_cache_key()
+
+        Returns:
+            Optional[str]: Cached response text, or None on a miss
+        """
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                if not self._expired(entry["created_at"], now):
+                    self._memory.move_to_end(key)
+                    self._stats["memory_hits"] += 1
+                    return entry["response"]
+                del self._memory[key]
+
+            row = self._db.execute(
+                "SELECT response, created_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self._stats["misses"] += 1
+                return None
+
+            response, created_at = row
+            if self._expired(created_at, now):
+                self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._db.commit()
+                self._stats["expired"] += 1
+                self._stats["misses"] += 1
+                return None
+
+            self._db.execute("UPDATE responses SET last_access = ? WHERE key = ?", (now, key))
+            self._db.commit()
+            self._remember(key, {"response": response, "created_at": created_at})
+            self._stats["disk_hits"] += 1
+            return response
+
+    def put(self, key: str, response: str, model_id: Optional[str] = None):
+        """Store a response in both tiers and enforce the disk limits"""
+        now = time.time()
+        size = len(response.encode("utf-8"))
+        with self._lock:
+            if size > self.max_bytes:
+                self._stats["skipped"] += 1
+                return
+            self._remember(key, {"response": response, "created_at": now})
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses (key, model_id, response, size, created_at, last_access) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, model_id, response, size, now, now)
+            )
+            self._stats["stores"] += 1
+            self._enforce_limits()
+            self._db.commit()
+
+    def _enforce_limits(self):
+        count, total = self._db.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses").fetchone()
+        if count <= self.max_entries and total <= self.max_bytes:
+            return
+
+        evicted = []
+        for key, size in self._db.execute("SELECT key, size FROM responses ORDER BY last_access ASC"):
+            if count <= self.max_entries and total <= self.max_bytes:
+                break
+            evicted.append(key)
+            count -= 1
+            total -= size
+
+        self._db.executemany("DELETE FROM responses WHERE key = ?", [(key,) for key in evicted])
+        for key in evicted:
+            self._memory.pop(key, None)
+        self._stats["disk_evictions"] += len(evicted)
+
+    def clear(self):
+        """Remove every entry from both tiers"""
+        with self._lock:
+            self._memory.clear()
+            self._db.execute("DELETE FROM responses")
+            self._db.commit()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get hit/miss counters and tier sizes"""
+        with self._lock:
+            stats = dict(self._stats)
+            count, total = self._db.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses"
+            ).fetchone()
+            stats.update({
+                "memory_entries": len(self._memory),
+                "disk_entries": count,
+                "disk_bytes": total,
+                "db_path": self.db_path
+            })
+        hits = stats["memory_hits"] + stats["disk_hits"]
+        lookups = hits + stats["misses"]
+        stats["hit_rate"] = round(hits / lookups, 3) if lookups else 0.0
+        return stats
+
+    def close(self):
+        """Close the SQLite connection"""
+        with self._lock:
+            self._db.close()
+
+
+_default_cache: Optional[RequestCache] = None
+_default_lock = threading.Lock()
+
+
+def get_request_cache() -> RequestCache:
+    """Shared RequestCache built from config (one SQLite connection per process)"""
+    global _default_cache
+    with _default_lock:
+        if _default_cache is None:
+            _default_cache = RequestCache()
+        return _default_cache
@@ -0,0 +1,315 @@
+"""Cached catalog of Bedrock foundation models and inference profiles"""
+
+import logging
+import threading
+import time
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+import config
+
+logger = logging.getLogger(__name__)
+
+
+class ModelCatalog:
+    """
+    In-memory catalog of the models available in one region
+
+    list_foundation_models and list_inference_profiles are called once per
+    TTL; lookups are served from indexes by provider, input/output modality,
+    streaming support and inference profile. Bedrock is called outside the
+    index lock: while one thread refreshes a stale snapshot, other lookups
+    keep reading the previous one. If a refresh fails the previous snapshot
+    keeps being served.
+    """
+
+    def __init__(
+        self,
+        region_name: Optional[str] = None,
+        ttl_seconds: Optional[float] = None,
+        client=None
+    ):
+        """
+        Initialize model catalog
+
+        Args:
+            region_name: AWS region (default: config.AWS_REGION)
+            ttl_seconds: Snapshot lifetime (default: config.MODEL_CATALOG_TTL)
+            client: boto3 "bedrock" client (default: shared client from the registry)
+        """
+        self.region_name = region_name or config.AWS_REGION
+        self.ttl_seconds = config.MODEL_CATALOG_TTL if ttl_seconds is None else ttl_seconds
+        self._client = client
+
+        self._lock = threading.RLock()
+        self._refresh_lock = threading.Lock()
+        self._loaded_at: Optional[float] = None
+        self._models: Dict[str, Dict[str, Any]] = {}
+        self._profiles: Dict[str, Dict[str, Any]] = {}
+        self._by_provider: Dict[str, Set[str]] = defaultdict(set)
+        self._by_input: Dict[str, Set[str]] = defaultdict(set)
+        self._by_output: Dict[str, Set[str]] = defaultdict(set)
+        self._streaming: Set[str] = set()
+        self._profiles_by_model: Dict[str, List[str]] = defaultdict(list)
+        self._stats = {"refreshes": 0, "refresh_errors": 0, "lookups": 0}
+
+    @property
+    def client(self):
+        if self._client is None:
+            from .registry import get_client
+            self._client = get_client("bedrock", self.region_name)
+        return self._client
+
+    def _fetch_models(self) -> List[Dict[str, Any]]:
+        # list_foundation_models trả về toàn bộ danh sách trong một lần gọi (không phân trang)
+        return self.client.list_foundation_models().get("modelSummaries", [])
+
+    def _fetch_profiles(self) -> List[Dict[str, Any]]:
+        profiles = []
+        try:
+            paginator = self.client.get_paginator("list_inference_profiles")
+            for page in paginator.paginate(PaginationConfig={"PageSize": 100}):
+                profiles.extend(page.get("inferenceProfileSummaries", []))
+        except Exception as e:
+            # Thiếu quyền bedrock:ListInferenceProfiles không nên làm hỏng cả catalog
+            logger.warning(f"Could not list inference profiles in {self.region_name}: {e}")
+        return profiles
+
+    @staticmethod
+    def _model_entry(summary: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "modelId": summary.get("modelId"),
+            "modelName": summary.get("modelName"),
+            "providerName": summary.get("providerName"),
+            "inputModalities": summary.get("inputModalities", []),
+            "outputModalities": summary.get("outputModalities", []),
+            "responseStreamingSupported": bool(summary.get("responseStreamingSupported")),
+            "inferenceTypesSupported": summary.get("inferenceTypesSupported", []),
+            "lifecycleStatus": summary.get("modelLifecycle", {}).get("status", "ACTIVE"),
+            "inferenceProfiles": []
+        }
+
+    def refresh(self):
+        """Reload models and inference profiles from Bedrock and rebuild the indexes"""
+        try:
+            summaries = self._fetch_models()
+            profile_summaries = self._fetch_profiles()
+        except Exception as e:
+            with self._lock:
+                self._stats["refresh_errors"] += 1
+                if self._loaded_at is None:
+                    raise ValueError(f"Failed to list models: {e}")
+                # Giữ snapshot cũ và thử lại sau một TTL nữa
+                self._loaded_at = time.time()
+            logger.warning(f"Model catalog refresh failed in {self.region_name}, serving previous snapshot: {e}")
+            return
+
+        models = {}
+        by_provider, by_input, by_output = defaultdict(set), defaultdict(set), defaultdict(set)
+        streaming = set()
+        for summary in summaries:
+            entry = self._model_entry(summary)
+            model_id = entry["modelId"]
+            models[model_id] = entry
+            by_provider[(entry["providerName"] or "").lower()].add(model_id)
+            for modality in entry["inputModalities"]:
+                by_input[modality.upper()].add(model_id)
+            for modality in entry["outputModalities"]:
+                by_output[modality.upper()].add(model_id)
+            if entry["responseStreamingSupported"]:
+                streaming.add(model_id)
+
+        profiles = {}
+        profiles_by_model = defaultdict(list)
+        for summary in profile_summaries:
+            profile_id = summary.get("inferenceProfileId")
+            model_ids = sorted({
+                model.get("modelArn", "").split("/")[-1]
+                for model in summary.get("models", [])
+            })
+            profiles[profile_id] = {
+                "inferenceProfileId": profile_id,
+                "inferenceProfileName": summary.get("inferenceProfileName"),
+                "type": summary.get("type"),
+                "status": summary.get("status"),
+                "modelIds": model_ids
+            }
+            for model_id in model_ids:
+                profiles_by_model[model_id].append(profile_id)
+                if model_id in models:
+                    models[model_id]["inferenceProfiles"].append(profile_id)
+
+        with self._lock:
+            self._models = models
+            self._profiles = profiles
+            self._by_provider = by_provider
+            self._by_input = by_input
+            self._by_output = by_output
+            self._streaming = streaming
+            self._profiles_by_model = profiles_by_model
+            self._loaded_at = time.time()
+            self._stats["refreshes"] += 1
+        logger.info(f"Model catalog loaded for {self.region_name}: {len(models)} models, {len(profiles)} inference profiles")
+
+    def _is_stale(self) -> bool:
+        with self._lock:
+            return self._loaded_at is None or bool(
+                self.ttl_seconds and time.time() - self._loaded_at > self.ttl_seconds
+            )
+
+    def _ensure_fresh(self):
+        with self._lock:
+            self._stats["lookups"] += 1
+            loaded = self._loaded_at is not None
+        if not self._is_stale():
+            return
+
+        if loaded:
+            # Another thread is already refreshing: serve the previous snapshot
+            if not self._refresh_lock.acquire(blocking=False):
+                return
+        else:
+            # Nothing to serve yet: wait for the first load
+            self._refresh_lock.acquire()
+        try:
+            if self._is_stale():
+                self.refresh()
+        finally:
+            self._refresh_lock.release()
+
+    def list_models(self) -> List[Dict[str, Any]]:
+        """Every model in the region"""
+        self._ensure_fresh()
+        with self._lock:
+            return list(self._models.values())
+
+    def get_model(self, model_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up a model by ID or by inference profile ID (e.g. "us.anthropic...")
+
+        Args:
+            model_id: Foundation model ID or inference profile ID
+
+        Returns:
+            Optional[Dict[str, Any]]: Model entry, or None if unknown in this region
+        """
+        self._ensure_fresh()
+        with self._lock:
+            model = self._models.get(model_id)
+            if model is None and model_id in self._profiles:
+                model_ids = self._profiles[model_id]["modelIds"]
+                model = self._models.get(model_ids[0]) if model_ids else None
+            return model
+
+    def find_models(
+        self,
+        provider: Optional[str] = None,
+        input_modality: Optional[str] = None,
+        output_modality: Optional[str] = None,
+        streaming: Optional[bool] = None,
+        inference_type: Optional[str] = None,
+        active_only: bool = True
+    ) -> List[Dict[str, Any]]:
+        """
+        Filter models, e.g. find_models(output_modality="TEXT", streaming=True)
+
+        Args:
+            provider: Provider name, case-insensitive (e.g. "Anthropic")
+            input_modality: "TEXT", "IMAGE", ...
+            output_modality: "TEXT", "IMAGE", "EMBEDDING", ...
+            streaming: Only models with (or without) response streaming
+            inference_type: "ON_DEMAND", "PROVISIONED" or "INFERENCE_PROFILE"
+            active_only: Skip models whose lifecycle status is LEGACY
+
+        Returns:
+            List[Dict[str, Any]]: Matching models sorted by model ID
+        """
+        self._ensure_fresh()
+        with self._lock:
+            candidates = set(self._models)
+            if provider:
+                candidates &= self._by_provider.get(provider.lower(), set())
+            if input_modality:
+                candidates &= self._by_input.get(input_modality.upper(), set())
+            if output_modality:
+                candidates &= self._by_output.get(output_modality.upper(), set())
+            if streaming is not None:
+                candidates = candidates & self._streaming if streaming else candidates - self._streaming
+            models = [self._models[model_id] for model_id in sorted(candidates)]
+
+        if inference_type:
+            models = [model for model in models if inference_type in model["inferenceTypesSupported"]]
+        if active_only:
+            models = [model for model in models if model["lifecycleStatus"] == "ACTIVE"]
+        return models
+
+    def get_inference_profiles(self, model_id: str) -> List[Dict[str, Any]]:
+        """Inference profiles (cross-region IDs such as "us.<model>") that route to a model"""
+        self._ensure_fresh()
+        with self._lock:
+            return [self._profiles[profile_id] for profile_id in self._profiles_by_model.get(model_id, [])]
+
+    def resolve_model_id(self, model_id: str) -> str:
+        """
+        Model ID to invoke: models without on-demand throughput must be
+        called through an inference profile
+
+        Args:
+            model_id: Foundation model ID or inference profile ID
+
+        Returns:
+            str: The ID itself, or the first inference profile of the model
+        """
+        model = self.get_model(model_id)
+        with self._lock:
+            is_profile = model_id in self._profiles
+        if model is None or is_profile or "ON_DEMAND" in model["inferenceTypesSupported"]:
+            return model_id
+        profiles = model["inferenceProfiles"]
+        return profiles[0] if profiles else model_id
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get snapshot age, sizes and refresh counters"""
+        with self._lock:
+            return {
+                "region": self.region_name,
+                "models": len(self._models),
+                "inference_profiles": len(self._profiles),
+                "providers": sorted(provider for provider, ids in self._by_provider.items() if ids),
+                "age_s": round(time.time() - self._loaded_at, 1) if self._loaded_at else None,
+                "ttl_s": self.ttl_seconds,
+                **self._stats
+            }
+
+
+_catalogs: Dict[Tuple[str, str], ModelCatalog] = {}
+_catalogs_lock = threading.Lock()
+
+
+def get_model_catalog(
+    region_name: Optional[str] = None,
+    client=None,
+    credentials_key: Optional[str] = None
+) -> ModelCatalog:
+    """
+    Shared model catalog for a set of credentials in a region
+
+    Model access differs between accounts, so sessions with other
+    credentials (e.g. keys entered in the UI) get their own catalog.
+
+    Args:
+        region_name: AWS region (default: config.AWS_REGION)
+        client: boto3 "bedrock" client used if the catalog is created by this call
+        credentials_key: Identity of the credentials `client` was built with
+            (e.g. access key ID); None means the default credentials
+
+    Returns:
+        ModelCatalog: Process-wide catalog for the credentials and region
+    """
+    region_name = region_name or config.AWS_REGION
+    key = (credentials_key or "", region_name)
+    with _catalogs_lock:
+        catalog = _catalogs.get(key)
+        if catalog is None:
+            catalog = _catalogs[key] = ModelCatalog(region_name, client=client)
+        return catalog
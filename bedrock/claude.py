@@ -1,27 +1,89 @@
 """Claude integration with AWS Bedrock"""
 
+import asyncio
+import concurrent.futures
 import json
 import logging
-from typing import Dict, Any, Optional, List
+import functools
+import threading
+import time
+from typing import Dict, Any, Optional, List, Iterator, AsyncIterator, Union
 from .session import AWSSession, create_aws_session_from_env
+from .cache import RequestCache, get_request_cache, make_cache_key
+from .rate_limit import INTERACTIVE, get_rate_limiter
 import config
 
 logger = logging.getLogger(__name__)
 
+# Số event astream() giữ sẵn khi consumer chậm hơn Bedrock (backpressure)
+STREAM_QUEUE_SIZE = 64
+
+
+class StreamCancel:
+    """
+    Stop handle for chat_stream() running on another thread
+
+    cancel() stops the iteration at the next event and closes the Bedrock
+    response body, so a read blocked on the network ends at once and the
+    remaining tokens are not downloaded.
+    """
+    
+    def __init__(self):
+        self._stopped = threading.Event()
+        self._body = None
+        self._lock = threading.Lock()
+    
+    def is_set(self) -> bool:
+        return self._stopped.is_set()
+    
+    def attach(self, body):
+        """Register the response body of the running stream (closed at once if already cancelled)"""
+        with self._lock:
+            self._body = body
+        if self.is_set():
+            self._close(body)
+    
+    def cancel(self):
+        self._stopped.set()
+        with self._lock:
+            body = self._body
+        if body is not None:
+            self._close(body)
+    
+    @staticmethod
+    def _close(body):
+        try:
+            body.close()
+        except Exception as e:
+            logger.debug(f"Closing Bedrock stream failed: {e}")
+
 
 class ClaudeClient:
     """Client for interacting with Claude models on AWS Bedrock"""
     
-    def __init__(self, aws_session: Optional[AWSSession] = None):
+    def __init__(
+        self,
+        aws_session: Optional[AWSSession] = None,
+        cache: Union[RequestCache, bool, None] = None,
+        prompt_cache: bool = False
+    ):
         """
         Initialize Claude client
         
         Args:
             aws_session: AWS session object. If None, will create from environment
+            cache: Request cache for chat() (opt-in). True uses the shared cache
+                from config (memory LRU + SQLite), a RequestCache is used as is
+            prompt_cache: Mark the system prompt as a Bedrock prompt-cache
+                prefix (cache_control), for large system prompts reused across calls
         """
         self.aws_session = aws_session or create_aws_session_from_env()
         self.bedrock_runtime = self.aws_session.get_bedrock_runtime_client()
+        # Nhiều region (config.BEDROCK_REGIONS): route theo latency/lỗi, failover khi bị throttle
+        self.region_router = self.aws_session.get_region_router()
         self.default_model = config.CHATBOT_AGENT_MODEL
+        self.cache = get_request_cache() if cache is True else (cache or None)
+        self.prompt_cache = prompt_cache and config.BEDROCK_PROMPT_CACHE
     
     def chat(
         self,
@@ -30,7 +92,10 @@ class ClaudeClient:
         max_tokens: Optional[int] = None,
         temperature: Optional[float] = None,
         system_prompt: Optional[str] = None,
-        conversation_history: Optional[List[Dict[str, str]]] = None
+        conversation_history: Optional[List[Dict[str, str]]] = None,
+        raise_errors: bool = False,
+        priority: str = INTERACTIVE,
+        max_retries: Optional[int] = None
     ) -> str:
         """
         Send a chat message to Claude
@@ -42,45 +107,40 @@ class ClaudeClient:
             temperature: Temperature for response generation
             system_prompt: System prompt for Claude
             conversation_history: Previous conversation messages
+            raise_errors: Raise exceptions (e.g. throttling) instead of
+                returning an "Error: ..." string, for callers that retry
+            priority: Rate-limiter priority ("interactive" or "batch")
+            max_retries: Rate-limiter retries (default: config.RATE_LIMIT_MAX_RETRIES;
+                0 for callers that run their own retry loop)
         
         Returns:
             str: Claude's response
         """
         try:
-            # Use defaults from config if not provided
             model_id = model_id or self.default_model
-            max_tokens = max_tokens or config.BEDROCK_MAX_TOKENS
-            temperature = temperature or config.BEDROCK_TEMPERATURE
-            
-            # Build messages array
-            messages = []
-            
-            # Add conversation history if provided
-            if conversation_history:
-                messages.extend(conversation_history)
-            
-            # Add current user message
-            messages.append({
-                "role": "user",
-                "content": message
-            })
-            
-            # Prepare request body
-            body = {
-                "anthropic_version": "bedrock-2023-05-31",
-                "max_tokens": max_tokens,
-                "temperature": temperature,
-                "messages": messages
-            }
+            body = self._build_request_body(
+                message=message,
+                max_tokens=max_tokens,
+                temperature=temperature,
+                system_prompt=system_prompt,
+                conversation_history=conversation_history
+            )
             
-            # Add system prompt if provided
-            if system_prompt:
-                body["system"] = system_prompt
+            cache_key = None
+            if self.cache is not None and self.cache.cacheable(body):
+                cache_key = make_cache_key(model_id, body)
+                cached = self.cache.get(cache_key)
+                if cached is not None:
+                    logger.info(f"Claude response served from cache: {model_id}")
+                    return cached
             
             logger.info(f"Sending request to Claude model: {model_id}")
             
             # Call Bedrock
-            response = self.bedrock_runtime.invoke_model(
+            response = self._invoke(
+                "invoke_model",
+                priority,
+                max_retries=max_retries,
                 modelId=model_id,
                 body=json.dumps(body),
                 contentType="application/json"
@@ -89,16 +149,303 @@ class ClaudeClient:
             # Parse response
             response_body = json.loads(response['body'].read())
             
+            usage = response_body.get('usage', {})
+            if usage.get('cache_read_input_tokens') or usage.get('cache_creation_input_tokens'):
+                logger.info(
+                    f"Prompt cache: read {usage.get('cache_read_input_tokens', 0)}, "
+                    f"write {usage.get('cache_creation_input_tokens', 0)} input tokens"
+                )
+            
             if 'content' in response_body and len(response_body['content']) > 0:
-                return response_body['content'][0]['text']
+                text = response_body['content'][0]['text']
+                if cache_key:
+                    self.cache.put(cache_key, text, model_id)
+                return text
             else:
                 logger.error(f"Unexpected response format: {response_body}")
+                if raise_errors:
+                    raise ValueError("Unexpected response format from Claude")
                 return "Error: Unexpected response format from Claude"
                 
         except Exception as e:
+            if raise_errors:
+                raise
             logger.error(f"Error calling Claude: {e}")
             return f"Error: {str(e)}"
     
+    def chat_stream(
+        self,
+        message: str,
+        model_id: Optional[str] = None,
+        max_tokens: Optional[int] = None,
+        temperature: Optional[float] = None,
+        system_prompt: Optional[str] = None,
+        conversation_history: Optional[List[Dict[str, str]]] = None,
+        priority: str = INTERACTIVE,
+        cancel: Optional[StreamCancel] = None
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Send a chat message to Claude and yield response events as they arrive
+        
+        Uses the same request body as chat(), sent through
+        invoke_model_with_response_stream.
+        
+        Args:
+            message: User message
+            model_id: Claude model ID (default from config)
+            max_tokens: Maximum tokens to generate
+            temperature: Temperature for response generation
+            system_prompt: System prompt for Claude
+            conversation_history: Previous conversation messages
+            priority: Rate-limiter priority ("interactive" or "batch")
+            cancel: Stops the stream from another thread (no further events)
+        
+        Yields:
+            Dict[str, Any]: One of
+                {"type": "text", "text": ...}
+                {"type": "tool_use", "id": ..., "name": ..., "input_delta": ...}
+                {"type": "usage", "input_tokens": ..., "output_tokens": ...,
+                 "cache_read_input_tokens": ..., "cache_write_input_tokens": ...,
+                 "stop_reason": ..., "first_token_ms": ..., "latency_ms": ...}
+                {"type": "error", "error": ...}
+        """
+        response = None
+        try:
+            model_id = model_id or self.default_model
+            body = self._build_request_body(
+                message=message,
+                max_tokens=max_tokens,
+                temperature=temperature,
+                system_prompt=system_prompt,
+                conversation_history=conversation_history
+            )
+            
+            logger.info(f"Sending streaming request to Claude model: {model_id}")
+            started = time.perf_counter()
+            
+            # Throttling xảy ra trước khi stream bắt đầu nên retry an toàn
+            response = self._invoke(
+                "invoke_model_with_response_stream",
+                priority,
+                modelId=model_id,
+                body=json.dumps(body),
+                contentType="application/json"
+            )
+            if cancel is not None:
+                cancel.attach(response['body'])
+            
+            usage = {
+                "type": "usage",
+                "input_tokens": 0,
+                "output_tokens": 0,
+                "cache_read_input_tokens": 0,
+                "cache_write_input_tokens": 0,
+                "stop_reason": None,
+                "first_token_ms": None,
+                "latency_ms": 0
+            }
+            # Map content block index -> tool_use block (id, name)
+            tool_blocks: Dict[int, Dict[str, str]] = {}
+            
+            for event in response['body']:
+                if cancel is not None and cancel.is_set():
+                    return
+                chunk = event.get('chunk')
+                if not chunk:
+                    continue
+                
+                data = json.loads(chunk['bytes'])
+                event_type = data.get('type')
+                
+                if usage["first_token_ms"] is None and event_type in ('content_block_start', 'content_block_delta'):
+                    usage["first_token_ms"] = int((time.perf_counter() - started) * 1000)
+                
+                if event_type == 'message_start':
+                    message_usage = data.get('message', {}).get('usage', {})
+                    usage["input_tokens"] = message_usage.get('input_tokens', 0)
+                    usage["cache_read_input_tokens"] = message_usage.get('cache_read_input_tokens', 0)
+                    usage["cache_write_input_tokens"] = message_usage.get('cache_creation_input_tokens', 0)
+                
+                elif event_type == 'content_block_start':
+                    block = data.get('content_block', {})
+                    if block.get('type') == 'tool_use':
+                        tool_blocks[data.get('index')] = {'id': block.get('id'), 'name': block.get('name')}
+                        yield {
+                            "type": "tool_use",
+                            "id": block.get('id'),
+                            "name": block.get('name'),
+                            "input_delta": ""
+                        }
+                
+                elif event_type == 'content_block_delta':
+                    delta = data.get('delta', {})
+                    if delta.get('type') == 'text_delta':
+                        yield {"type": "text", "text": delta.get('text', '')}
+                    elif delta.get('type') == 'input_json_delta':
+                        block = tool_blocks.get(data.get('index'), {})
+                        yield {
+                            "type": "tool_use",
+                            "id": block.get('id'),
+                            "name": block.get('name'),
+                            "input_delta": delta.get('partial_json', '')
+                        }
+                
+                elif event_type == 'message_delta':
+                    usage["stop_reason"] = data.get('delta', {}).get('stop_reason')
+                    usage["output_tokens"] = data.get('usage', {}).get('output_tokens', usage["output_tokens"])
+            
+            usage["latency_ms"] = int((time.perf_counter() - started) * 1000)
+            yield usage
+        
+        except Exception as e:
+            if cancel is not None and cancel.is_set():
+                # Body bị đóng do cancel: không phải lỗi
+                return
+            logger.error(f"Error streaming from Claude: {e}")
+            yield {"type": "error", "error": str(e)}
+        finally:
+            # Consumer dừng sớm (generator bị đóng): không đọc tiếp phần còn lại của stream
+            if response is not None:
+                StreamCancel._close(response['body'])
+    
+    async def astream(
+        self,
+        message: str,
+        model_id: Optional[str] = None,
+        max_tokens: Optional[int] = None,
+        temperature: Optional[float] = None,
+        system_prompt: Optional[str] = None,
+        conversation_history: Optional[List[Dict[str, str]]] = None,
+        priority: str = INTERACTIVE,
+        executor: Optional[concurrent.futures.Executor] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Async version of chat_stream()
+        
+        The blocking boto3 event stream is consumed on a worker thread and
+        each event is handed to the event loop as soon as it is decoded. At
+        most STREAM_QUEUE_SIZE events are buffered: a slow consumer slows the
+        reader down. When the consumer stops early (aclose, cancellation) the
+        worker stops and the Bedrock response body is closed.
+        
+        Args:
+            executor: Pool running the blocking reader (default: the event loop's default executor)
+        
+        Yields:
+            Dict[str, Any]: Same events as chat_stream()
+        """
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue(maxsize=STREAM_QUEUE_SIZE)
+        cancel = StreamCancel()
+        done = object()
+        
+        def put(item) -> bool:
+            # Chờ chỗ trống trong queue nhưng vẫn thấy cancel khi consumer đã dừng
+            future = asyncio.run_coroutine_threadsafe(queue.put(item), loop)
+            while True:
+                try:
+                    future.result(timeout=0.1)
+                    return True
+                except concurrent.futures.TimeoutError:
+                    if cancel.is_set():
+                        future.cancel()
+                        return False
+        
+        def produce():
+            events = self.chat_stream(
+                message=message,
+                model_id=model_id,
+                max_tokens=max_tokens,
+                temperature=temperature,
+                system_prompt=system_prompt,
+                conversation_history=conversation_history,
+                priority=priority,
+                cancel=cancel
+            )
+            try:
+                for event in events:
+                    if cancel.is_set() or not put(event):
+                        break
+            finally:
+                events.close()
+                if not cancel.is_set():
+                    put(done)
+        
+        producer = loop.run_in_executor(executor, produce)
+        
+        finished = False
+        try:
+            while True:
+                event = await queue.get()
+                if event is done:
+                    finished = True
+                    break
+                yield event
+        finally:
+            if not finished:
+                cancel.cancel()
+        
+        await producer
+    
+    def _invoke(self, operation: str, priority: str, max_retries: Optional[int] = None, **kwargs):
+        """
+        Send a Bedrock Runtime request through the model's shared rate limiter
+        (retries throttling up to `max_retries` times) and, with several
+        BEDROCK_REGIONS, the region router
+        """
+        if self.region_router is not None:
+            request = functools.partial(self.region_router.invoke, operation, **kwargs)
+        else:
+            request = functools.partial(getattr(self.bedrock_runtime, operation), **kwargs)
+        
+        if not config.RATE_LIMIT_ENABLED:
+            return request()
+        return get_rate_limiter(kwargs["modelId"]).call(request, priority=priority, max_retries=max_retries)
+    
+    def _build_request_body(
+        self,
+        message: str,
+        max_tokens: Optional[int] = None,
+        temperature: Optional[float] = None,
+        system_prompt: Optional[str] = None,
+        conversation_history: Optional[List[Dict[str, str]]] = None
+    ) -> Dict[str, Any]:
+        """Build the Anthropic Messages request body shared by chat() and chat_stream()"""
+        # Use defaults from config if not provided
+        max_tokens = max_tokens or config.BEDROCK_MAX_TOKENS
+        # 0.0 là giá trị hợp lệ (phân loại tất định): chỉ dùng default khi không truyền
+        temperature = config.BEDROCK_TEMPERATURE if temperature is None else temperature
+        
+        # Build messages array
+        messages = []
+        
+        # Add conversation history if provided
+        if conversation_history:
+            messages.extend(conversation_history)
+        
+        # Add current user message
+        messages.append({
+            "role": "user",
+            "content": message
+        })
+        
+        # Prepare request body
+        body = {
+            "anthropic_version": "bedrock-2023-05-31",
+            "max_tokens": max_tokens,
+            "temperature": temperature,
+            "messages": messages
+        }
+        
+        # Add system prompt if provided
+        if system_prompt and self.prompt_cache:
+            # Prompt caching: system prompt tĩnh được Bedrock cache giữa các lần gọi
+            body["system"] = [{"type": "text", "text": system_prompt, "cache_control": {"type": "ephemeral"}}]
+        elif system_prompt:
+            body["system"] = system_prompt
+        
+        return body
+    
     def chat_with_context(
         self,
         message: str,
@@ -157,6 +504,24 @@ class ClaudeClient:
         )
 
 
+_shared_client: Optional[ClaudeClient] = None
+_shared_lock = threading.Lock()
+
+
+def get_shared_claude_client() -> ClaudeClient:
+    """
+    Process-wide ClaudeClient (session + STS validation happen once)
+    
+    Returns:
+        ClaudeClient: Shared client, with the request cache when config.CLAUDE_CACHE_ENABLED
+    """
+    global _shared_client
+    with _shared_lock:
+        if _shared_client is None:
+            _shared_client = ClaudeClient(cache=config.CLAUDE_CACHE_ENABLED)
+        return _shared_client
+
+
 # Convenience functions
 def chat_with_claude(
     message: str,
@@ -178,7 +543,7 @@ def chat_with_claude(
     Returns:
         str: Claude's response
     """
-    client = ClaudeClient()
+    client = get_shared_claude_client()
     return client.chat(
         message=message,
         model_id=model_id,
@@ -187,3 +552,29 @@ def chat_with_claude(
         system_prompt=system_prompt
     )
 
+
+def ask_claude(
+    prompt: str,
+    model_id: Optional[str] = None,
+    max_tokens: Optional[int] = None,
+    temperature: Optional[float] = None
+) -> str:
+    """
+    Quick function to send a single prompt to Claude
+    
+    Args:
+        prompt: Input prompt
+        model_id: Claude model ID
+        max_tokens: Maximum tokens to generate
+        temperature: Temperature for response generation
+    
+    Returns:
+        str: Claude's response
+    """
+    client = get_shared_claude_client()
+    return client.generate_response(
+        prompt=prompt,
+        model_id=model_id,
+        max_tokens=max_tokens,
+        temperature=temperature
+    )
@@ -0,0 +1,260 @@
+"""Adaptive rate limiting and retries for Bedrock throttling"""
+
+import logging
+import random
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, TypeVar
+
+from botocore.exceptions import ClientError
+
+import config
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Request priorities: interactive traffic (chat, agents) always goes before batch jobs
+INTERACTIVE = "interactive"
+BATCH = "batch"
+PRIORITIES = (INTERACTIVE, BATCH)
+
+# Lỗi tạm thời: retry với backoff; các lỗi throttle còn làm giảm rate
+THROTTLING_ERRORS = {"ThrottlingException", "TooManyRequestsException", "ServiceQuotaExceededException"}
+TRANSIENT_ERRORS = {"ServiceUnavailableException", "ModelNotReadyException", "ModelTimeoutException", "InternalServerException"}
+
+
+class RateLimitTimeout(Exception):
+    """Raised when a request waited longer than its timeout for a rate-limit token"""
+
+
+def _error_code(error: Exception) -> Optional[str]:
+    if isinstance(error, ClientError):
+        return error.response.get("Error", {}).get("Code")
+    return None
+
+
+def is_throttling_error(error: Exception) -> bool:
+    """True if Bedrock rejected the request for exceeding a rate or token quota"""
+    code = _error_code(error)
+    return code in THROTTLING_ERRORS or (code is None and "throttl" in str(error).lower())
+
+
+def is_retryable_error(error: Exception) -> bool:
+    """True if the request may succeed when retried"""
+    return is_throttling_error(error) or _error_code(error) in TRANSIENT_ERRORS
+
+
+def backoff_delay(attempt: int, base: float, cap: float) -> float:
+    """Exponential backoff with full jitter: uniform(0, min(cap, base * 2^attempt))"""
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+class AdaptiveRateLimiter:
+    """
+    Token bucket whose refill rate adapts to Bedrock throttling (AIMD)
+
+    Every successful request raises the rate by a small step (additive
+    increase); a throttled request halves it and drains the bucket
+    (multiplicative decrease), at most once per cooldown so a burst of
+    throttles counts as one signal. Waiting requests are served by
+    priority: batch requests only get a token when no interactive request
+    is waiting.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        max_rate: Optional[float] = None,
+        min_rate: Optional[float] = None,
+        burst: Optional[float] = None,
+        increase: Optional[float] = None
+    ):
+        """
+        Initialize rate limiter
+
+        Args:
+            name: Limiter name (model ID)
+            max_rate: Upper bound and starting rate in requests/second
+            min_rate: Lower bound of the rate after throttling
+            burst: Bucket capacity (requests allowed back to back)
+            increase: Rate added per successful request
+        """
+        self.name = name
+        self.max_rate = max_rate or config.RATE_LIMIT_MAX_RPS
+        self.min_rate = min_rate or config.RATE_LIMIT_MIN_RPS
+        self.burst = burst or config.RATE_LIMIT_BURST
+        self.increase = increase if increase is not None else config.RATE_LIMIT_INCREASE
+        self.rate = self.max_rate
+        self.tokens = self.burst
+
+        self._updated = time.monotonic()
+        self._last_decrease = 0.0
+        self._cond = threading.Condition()
+        self._waiting = {priority: 0 for priority in PRIORITIES}
+        self._stats = {
+            "acquired": 0,
+            "timeouts": 0,
+            "throttled": 0,
+            "rate_decreases": 0,
+            "retries": 0,
+            "total_wait_s": 0.0,
+            "max_wait_s": 0.0
+        }
+
+    def _refill(self, now: float):
+        self.tokens = min(self.burst, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self, priority: str = INTERACTIVE, timeout: Optional[float] = None) -> float:
+        """
+        Block until a token is available
+
+        Args:
+            priority: INTERACTIVE or BATCH
+            timeout: Maximum seconds to wait (default: config.RATE_LIMIT_ACQUIRE_TIMEOUT, 0 = no limit)
+
+        Returns:
+            float: Seconds spent waiting
+
+        Raises:
+            RateLimitTimeout: If no token became available within the timeout
+        """
+        timeout = config.RATE_LIMIT_ACQUIRE_TIMEOUT if timeout is None else timeout
+        started = time.monotonic()
+        deadline = started + timeout if timeout else None
+
+        with self._cond:
+            self._waiting[priority] += 1
+            try:
+                while True:
+                    now = time.monotonic()
+                    self._refill(now)
+                    may_take = priority == INTERACTIVE or self._waiting[INTERACTIVE] == 0
+                    if may_take and self.tokens >= 1:
+                        self.tokens -= 1
+                        break
+
+                    # Ngủ tới khi đủ 1 token (hoặc tới khi request interactive trả lượt)
+                    sleep = max((1 - self.tokens) / self.rate, 0.01) if may_take else 0.05
+                    if deadline is not None:
+                        remaining = deadline - now
+                        if remaining <= 0:
+                            self._stats["timeouts"] += 1
+                            raise RateLimitTimeout(
+                                f"Rate limiter '{self.name}': no token within {timeout}s ({priority})"
+                            )
+                        sleep = min(sleep, remaining)
+                    self._cond.wait(sleep)
+            finally:
+                self._waiting[priority] -= 1
+                self._cond.notify_all()
+
+            waited = time.monotonic() - started
+            self._stats["acquired"] += 1
+            self._stats["total_wait_s"] += waited
+            self._stats["max_wait_s"] = max(self._stats["max_wait_s"], waited)
+            return waited
+
+    def on_success(self):
+        """Additive increase"""
+        with self._cond:
+            self.rate = min(self.max_rate, self.rate + self.increase)
+
+    def on_throttle(self):
+        """Multiplicative decrease (at most once per cooldown) and drain the bucket"""
+        with self._cond:
+            self._stats["throttled"] += 1
+            now = time.monotonic()
+            if now - self._last_decrease < config.RATE_LIMIT_COOLDOWN:
+                return
+            self._last_decrease = now
+            self.rate = max(self.min_rate, self.rate / 2)
+            self._refill(now)
+            self.tokens = min(self.tokens, 0)
+            self._stats["rate_decreases"] += 1
+            logger.warning(f"Bedrock throttling on {self.name}: rate lowered to {self.rate:.2f} req/s")
+
+    def call(
+        self,
+        func: Callable[[], T],
+        priority: str = INTERACTIVE,
+        max_retries: Optional[int] = None
+    ) -> T:
+        """
+        Run func under the limiter, retrying throttling/transient errors with jittered backoff
+
+        Args:
+            func: Bedrock call without arguments (e.g. functools.partial(client.invoke_model, ...))
+            priority: INTERACTIVE or BATCH
+            max_retries: Retries after the first attempt (default: config.RATE_LIMIT_MAX_RETRIES)
+
+        Returns:
+            Result of func
+        """
+        max_retries = config.RATE_LIMIT_MAX_RETRIES if max_retries is None else max_retries
+        attempt = 0
+
+        while True:
+            self.acquire(priority)
+            try:
+                result = func()
+            except Exception as e:
+                if is_throttling_error(e):
+                    self.on_throttle()
+                if attempt >= max_retries or not is_retryable_error(e):
+                    raise
+                delay = backoff_delay(attempt, config.RATE_LIMIT_BASE_BACKOFF, config.RATE_LIMIT_MAX_BACKOFF)
+                with self._cond:
+                    self._stats["retries"] += 1
+                logger.info(f"Retrying {self.name} in {delay:.2f}s after: {e}")
+                time.sleep(delay)
+                attempt += 1
+                continue
+
+            self.on_success()
+            return result
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get current rate, queue depth per priority and wait times"""
+        with self._cond:
+            self._refill(time.monotonic())
+            stats = dict(self._stats)
+            stats.update({
+                "rate": round(self.rate, 3),
+                "max_rate": self.max_rate,
+                "tokens": round(self.tokens, 2),
+                "queue_depth": dict(self._waiting)
+            })
+        stats["avg_wait_ms"] = round(stats["total_wait_s"] / stats["acquired"] * 1000, 1) if stats["acquired"] else 0.0
+        stats["max_wait_ms"] = round(stats.pop("max_wait_s") * 1000, 1)
+        stats["total_wait_s"] = round(stats["total_wait_s"], 3)
+        return stats
+
+
+_limiters: Dict[str, AdaptiveRateLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(model_id: str) -> AdaptiveRateLimiter:
+    """
+    Shared rate limiter for a model (Bedrock quotas are per model)
+
+    Args:
+        model_id: Bedrock model ID or inference profile
+
+    Returns:
+        AdaptiveRateLimiter: Process-wide limiter for the model
+    """
+    with _limiters_lock:
+        limiter = _limiters.get(model_id)
+        if limiter is None:
+            limiter = _limiters[model_id] = AdaptiveRateLimiter(model_id)
+        return limiter
+
+
+def get_rate_limiter_stats() -> Dict[str, Dict[str, Any]]:
+    """Get stats of every rate limiter, by model ID"""
+    with _limiters_lock:
+        limiters = list(_limiters.values())
+    return {limiter.name: limiter.get_stats() for limiter in limiters}
@@ -0,0 +1,155 @@
+"""Process-wide registry of shared boto3 sessions, clients and BedrockModel instances"""
+
+import threading
+import logging
+from typing import Dict, Any, Optional, Tuple
+
+import boto3
+from botocore.config import Config as BotocoreConfig
+from strands.models import BedrockModel
+from strands.models.model import CacheConfig
+
+import config
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.RLock()
+_sessions: Dict[str, boto3.Session] = {}
+_clients: Dict[Tuple[str, str], Any] = {}
+_models: Dict[Tuple[str, str, float, int, bool], BedrockModel] = {}
+
+
+def _client_config() -> BotocoreConfig:
+    """Botocore config shared by every client handed out by the registry"""
+    return BotocoreConfig(
+        user_agent_extra="strands-agents",
+        read_timeout=config.BEDROCK_READ_TIMEOUT,
+        max_pool_connections=config.BEDROCK_MAX_POOL_CONNECTIONS,
+        retries={"mode": config.BEDROCK_RETRY_MODE, "max_attempts": config.BEDROCK_MAX_ATTEMPTS}
+    )
+
+
+def get_boto_session(region_name: Optional[str] = None) -> boto3.Session:
+    """
+    Get the shared boto3 session for a region
+
+    Credentials are resolved once per region from config.py (.env) or the
+    default credential chain.
+
+    Args:
+        region_name: AWS region (default: config.AWS_REGION)
+
+    Returns:
+        boto3.Session: Shared session
+    """
+    region_name = region_name or config.AWS_REGION
+
+    with _lock:
+        session = _sessions.get(region_name)
+        if session is None:
+            session = boto3.Session(
+                aws_access_key_id=config.AWS_ACCESS_KEY_ID or None,
+                aws_secret_access_key=config.AWS_SECRET_ACCESS_KEY or None,
+                aws_session_token=config.AWS_SESSION_TOKEN or None,
+                region_name=region_name
+            )
+            _sessions[region_name] = session
+            logger.info(f"Created shared boto3 session for region: {region_name}")
+        return session
+
+
+def get_client(service_name: str, region_name: Optional[str] = None):
+    """
+    Get a shared boto3 client (one connection pool per service and region)
+
+    Args:
+        service_name: AWS service name, e.g. "bedrock-runtime", "textract"
+        region_name: AWS region (default: config.AWS_REGION)
+
+    Returns:
+        Shared boto3 client
+    """
+    region_name = region_name or config.AWS_REGION
+    key = (service_name, region_name)
+
+    with _lock:
+        client = _clients.get(key)
+        if client is None:
+            client = get_boto_session(region_name).client(service_name, config=_client_config())
+            _clients[key] = client
+            logger.info(
+                f"Created shared {service_name} client for region: {region_name} "
+                f"(max_pool_connections={config.BEDROCK_MAX_POOL_CONNECTIONS})"
+            )
+        return client
+
+
+def get_bedrock_model(
+    model_id: Optional[str] = None,
+    temperature: Optional[float] = None,
+    max_tokens: Optional[int] = None,
+    region_name: Optional[str] = None,
+    prompt_cache: bool = False
+) -> BedrockModel:
+    """
+    Get a shared BedrockModel keyed by (region, model_id, temperature, max_tokens, prompt_cache)
+
+    Every model returned by the registry talks to Bedrock through the same
+    bedrock-runtime client for its region, so the whole process shares one
+    credential resolution and one HTTP connection pool per region.
+
+    Args:
+        model_id: Bedrock model ID (default: config.CHATBOT_AGENT_MODEL)
+        temperature: Temperature (default: config.BEDROCK_TEMPERATURE)
+        max_tokens: Maximum tokens (default: config.BEDROCK_MAX_TOKENS)
+        region_name: AWS region (default: config.AWS_REGION)
+        prompt_cache: Mark the system prompt and tool schemas as Bedrock cache
+            points, for agents with a large static prompt (ignored when
+            config.BEDROCK_PROMPT_CACHE is off)
+
+    Returns:
+        BedrockModel: Shared model instance
+    """
+    region_name = region_name or config.AWS_REGION
+    model_id = model_id or config.CHATBOT_AGENT_MODEL
+    temperature = config.BEDROCK_TEMPERATURE if temperature is None else temperature
+    max_tokens = max_tokens or config.BEDROCK_MAX_TOKENS
+    prompt_cache = bool(prompt_cache and config.BEDROCK_PROMPT_CACHE)
+    key = (region_name, model_id, temperature, max_tokens, prompt_cache)
+
+    with _lock:
+        model = _models.get(key)
+        if model is None:
+            cache_options = {}
+            if prompt_cache:
+                # Cache point sau system prompt và sau tool schemas (prefix tĩnh giống nhau mỗi lần gọi)
+                cache_options["cache_config"] = CacheConfig(
+                    strategy="auto",
+                    ttl=config.BEDROCK_PROMPT_CACHE_TTL or None,
+                    system_prompt_ttl=True,
+                    tools_ttl=True
+                )
+            model = BedrockModel(
+                boto_session=get_boto_session(region_name),
+                boto_client_config=_client_config(),
+                model_id=model_id,
+                temperature=temperature,
+                max_tokens=max_tokens,
+                **cache_options
+            )
+            # BedrockModel always builds its own client; point it at the shared one
+            model.client = get_client("bedrock-runtime", region_name)
+            _models[key] = model
+            logger.info(f"Created shared BedrockModel: {key}")
+        return model
+
+
+def get_registry_stats() -> Dict[str, Any]:
+    """Get the number of shared sessions, clients and models"""
+    with _lock:
+        return {
+            "sessions": list(_sessions.keys()),
+            "clients": [f"{service}@{region}" for service, region in _clients.keys()],
+            "models": len(_models),
+            "max_pool_connections": config.BEDROCK_MAX_POOL_CONNECTIONS
+        }
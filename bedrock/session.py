@@ -2,12 +2,32 @@
 
 import boto3
 import os
-from typing import Optional, Dict, Any
-from botocore.exceptions import ClientError, NoCredentialsError
+import threading
+import time
+import weakref
+from collections import deque
+from typing import Optional, Dict, Any, List, Tuple
+from botocore.config import Config as BotocoreConfig
+from botocore.exceptions import ClientError, NoCredentialsError, ConnectionError as BotocoreConnectionError
 import logging
 
+from .rate_limit import is_retryable_error, is_throttling_error
+
 logger = logging.getLogger(__name__)
 
+# Cache kết quả STS get-caller-identity theo credentials (dùng chung mọi AWSSession trong process)
+_identity_cache: Dict[Tuple[str, str], Dict[str, Any]] = {}
+_identity_lock = threading.Lock()
+
+VALIDATION_MODES = ("eager", "deferred", "off")
+
+
+def clear_identity_cache():
+    """Forget every cached caller identity (e.g. after rotating credentials)"""
+    with _identity_lock:
+        _identity_cache.clear()
+
+
 class AWSSession:
     """AWS Session manager for Bedrock services"""
     
@@ -15,6 +35,11 @@ class AWSSession:
         self.session = None
         self.bedrock_client = None
         self.bedrock_runtime_client = None
+        self.region_router: Optional["RegionRouter"] = None
+        self.validation_error: Optional[str] = None
+        self._validation_thread: Optional[threading.Thread] = None
+        self._refresh_stop = threading.Event()
+        self._refresh_thread: Optional[threading.Thread] = None
     
     def create_session(
         self,
@@ -22,7 +47,8 @@ class AWSSession:
         secret_access_key: Optional[str] = None,
         session_token: Optional[str] = None,
         region_name: str = "us-east-1",
-        profile_name: Optional[str] = None
+        profile_name: Optional[str] = None,
+        validate: Optional[str] = None
     ) -> boto3.Session:
         """
         Tạo AWS session với access key hoặc profile
@@ -33,6 +59,10 @@ class AWSSession:
             session_token: AWS Session Token (cho temporary credentials)
             region_name: AWS region (default: us-east-1)
             profile_name: AWS profile name (alternative to access keys)
+            validate: "eager" (STS call now, raise on bad credentials),
+                "deferred" (STS call on a background thread) or "off"
+                (default: config.AWS_SESSION_VALIDATION). The identity is
+                cached per credentials, so only the first session pays for it
         
         Returns:
             boto3.Session: AWS session object
@@ -61,8 +91,23 @@ class AWSSession:
                 self.session = boto3.Session(region_name=region_name)
                 logger.info("Created session with default credentials")
             
-            # Test session bằng cách gọi STS get-caller-identity
-            self._validate_session()
+            # Test session bằng cách gọi STS get-caller-identity (một lần, có cache)
+            import config
+            validate = validate or config.AWS_SESSION_VALIDATION
+            if validate not in VALIDATION_MODES:
+                raise ValueError(f"Unknown validation mode: {validate} (expected one of {VALIDATION_MODES})")
+            
+            if validate == "eager":
+                self._validate_session()
+            elif validate == "deferred":
+                self._validation_thread = threading.Thread(
+                    target=self._validate_in_background,
+                    name="aws-session-validate",
+                    daemon=True
+                )
+                self._validation_thread.start()
+            
+            self._start_credential_refresh()
             
             return self.session
             
@@ -79,16 +124,102 @@ class AWSSession:
             raise ValueError(f"Failed to create AWS session: {e}")
     
     def _validate_session(self):
-        """Validate session by calling STS get-caller-identity"""
+        """Validate session by calling STS get-caller-identity (cached)"""
         try:
-            sts_client = self.session.client('sts')
-            identity = sts_client.get_caller_identity()
+            identity = self.get_caller_identity()
+            self.validation_error = None
             logger.info(f"Session validated for account: {identity.get('Account')}")
             logger.info(f"User ARN: {identity.get('Arn')}")
         except Exception as e:
+            self.validation_error = str(e)
             logger.error(f"Session validation failed: {e}")
             raise ValueError(f"Invalid AWS credentials: {e}")
     
+    def _validate_in_background(self):
+        try:
+            self._validate_session()
+        except ValueError:
+            # Lỗi đã được log; request đầu tiên tới Bedrock sẽ báo lỗi credentials
+            pass
+    
+    def _identity_key(self) -> Tuple[str, str]:
+        """Cache key: access key of the resolved credentials (+ region of the STS endpoint)"""
+        credentials = self.session.get_credentials()
+        if credentials is None:
+            raise NoCredentialsError()
+        return (credentials.access_key, self.session.region_name or "")
+    
+    def _credentials_expiry(self) -> Optional[float]:
+        """Expiry (epoch seconds) of temporary credentials, None for long-lived keys"""
+        expiry = getattr(self.session.get_credentials(), "_expiry_time", None)
+        return expiry.timestamp() if expiry is not None else None
+    
+    def get_caller_identity(self, refresh: bool = False) -> Dict[str, Any]:
+        """
+        STS get-caller-identity, cached until config.AWS_IDENTITY_CACHE_TTL
+        or the expiry of temporary credentials, whichever comes first
+        
+        Args:
+            refresh: Ignore the cache and call STS
+        
+        Returns:
+            Dict[str, Any]: Account, Arn, UserId
+        """
+        import config
+        
+        if not self.session:
+            raise ValueError("Session not created. Call create_session() first.")
+        
+        key = self._identity_key()
+        now = time.time()
+        with _identity_lock:
+            cached = _identity_cache.get(key)
+            if cached and not refresh and cached["expires_at"] > now:
+                return cached["identity"]
+        
+        response = self.session.client('sts').get_caller_identity()
+        identity = {field: response.get(field) for field in ("Account", "Arn", "UserId")}
+        
+        expires_at = now + config.AWS_IDENTITY_CACHE_TTL
+        credentials_expiry = self._credentials_expiry()
+        if credentials_expiry is not None:
+            expires_at = min(expires_at, credentials_expiry)
+        
+        with _identity_lock:
+            _identity_cache[key] = {"identity": identity, "expires_at": expires_at}
+        return identity
+    
+    def _start_credential_refresh(self):
+        """
+        Refresh temporary credentials on a background thread
+        
+        botocore refreshes expiring credentials lazily, inside whichever
+        request happens to need them (an STS/SSO/IMDS round trip on the hot
+        path). Touching them periodically moves that refresh off the
+        request path. Long-lived access keys need nothing.
+        """
+        import config
+        
+        if self._credentials_expiry() is None or config.AWS_CREDENTIAL_REFRESH_INTERVAL <= 0:
+            return
+        if self._refresh_thread and self._refresh_thread.is_alive():
+            return
+        
+        self._refresh_stop.clear()
+        # Thread chỉ giữ weakref: AWSSession bị bỏ đi (không close()) vẫn được thu hồi và thread dừng
+        self._refresh_thread = threading.Thread(
+            target=_refresh_loop,
+            args=(weakref.ref(self), self._refresh_stop, config.AWS_CREDENTIAL_REFRESH_INTERVAL),
+            name="aws-credential-refresh",
+            daemon=True
+        )
+        weakref.finalize(self, self._refresh_stop.set)
+        self._refresh_thread.start()
+    
+    def close(self):
+        """Stop the background credential refresh"""
+        self._refresh_stop.set()
+    
     def get_bedrock_client(self):
         """Get Bedrock client for model management"""
         if not self.session:
@@ -100,32 +231,78 @@ class AWSSession:
         
         return self.bedrock_client
     
+    def _runtime_client_config(self) -> BotocoreConfig:
+        import config
+        # Pool đủ lớn cho các request song song (AsyncClaudeClient, batch)
+        # Khi bật rate limiter, ClaudeClient tự retry throttling nên tắt retry của botocore
+        retries = (
+            {"mode": "standard", "max_attempts": 1}
+            if config.RATE_LIMIT_ENABLED
+            else {"mode": config.BEDROCK_RETRY_MODE, "max_attempts": config.BEDROCK_MAX_ATTEMPTS}
+        )
+        return BotocoreConfig(
+            read_timeout=config.BEDROCK_READ_TIMEOUT,
+            max_pool_connections=config.BEDROCK_MAX_POOL_CONNECTIONS,
+            retries=retries
+        )
+    
     def get_bedrock_runtime_client(self):
         """Get Bedrock Runtime client for model inference"""
         if not self.session:
             raise ValueError("Session not created. Call create_session() first.")
         
         if not self.bedrock_runtime_client:
-            self.bedrock_runtime_client = self.session.client('bedrock-runtime')
+            self.bedrock_runtime_client = self.session.client(
+                'bedrock-runtime',
+                config=self._runtime_client_config()
+            )
             logger.info("Created Bedrock Runtime client")
         
         return self.bedrock_runtime_client
     
-    def list_available_models(self) -> Dict[str, Any]:
-        """List available foundation models in Bedrock"""
+    def get_region_router(self, regions: Optional[List[str]] = None) -> Optional["RegionRouter"]:
+        """
+        Get the multi-region router for Bedrock Runtime requests
+        
+        Args:
+            regions: Regions to spread requests over (default: config.BEDROCK_REGIONS)
+        
+        Returns:
+            Optional[RegionRouter]: Router, or None when only one region is configured
+        """
+        import config
+        
+        if not self.session:
+            raise ValueError("Session not created. Call create_session() first.")
+        
+        if self.region_router is None:
+            regions = regions or config.BEDROCK_REGIONS
+            if len(regions) < 2:
+                return None
+            self.region_router = RegionRouter(self.session, regions, self._runtime_client_config())
+            logger.info(f"Created Bedrock region router: {', '.join(regions)}")
+        
+        return self.region_router
+    
+    def list_available_models(self, refresh: bool = False, **filters) -> Dict[str, Any]:
+        """
+        List available foundation models in Bedrock (cached, see bedrock/catalog.py)
+        
+        Args:
+            refresh: Reload the catalog from Bedrock instead of using the cached snapshot
+            **filters: ModelCatalog.find_models() filters (provider, output_modality, streaming, ...)
+        """
+        from .catalog import get_model_catalog
+        
         try:
-            bedrock_client = self.get_bedrock_client()
-            response = bedrock_client.list_foundation_models()
-            
-            models = []
-            for model in response.get('modelSummaries', []):
-                models.append({
-                    'modelId': model.get('modelId'),
-                    'modelName': model.get('modelName'),
-                    'providerName': model.get('providerName'),
-                    'inputModalities': model.get('inputModalities', []),
-                    'outputModalities': model.get('outputModalities', [])
-                })
+            catalog = get_model_catalog(
+                self.session.region_name if self.session else None,
+                client=self.get_bedrock_client(),
+                credentials_key=self._identity_key()[0] if self.session else None
+            )
+            if refresh:
+                catalog.refresh()
+            models = catalog.find_models(**filters) if filters else catalog.list_models()
             
             logger.info(f"Found {len(models)} available models")
             return {'models': models}
@@ -134,33 +311,264 @@ class AWSSession:
             logger.error(f"Error listing models: {e}")
             raise ValueError(f"Failed to list models: {e}")
     
-    def get_session_info(self) -> Dict[str, Any]:
-        """Get current session information"""
+    def get_session_info(self, refresh: bool = False) -> Dict[str, Any]:
+        """
+        Get current session information
+        
+        Args:
+            refresh: Call STS even if the identity is cached
+        """
         if not self.session:
             return {"status": "No active session"}
         
         try:
-            sts_client = self.session.client('sts')
-            identity = sts_client.get_caller_identity()
+            identity = self.get_caller_identity(refresh=refresh)
             
             return {
                 "status": "Active",
                 "account_id": identity.get('Account'),
                 "user_arn": identity.get('Arn'),
                 "user_id": identity.get('UserId'),
-                "region": self.session.region_name
+                "region": self.session.region_name,
+                "credentials_expiry": self._credentials_expiry()
             }
         except Exception as e:
             logger.error(f"Error getting session info: {e}")
             return {"status": "Error", "error": str(e)}
 
 
+def _refresh_loop(session_ref: "weakref.ref[AWSSession]", stop: threading.Event, interval: float):
+    """Background credential refresh of one AWSSession, until it is closed or garbage-collected"""
+    while not stop.wait(interval):
+        aws_session = session_ref()
+        if aws_session is None:
+            return
+        try:
+            # get_frozen_credentials() refreshes when the credentials are close to expiry
+            aws_session.session.get_credentials().get_frozen_credentials()
+        except Exception as e:
+            logger.warning(f"Background credential refresh failed: {e}")
+        # Không giữ tham chiếu mạnh trong lúc chờ
+        aws_session = None
+
+
+class RegionStats:
+    """Rolling latency and outcome window of one region"""
+    
+    def __init__(self, window: int):
+        # Streaming operations: seconds until the stream starts (time to first byte)
+        self.latencies = deque(maxlen=window)
+        # invoke_model: seconds per output token (the call returns after the whole generation)
+        self.token_latencies = deque(maxlen=window)
+        self.outcomes = deque(maxlen=window)
+        self.requests = 0
+        self.errors = 0
+        self.throttles = 0
+        self.cooldown_until = 0.0
+    
+    @staticmethod
+    def _percentile(values, q: float) -> Optional[float]:
+        if not values:
+            return None
+        ordered = sorted(values)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+    
+    def percentile(self, q: float) -> Optional[float]:
+        return self._percentile(self.latencies, q)
+    
+    def token_percentile(self, q: float) -> Optional[float]:
+        return self._percentile(self.token_latencies, q)
+    
+    @property
+    def error_rate(self) -> float:
+        return sum(1 for ok in self.outcomes if not ok) / len(self.outcomes) if self.outcomes else 0.0
+
+
+# Số mẫu tối thiểu trước khi p95 của một region được tin dùng
+MIN_LATENCY_SAMPLES = 5
+
+
+class RegionRouter:
+    """
+    Spread Bedrock Runtime requests over several regions
+    
+    Keeps one bedrock-runtime client per region (same credentials) and a
+    rolling window of latency and errors for each. Latency is time to first
+    byte for streaming operations and time per output token for
+    invoke_model, so long generations do not make a region look slow. Every
+    request goes to the healthiest region first: lowest p95 latency relative
+    to the fastest region, weighted by error rate. A region that throttles,
+    returns a transient error or cannot be reached is put on cooldown, and
+    the request fails over to the next region immediately. The error is only
+    raised once every region has failed. Use cross-region inference profile
+    IDs ("us.…") or model IDs that exist in every configured region.
+    """
+    
+    def __init__(self, session: boto3.Session, regions: List[str], client_config: BotocoreConfig):
+        """
+        Initialize region router
+        
+        Args:
+            session: boto3 session whose credentials are used for every region
+            regions: Regions in order of preference (ties go to the first one)
+            client_config: Botocore config of the regional clients
+        """
+        import config
+        
+        self.session = session
+        self.regions = list(dict.fromkeys(regions))
+        self.client_config = client_config
+        self._clients: Dict[str, Any] = {}
+        self._stats = {region: RegionStats(config.BEDROCK_REGION_WINDOW) for region in self.regions}
+        self._lock = threading.Lock()
+    
+    def get_client(self, region: str):
+        with self._lock:
+            client = self._clients.get(region)
+            if client is None:
+                client = self._clients[region] = self.session.client(
+                    'bedrock-runtime',
+                    region_name=region,
+                    config=self.client_config
+                )
+            return client
+    
+    def _relative_latency(self, region: str) -> Optional[float]:
+        """p95 of the region divided by the best p95 of any region (per metric), None with too few samples"""
+        ratios = []
+        for window, p95 in (("latencies", RegionStats.percentile), ("token_latencies", RegionStats.token_percentile)):
+            measured = {
+                name: p95(stats, 0.95) for name, stats in self._stats.items()
+                if len(getattr(stats, window)) >= MIN_LATENCY_SAMPLES
+            }
+            if region in measured:
+                best = min(measured.values())
+                ratios.append(measured[region] / max(best, 1e-6))
+        return sum(ratios) / len(ratios) if ratios else None
+    
+    def _score(self, region: str) -> float:
+        stats = self._stats[region]
+        relative = self._relative_latency(region)
+        if relative is None:
+            # Ít mẫu: ưu tiên thử để có số liệu, trừ khi region liên tục lỗi
+            return 4 * stats.error_rate
+        return relative * (1 + 4 * stats.error_rate)
+    
+    def ranked_regions(self) -> List[str]:
+        """Regions ordered from healthiest to least healthy (cooling-down regions last)"""
+        now = time.monotonic()
+        with self._lock:
+            return sorted(
+                self.regions,
+                key=lambda region: (
+                    self._stats[region].cooldown_until > now,
+                    self._score(region),
+                    self.regions.index(region)
+                )
+            )
+    
+    def _record(
+        self,
+        region: str,
+        latency: Optional[float],
+        ok: bool,
+        throttled: bool = False,
+        cooldown: bool = False,
+        per_token: bool = False
+    ):
+        import config
+        
+        with self._lock:
+            stats = self._stats[region]
+            stats.requests += 1
+            stats.outcomes.append(ok)
+            if latency is not None:
+                (stats.token_latencies if per_token else stats.latencies).append(latency)
+            if not ok:
+                stats.errors += 1
+            if throttled:
+                stats.throttles += 1
+            if throttled or cooldown:
+                stats.cooldown_until = time.monotonic() + config.BEDROCK_REGION_COOLDOWN
+    
+    @staticmethod
+    def _output_tokens(response: Any) -> Optional[int]:
+        """Output token count Bedrock reports in the invoke_model response headers"""
+        try:
+            headers = response["ResponseMetadata"]["HTTPHeaders"]
+            return int(headers["x-amzn-bedrock-output-token-count"])
+        except (KeyError, TypeError, ValueError):
+            return None
+    
+    def invoke(self, operation: str, **kwargs) -> Any:
+        """
+        Call a bedrock-runtime operation in the healthiest region, failing over on throttling
+        
+        Args:
+            operation: Client method name, e.g. "invoke_model", "invoke_model_with_response_stream"
+            **kwargs: Arguments of the operation
+        
+        Returns:
+            Operation response (for streaming operations the latency recorded
+            is the time until the stream starts, for other operations the
+            time per output token)
+        """
+        last_error: Optional[Exception] = None
+        streaming = "stream" in operation
+        
+        for region in self.ranked_regions():
+            started = time.perf_counter()
+            try:
+                response = getattr(self.get_client(region), operation)(**kwargs)
+            except Exception as e:
+                failover = is_retryable_error(e) or isinstance(e, BotocoreConnectionError)
+                self._record(region, None, ok=False, throttled=is_throttling_error(e), cooldown=failover)
+                if not failover:
+                    raise
+                logger.warning(f"Bedrock {operation} failed in {region}, failing over: {e}")
+                last_error = e
+                continue
+            
+            latency = time.perf_counter() - started
+            if streaming:
+                self._record(region, latency, ok=True)
+            else:
+                tokens = self._output_tokens(response)
+                self._record(region, latency / tokens if tokens else None, ok=True, per_token=True)
+            return response
+        
+        raise last_error
+    
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Get per-region request counts, error rate, p50/p95 time to first byte, p95 per output token, score and cooldown state"""
+        now = time.monotonic()
+        with self._lock:
+            result = {}
+            for region in self.regions:
+                stats = self._stats[region]
+                p50, p95 = stats.percentile(0.5), stats.percentile(0.95)
+                token_p95 = stats.token_percentile(0.95)
+                result[region] = {
+                    "requests": stats.requests,
+                    "errors": stats.errors,
+                    "throttles": stats.throttles,
+                    "error_rate": round(stats.error_rate, 3),
+                    "p50_ms": round(p50 * 1000, 1) if p50 is not None else None,
+                    "p95_ms": round(p95 * 1000, 1) if p95 is not None else None,
+                    "p95_ms_per_token": round(token_p95 * 1000, 2) if token_p95 is not None else None,
+                    "score": round(self._score(region), 3),
+                    "cooling_down": stats.cooldown_until > now
+                }
+            return result
+
+
 # Convenience functions
 def create_aws_session_from_keys(
     access_key_id: str,
     secret_access_key: str,
     region_name: str = "us-east-1",
-    session_token: Optional[str] = None
+    session_token: Optional[str] = None,
+    validate: Optional[str] = None
 ) -> AWSSession:
     """
     Tạo AWS session từ access keys
@@ -170,6 +578,7 @@ def create_aws_session_from_keys(
         secret_access_key: AWS Secret Access Key
         region_name: AWS region
         session_token: AWS Session Token (optional)
+        validate: "eager", "deferred" or "off" (default: config.AWS_SESSION_VALIDATION)
     
     Returns:
         AWSSession: Configured AWS session
@@ -179,14 +588,16 @@ def create_aws_session_from_keys(
         access_key_id=access_key_id,
         secret_access_key=secret_access_key,
         session_token=session_token,
-        region_name=region_name
+        region_name=region_name,
+        validate=validate
     )
     return aws_session
 
 
 def create_aws_session_from_profile(
     profile_name: str,
-    region_name: str = "us-east-1"
+    region_name: str = "us-east-1",
+    validate: Optional[str] = None
 ) -> AWSSession:
     """
     Tạo AWS session từ AWS profile
@@ -194,6 +605,7 @@ def create_aws_session_from_profile(
     Args:
         profile_name: AWS profile name
         region_name: AWS region
+        validate: "eager", "deferred" or "off" (default: config.AWS_SESSION_VALIDATION)
     
     Returns:
         AWSSession: Configured AWS session
@@ -201,6 +613,33 @@ def create_aws_session_from_profile(
     aws_session = AWSSession()
     aws_session.create_session(
         profile_name=profile_name,
-        region_name=region_name
+        region_name=region_name,
+        validate=validate
+    )
+    return aws_session
+
+
+def create_aws_session_from_env(validate: Optional[str] = None) -> AWSSession:
+    """
+    Tạo AWS session từ biến môi trường (config.py / .env)
+    
+    Dùng access keys nếu có, nếu không sẽ dùng default credentials
+    (AWS_PROFILE, IAM role, ...).
+    
+    Args:
+        validate: "eager", "deferred" or "off" (default: config.AWS_SESSION_VALIDATION)
+    
+    Returns:
+        AWSSession: Configured AWS session
+    """
+    import config
+    
+    aws_session = AWSSession()
+    aws_session.create_session(
+        access_key_id=config.AWS_ACCESS_KEY_ID or None,
+        secret_access_key=config.AWS_SECRET_ACCESS_KEY or None,
+        session_token=config.AWS_SESSION_TOKEN or None,
+        region_name=config.AWS_REGION,
+        validate=validate
     )
     return aws_session
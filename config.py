@@ -15,10 +15,129 @@ AWS_ACCESS_KEY_ID = os.getenv("AWS_ACCESS_KEY_ID")
 AWS_SECRET_ACCESS_KEY = os.getenv("AWS_SECRET_ACCESS_KEY")
 AWS_SESSION_TOKEN = os.getenv("AWS_SESSION_TOKEN")
 AWS_REGION = os.getenv("AWS_REGION", "us-east-1")
+# Các region dùng cho Bedrock Runtime của ClaudeClient, cách nhau bởi dấu phẩy (vd. "us-east-1,us-west-2");
+# để trống = chỉ AWS_REGION. Nhiều region: request được gửi tới region khỏe nhất và failover khi bị throttle
+BEDROCK_REGIONS = [region.strip() for region in os.getenv("BEDROCK_REGIONS", "").split(",") if region.strip()] or [AWS_REGION]
+# Số request gần nhất dùng để tính p50/p95 latency và tỉ lệ lỗi của mỗi region
+BEDROCK_REGION_WINDOW = int(os.getenv("BEDROCK_REGION_WINDOW", "100"))
+# Thời gian (giây) tạm xếp region bị throttle xuống cuối danh sách
+BEDROCK_REGION_COOLDOWN = float(os.getenv("BEDROCK_REGION_COOLDOWN", "10"))
+# Kiểm tra credentials (STS get-caller-identity) khi tạo AWSSession:
+# "eager" = kiểm tra ngay, "deferred" = kiểm tra ở background thread, "off" = bỏ qua
+AWS_SESSION_VALIDATION = os.getenv("AWS_SESSION_VALIDATION", "eager").lower()
+# Thời gian (giây) cache kết quả get-caller-identity (không vượt quá hạn của temporary credentials)
+AWS_IDENTITY_CACHE_TTL = float(os.getenv("AWS_IDENTITY_CACHE_TTL", "900"))
+# Chu kỳ (giây) làm mới temporary credentials ở background; 0 = để botocore làm mới khi gọi request
+AWS_CREDENTIAL_REFRESH_INTERVAL = float(os.getenv("AWS_CREDENTIAL_REFRESH_INTERVAL", "60"))
 
 # Bedrock Configuration
 BEDROCK_MAX_TOKENS = int(os.getenv("BEDROCK_MAX_TOKENS", "4096"))
 BEDROCK_TEMPERATURE = float(os.getenv("BEDROCK_TEMPERATURE", "0.1"))
+BEDROCK_READ_TIMEOUT = int(os.getenv("BEDROCK_READ_TIMEOUT", "120"))
+# Số connection tối đa trong HTTP pool dùng chung cho mỗi client (bedrock-runtime, textract, ...)
+BEDROCK_MAX_POOL_CONNECTIONS = int(os.getenv("BEDROCK_MAX_POOL_CONNECTIONS", "50"))
+# Prompt caching của Bedrock cho system prompt/tool schemas tĩnh (agent chọn bật qua get_bedrock_model(prompt_cache=True))
+BEDROCK_PROMPT_CACHE = os.getenv("BEDROCK_PROMPT_CACHE", "true").lower() in ("1", "true", "yes")
+# TTL của cache point (vd. "5m", "1h"); để trống = mặc định của Bedrock
+BEDROCK_PROMPT_CACHE_TTL = os.getenv("BEDROCK_PROMPT_CACHE_TTL", "")
+
+# Retry của botocore cho client dùng chung (BedrockModel của agents, textract, ...)
+# "adaptive" = token bucket phía client, tự giảm tốc khi bị throttle
+BEDROCK_RETRY_MODE = os.getenv("BEDROCK_RETRY_MODE", "adaptive")
+BEDROCK_MAX_ATTEMPTS = int(os.getenv("BEDROCK_MAX_ATTEMPTS", "6"))
+# Thời gian (giây) cache danh sách models/inference profiles của Bedrock (bedrock/catalog.py); 0 = không hết hạn
+MODEL_CATALOG_TTL = float(os.getenv("MODEL_CATALOG_TTL", "3600"))
+
+# Rate limiter dùng chung theo model cho ClaudeClient (bedrock/rate_limit.py)
+# Token bucket AIMD: bắt đầu ở MAX_RPS, giảm một nửa khi bị throttle, tăng INCREASE mỗi request thành công
+RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "true").lower() in ("1", "true", "yes")
+RATE_LIMIT_MAX_RPS = float(os.getenv("RATE_LIMIT_MAX_RPS", "20"))
+RATE_LIMIT_MIN_RPS = float(os.getenv("RATE_LIMIT_MIN_RPS", "0.2"))
+RATE_LIMIT_BURST = float(os.getenv("RATE_LIMIT_BURST", "20"))
+RATE_LIMIT_INCREASE = float(os.getenv("RATE_LIMIT_INCREASE", "0.1"))
+# Khoảng thời gian (giây) tối thiểu giữa hai lần giảm rate (một đợt throttle chỉ tính một lần)
+RATE_LIMIT_COOLDOWN = float(os.getenv("RATE_LIMIT_COOLDOWN", "1.0"))
+# Thời gian chờ token tối đa (giây); 0 = không giới hạn
+RATE_LIMIT_ACQUIRE_TIMEOUT = float(os.getenv("RATE_LIMIT_ACQUIRE_TIMEOUT", "120"))
+# Retry khi bị throttle/lỗi tạm thời: backoff base * 2^attempt (có jitter), tối đa max
+RATE_LIMIT_MAX_RETRIES = int(os.getenv("RATE_LIMIT_MAX_RETRIES", "4"))
+RATE_LIMIT_BASE_BACKOFF = float(os.getenv("RATE_LIMIT_BASE_BACKOFF", "0.5"))
+RATE_LIMIT_MAX_BACKOFF = float(os.getenv("RATE_LIMIT_MAX_BACKOFF", "20"))
+
+# Cache request/response của ClaudeClient (opt-in): RAM (LRU) + SQLite trên đĩa
+# CLAUDE_CACHE_ENABLED bật cache cho chat_with_claude/ask_claude; ClaudeClient(cache=...) bật riêng từng client
+CLAUDE_CACHE_ENABLED = os.getenv("CLAUDE_CACHE_ENABLED", "false").lower() in ("1", "true", "yes")
+CLAUDE_CACHE_DB = os.getenv("CLAUDE_CACHE_DB") or os.path.join(BASE_PATH, ".cache", "claude_cache.sqlite3")
+CLAUDE_CACHE_MEMORY_ENTRIES = int(os.getenv("CLAUDE_CACHE_MEMORY_ENTRIES", "256"))
+CLAUDE_CACHE_MAX_ENTRIES = int(os.getenv("CLAUDE_CACHE_MAX_ENTRIES", "10000"))
+CLAUDE_CACHE_MAX_BYTES = int(os.getenv("CLAUDE_CACHE_MAX_BYTES", str(100 * 1024 * 1024)))
+# Thời gian sống (giây) của một entry; 0 = không hết hạn
+CLAUDE_CACHE_TTL = float(os.getenv("CLAUDE_CACHE_TTL", "0"))
+# Chỉ cache các request có temperature <= giá trị này (kết quả gần như xác định)
+CLAUDE_CACHE_MAX_TEMPERATURE = float(os.getenv("CLAUDE_CACHE_MAX_TEMPERATURE", "0.3"))
+# Số request Bedrock chạy đồng thời tối đa của AsyncClaudeClient (nên <= BEDROCK_MAX_POOL_CONNECTIONS)
+CLAUDE_ASYNC_MAX_CONCURRENCY = int(os.getenv("CLAUDE_ASYNC_MAX_CONCURRENCY", "50"))
+
+# Batch inference (bedrock/batch.py)
+# Số request song song tối đa; tự giảm khi bị throttle và tăng dần lại khi ổn định
+BATCH_MAX_CONCURRENCY = int(os.getenv("BATCH_MAX_CONCURRENCY", "16"))
+BATCH_MAX_RETRIES = int(os.getenv("BATCH_MAX_RETRIES", "8"))
+# Backoff (giây) khi bị throttle: base * 2^attempt (có jitter), tối đa max
+BATCH_BASE_BACKOFF = float(os.getenv("BATCH_BASE_BACKOFF", "1.0"))
+BATCH_MAX_BACKOFF = float(os.getenv("BATCH_MAX_BACKOFF", "60"))
+
+# Orchestrator
+# Khởi tạo toàn bộ agents/MCP tools khi start (server) thay vì lúc dùng lần đầu
+ORCHESTRATOR_PRELOAD = os.getenv("ORCHESTRATOR_PRELOAD", "false").lower() in ("1", "true", "yes")
+# Mỗi session (Streamlit/API) có orchestrator riêng; session cũ bị loại theo LRU hoặc khi idle quá TTL (giây)
+ORCHESTRATOR_MAX_SESSIONS = int(os.getenv("ORCHESTRATOR_MAX_SESSIONS", "100"))
+ORCHESTRATOR_SESSION_TTL = float(os.getenv("ORCHESTRATOR_SESSION_TTL", "3600"))
+# Số message tối đa giữ trong lịch sử của mỗi orchestrator
+ORCHESTRATOR_WINDOW_SIZE = int(os.getenv("ORCHESTRATOR_WINDOW_SIZE", "20"))
+# Tool gọi sub-agent dạng async (không chặn event loop khi chạy qua stream_async)
+ORCHESTRATOR_ASYNC_TOOLS = os.getenv("ORCHESTRATOR_ASYNC_TOOLS", "true").lower() in ("1", "true", "yes")
+# Fan-out: gọi song song nhiều specialist cho câu hỏi nhiều ý, timeout (giây) cho từng nhánh
+ORCHESTRATOR_FAN_OUT = os.getenv("ORCHESTRATOR_FAN_OUT", "true").lower() in ("1", "true", "yes")
+ORCHESTRATOR_FAN_OUT_TIMEOUT = float(os.getenv("ORCHESTRATOR_FAN_OUT_TIMEOUT", "120"))
+# Passthrough: trả thẳng kết quả của specialist làm câu trả lời cuối (không gọi model lần 2 để chép lại)
+ORCHESTRATOR_PASSTHROUGH = os.getenv("ORCHESTRATOR_PASSTHROUGH", "true").lower() in ("1", "true", "yes")
+
+# Pre-router: câu hỏi rõ ràng (theo rule VN/EN) đi thẳng tới specialist, bỏ qua lượt LLM của orchestrator
+ROUTER_ENABLED = os.getenv("ROUTER_ENABLED", "true").lower() in ("1", "true", "yes")
+# Độ tin cậy tối thiểu để route trực tiếp; thấp hơn thì để orchestrator LLM quyết định
+ROUTER_CONFIDENCE_THRESHOLD = float(os.getenv("ROUTER_CONFIDENCE_THRESHOLD", "0.75"))
+# Model nhỏ (vd. Claude Haiku) phân loại khi rule không chắc chắn; để trống = không dùng
+ROUTER_CLASSIFIER_MODEL = os.getenv("ROUTER_CLASSIFIER_MODEL", "")
+
+# Response cache cho orchestrator và các specialist agent
+RESPONSE_CACHE_ENABLED = os.getenv("RESPONSE_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "1000"))
+# TTL (giây) theo agent: dữ liệu account thay đổi nhanh, tài liệu thay đổi chậm; 0 = không cache
+RESPONSE_CACHE_TTL_ACCOUNT = float(os.getenv("RESPONSE_CACHE_TTL_ACCOUNT", "60"))
+RESPONSE_CACHE_TTL_ARCHITECT = float(os.getenv("RESPONSE_CACHE_TTL_ARCHITECT", "3600"))
+RESPONSE_CACHE_TTL_DOCS = float(os.getenv("RESPONSE_CACHE_TTL_DOCS", "86400"))
+RESPONSE_CACHE_TTL_ORCHESTRATOR = float(os.getenv("RESPONSE_CACHE_TTL_ORCHESTRATOR", "600"))
+RESPONSE_CACHE_TTL_DEFAULT = float(os.getenv("RESPONSE_CACHE_TTL_DEFAULT", "600"))
+# Model sentence-transformers để so khớp câu hỏi gần giống (vd. all-MiniLM-L6-v2); để trống = chỉ so khớp chính xác
+RESPONSE_CACHE_EMBEDDER = os.getenv("RESPONSE_CACHE_EMBEDDER", "")
+RESPONSE_CACHE_SIMILARITY = float(os.getenv("RESPONSE_CACHE_SIMILARITY", "0.92"))
+
+# Single-flight: các câu hỏi đầu tiên giống nhau đến cùng lúc dùng chung một lần thực thi orchestrator
+SINGLE_FLIGHT_ENABLED = os.getenv("SINGLE_FLIGHT_ENABLED", "true").lower() in ("1", "true", "yes")
+
+# MCP servers
+# Số session (process) chạy song song cho mỗi MCP server
+MCP_SESSIONS_PER_SERVER = int(os.getenv("MCP_SESSIONS_PER_SERVER", "1"))
+# Chu kỳ health check (giây), 0 để tắt
+MCP_HEALTH_CHECK_INTERVAL = float(os.getenv("MCP_HEALTH_CHECK_INTERVAL", "30"))
+
+# MCP server launcher: cài package một lần vào cache rồi chạy trực tiếp (không cần uvx/network mỗi lần spawn)
+MCP_CACHE_DIR = os.getenv("MCP_CACHE_DIR") or os.path.join(BASE_PATH, ".mcp_cache")
+MCP_INSTALL_TIMEOUT = int(os.getenv("MCP_INSTALL_TIMEOUT", "300"))
+# Phiên bản pin cho từng server; để trống = resolve bản mới nhất một lần rồi giữ nguyên
+MCP_DOCS_SERVER_VERSION = os.getenv("MCP_DOCS_SERVER_VERSION", "")
+MCP_PRICING_SERVER_VERSION = os.getenv("MCP_PRICING_SERVER_VERSION", "")
+MCP_DIAGRAM_SERVER_VERSION = os.getenv("MCP_DIAGRAM_SERVER_VERSION", "")
 
 # Opensearch
 OPENSEARCH_HOST = os.getenv("OPENSEARCH_HOST")
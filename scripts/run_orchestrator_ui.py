@@ -1,11 +1,20 @@
 """Script to run the Orchestrator Streamlit UI"""
 
+import argparse
 import subprocess
 import sys
 import os
 
 def main():
     """Run the Streamlit app for orchestrator"""
+    parser = argparse.ArgumentParser(description="Run AWS Agent Orchestrator UI")
+    parser.add_argument(
+        "--preload",
+        action="store_true",
+        help="Warm the model, MCP servers and a ready orchestrator session when the server starts instead of on first use"
+    )
+    args = parser.parse_args()
+    
     # Get the path to the app
     app_path = os.path.join(
         os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
@@ -15,6 +24,9 @@ def main():
     
     # Run streamlit
     cmd = [sys.executable, "-m", "streamlit", "run", app_path]
+    env = os.environ.copy()
+    if args.preload:
+        env["ORCHESTRATOR_PRELOAD"] = "true"
     
     print("🚀 Starting AWS Agent Orchestrator UI...")
     print(f"📁 App path: {app_path}")
@@ -22,7 +34,7 @@ def main():
     print("⏹️  Press Ctrl+C to stop the server")
     
     try:
-        subprocess.run(cmd)
+        subprocess.run(cmd, env=env)
     except KeyboardInterrupt:
         print("\n👋 Stopping the server...")
 
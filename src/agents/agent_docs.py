@@ -2,31 +2,18 @@
 
 import sys
 import os
-import boto3
 import logging
 from strands import Agent
-from strands.models import BedrockModel
 
 project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 sys.path.append(project_root)
 import config
+from bedrock.registry import get_bedrock_model
 from src.tools.docs_aws import get_aws_docs_tools
 
 logging.basicConfig(level=logging.INFO)
 
-boto_session = boto3.Session(
-    aws_access_key_id=config.AWS_ACCESS_KEY_ID,
-    aws_secret_access_key=config.AWS_SECRET_ACCESS_KEY,
-    aws_session_token=config.AWS_SESSION_TOKEN,
-    region_name=config.AWS_REGION
-)
-
-bedrock_model = BedrockModel(
-    boto_session=boto_session,
-    model_id=config.CHATBOT_AGENT_MODEL,
-    temperature=config.BEDROCK_TEMPERATURE,
-    max_tokens=config.BEDROCK_MAX_TOKENS,
-)
+bedrock_model = get_bedrock_model()
 
 MAIN_SYSTEM_PROMPT = """Bạn là trợ lý AWS chuyên biệt có thể trả lời các câu hỏi về dịch vụ và tài liệu AWS.
 
@@ -1,7 +1,9 @@
 """Base agent class for Strands Agent framework"""
 
 from abc import ABC, abstractmethod
-from typing import Dict, Any, List
+from typing import Dict, Any, List, AsyncIterator
+
+from src.agents.memory import ConversationMemory
 
 
 class BaseAgent(ABC):
@@ -10,20 +12,46 @@ class BaseAgent(ABC):
     def __init__(self, name: str, config: Dict[str, Any] = None):
         self.name = name
         self.config = config or {}
-        self.memory = []
+        self.memory = ConversationMemory(
+            max_turns=self.config.get("max_memory", 100),
+            max_tokens=self.config.get("max_memory_tokens"),
+            strategy=self.config.get("memory_strategy", "drop")
+        )
     
     @abstractmethod
     async def process_message(self, message: str, context: Dict[str, Any] = None) -> str:
         """Process incoming message and return response"""
         pass
     
+    async def stream_message(self, message: str, context: Dict[str, Any] = None) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Process incoming message and yield events as they happen
+        
+        Events: {"type": "delta", "text"}, {"type": "route", "specialists"},
+        {"type": "tool_start", "tool", "tool_use_id"},
+        {"type": "tool_end", "tool", "tool_use_id", "status"},
+        {"type": "usage", ...}, {"type": "done", "response"}.
+        Agents without token streaming send the whole answer as one delta.
+        """
+        response = await self.process_message(message, context)
+        yield {"type": "delta", "text": response}
+        yield {"type": "done", "response": response}
+    
+    def is_cheap(self, message: str, context: Dict[str, Any] = None) -> bool:
+        """
+        True when the answer needs no model call (cached, shared with a running request)
+
+        Called on a worker thread (MessageHandler.priority), so it may do blocking lookups.
+        """
+        return False
+    
     def add_to_memory(self, message: str, response: str):
-        """Add conversation to memory"""
-        self.memory.append({
-            "message": message,
-            "response": response,
-            "timestamp": self._get_timestamp()
-        })
+        """Add conversation to memory (oldest turns are dropped or summarized past the caps)"""
+        self.memory.add(message, response, self._get_timestamp())
+    
+    def get_memory_stats(self) -> Dict[str, Any]:
+        """Get memory size metrics"""
+        return self.memory.get_stats()
     
     def _get_timestamp(self):
         from datetime import datetime
@@ -0,0 +1,202 @@
+"""Chatbot agent backed by the AWS orchestrator (one orchestrator session per user)"""
+
+import asyncio
+import logging
+import sys
+import time
+from contextlib import aclosing
+from typing import Any, AsyncIterator, Dict, Optional
+
+from src.agents.base_agent import BaseAgent
+from src.core.state_store import StateStore, create_state_store
+
+logger = logging.getLogger(__name__)
+
+# Số lần thử lưu lại khi worker khác ghi state của cùng user
+STATE_SAVE_ATTEMPTS = 3
+
+
+def extract_usage(result: Any) -> Optional[Dict[str, Any]]:
+    """Token usage and latency of a Strands AgentResult (None for cached/plain answers)"""
+    metrics = getattr(result, "metrics", None)
+    if metrics is None:
+        return None
+    usage = getattr(metrics, "accumulated_usage", {}) or {}
+    return {
+        "inputTokens": usage.get("inputTokens", 0),
+        "outputTokens": usage.get("outputTokens", 0),
+        "totalTokens": usage.get("totalTokens", 0),
+        "cacheReadInputTokens": usage.get("cacheReadInputTokens", 0),
+        "cacheWriteInputTokens": usage.get("cacheWriteInputTokens", 0),
+        "latencyMs": (getattr(metrics, "accumulated_metrics", {}) or {}).get("latencyMs", 0)
+    }
+
+
+class ChatbotAgent(BaseAgent):
+    """
+    Chatbot agent answering through the orchestrator of agent_chatbot_orchestrator
+
+    Each user gets their own OrchestratorSession (conversation history,
+    sub-agents), so concurrent users never share history. Orchestrator
+    events are translated into the API stream events (delta, route,
+    tool_start, tool_end, usage, done).
+
+    The conversation history is saved to a StateStore after every turn and
+    reloaded when another worker process changed it, so any API worker can
+    serve any user. Saves are compare-and-set on the version the session
+    loaded, so concurrent workers never overwrite each other's turns.
+    BaseAgent.memory is not used: one ChatbotAgent serves every user, so a
+    shared ConversationMemory would mix their turns.
+    """
+
+    def __init__(self, name: str, config: Dict[str, Any] = None, state_store: Optional[StateStore] = None):
+        super().__init__(name, config)
+        self.state_store = state_store or create_state_store()
+
+    def _load_state(self, user_id: str, session) -> int:
+        """
+        Replace the session history with the stored one if another worker updated it
+
+        The loaded version is kept on the session (session.state_version), so a
+        session that was evicted and rebuilt starts empty and reloads the history.
+
+        Returns:
+            int: Number of messages the history had before this turn
+        """
+        state = self.state_store.get(user_id)
+        if state is None:
+            if session.state_version is not None:
+                # State hết hạn/bị xoá: bắt đầu hội thoại mới
+                session.agent.messages.clear()
+                session.state_version = None
+        elif state.get("version") != session.state_version:
+            session.agent.messages[:] = state.get("messages", [])
+            session.state_version = state.get("version")
+        return len(session.agent.messages)
+
+    def _save_state(self, user_id: str, session, turn_start: int):
+        """
+        Save the session history (compare-and-set on the loaded version)
+
+        If another worker saved a turn of the same user meanwhile, this turn's
+        messages are appended to the stored history and the save is retried.
+        """
+        messages = list(session.agent.messages)
+        for _ in range(STATE_SAVE_ATTEMPTS):
+            version = self.state_store.save(user_id, {"messages": messages}, session.state_version)
+            if version is not None:
+                session.agent.messages[:] = messages
+                session.state_version = version
+                return
+            # Worker khác vừa lưu: ghép lượt này vào sau lịch sử mới nhất
+            state = self.state_store.get(user_id)
+            session.state_version = state.get("version") if state else None
+            messages = (state.get("messages", []) if state else []) + list(session.agent.messages)[turn_start:]
+        logger.warning(f"Conversation state of user {user_id} not saved: concurrent updates")
+
+    def is_cheap(self, message: str, context: Dict[str, Any] = None) -> bool:
+        """First turn answered by the response cache or by an identical request already running"""
+        orchestrator = sys.modules.get("agent_chatbot_orchestrator.orchestrator_agent")
+        if orchestrator is None:
+            # Orchestrator chưa được import: chưa có cache/single-flight nào
+            return False
+        if not (
+            orchestrator.response_cache.contains("orchestrator", message)
+            or orchestrator.single_flight.in_flight("orchestrator", message)
+        ):
+            return False
+        user_id = (context or {}).get("user_id", "default")
+        session = orchestrator.orchestrator_sessions.peek(user_id)
+        if session is not None and session.agent.messages:
+            return False
+        # Lịch sử có thể do worker khác lưu
+        return self.state_store.get(user_id) is None
+
+    async def _get_session(self, user_id: str):
+        # Import muộn: orchestrator kéo theo strands, MCP clients, ...
+        from agent_chatbot_orchestrator.orchestrator_agent import get_session_orchestrator
+        # Tạo session (model, tools) có thể chậm: chạy ngoài event loop
+        return await asyncio.to_thread(get_session_orchestrator, user_id)
+
+    async def process_message(self, message: str, context: Dict[str, Any] = None) -> str:
+        """Process incoming message and return response"""
+        response = ""
+        async for event in self.stream_message(message, context):
+            if event["type"] == "done":
+                response = event["response"]
+        return response
+
+    async def stream_message(self, message: str, context: Dict[str, Any] = None) -> AsyncIterator[Dict[str, Any]]:
+        """Stream the orchestrator answer as API events"""
+        context = context or {}
+        user_id = context.get("user_id", "default")
+        session = await self._get_session(user_id)
+        turn_start = await asyncio.to_thread(self._load_state, user_id, session)
+        started = time.perf_counter()
+
+        answer = ""
+        streamed = False
+        usage = None
+        tools: Dict[str, str] = {}
+
+        async with aclosing(session.stream_async(message)) as events:
+            async for event in events:
+                if not isinstance(event, dict):
+                    continue
+
+                if "route" in event:
+                    decision = event["route"]
+                    yield {"type": "route", "specialists": decision["specialists"], "source": decision["source"]}
+
+                elif event.get("type") == "tool_stream":
+                    # Specialist output relayed through an async tool
+                    data = event.get("tool_stream_event", {}).get("data")
+                    if isinstance(data, dict) and data.get("specialist_delta"):
+                        streamed = True
+                        yield {"type": "delta", "text": data["specialist_delta"], "specialist": data.get("specialist")}
+
+                elif event.get("specialist_delta"):
+                    streamed = True
+                    yield {"type": "delta", "text": event["specialist_delta"], "specialist": event.get("specialist")}
+
+                elif "data" in event and isinstance(event["data"], str):
+                    streamed = True
+                    yield {"type": "delta", "text": event["data"]}
+
+                elif "current_tool_use" in event:
+                    tool_use = event["current_tool_use"] or {}
+                    tool_use_id = tool_use.get("toolUseId")
+                    if tool_use_id and tool_use_id not in tools:
+                        tools[tool_use_id] = tool_use.get("name")
+                        yield {"type": "tool_start", "tool": tool_use.get("name"), "tool_use_id": tool_use_id}
+
+                elif "message" in event:
+                    for block in event["message"].get("content", []):
+                        tool_result = block.get("toolResult") if isinstance(block, dict) else None
+                        if tool_result:
+                            tool_use_id = tool_result.get("toolUseId")
+                            yield {
+                                "type": "tool_end",
+                                "tool": tools.get(tool_use_id),
+                                "tool_use_id": tool_use_id,
+                                "status": tool_result.get("status")
+                            }
+
+                elif "content" in event:
+                    # Fan-out hoặc câu trả lời từ cache: trả nguyên câu
+                    answer = str(event["content"])
+
+                if "result" in event:
+                    answer = str(event["result"])
+                    usage = extract_usage(event["result"])
+
+        if not streamed and answer:
+            yield {"type": "delta", "text": answer}
+        yield {
+            "type": "usage",
+            **(usage or {}),
+            "durationMs": int((time.perf_counter() - started) * 1000)
+        }
+
+        await asyncio.to_thread(self._save_state, user_id, session, turn_start)
+        yield {"type": "done", "response": answer}
@@ -0,0 +1,158 @@
+"""Bounded conversation memory for agents"""
+
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token estimate (~4 characters per token)"""
+    return max(1, len(text) // 4) if text else 0
+
+
+def default_summarizer(turns: List[Dict[str, Any]], max_chars: int = 2000) -> str:
+    """
+    Compact turns into a short extractive summary (no model call)
+
+    Args:
+        turns: Turns to compact (may start with a previous summary turn)
+        max_chars: Maximum summary length
+
+    Returns:
+        str: Summary text
+    """
+    lines = []
+    for turn in turns:
+        if turn.get("summary"):
+            lines.append(turn["response"])
+        else:
+            lines.append(f"- User: {turn['message'][:200]} | Agent: {turn['response'][:200]}")
+    summary = "\n".join(lines)
+    return summary[-max_chars:]
+
+
+class ConversationMemory:
+    """
+    Conversation memory capped by number of turns and by estimated tokens
+
+    When a cap is exceeded the oldest turns are either dropped (strategy
+    "drop") or compacted into a single summary turn at the front (strategy
+    "summarize"), so memory size and prompt size stay flat for long-running
+    agents.
+    """
+
+    STRATEGIES = ("drop", "summarize")
+
+    def __init__(
+        self,
+        max_turns: Optional[int] = 100,
+        max_tokens: Optional[int] = None,
+        strategy: str = "drop",
+        summarizer: Optional[Callable[[List[Dict[str, Any]]], str]] = None
+    ):
+        if strategy not in self.STRATEGIES:
+            raise ValueError(f"Unknown memory strategy: {strategy}. Use one of {self.STRATEGIES}")
+
+        self.max_turns = max_turns
+        self.max_tokens = max_tokens
+        self.strategy = strategy
+        self.summarizer = summarizer or default_summarizer
+        self._turns: List[Dict[str, Any]] = []
+        self._tokens = 0
+        self._dropped_turns = 0
+        self._summarized_turns = 0
+        self._summaries = 0
+
+    def add(self, message: str, response: str, timestamp: Optional[str] = None):
+        """Add a turn and enforce the caps"""
+        turn = {
+            "message": message,
+            "response": response,
+            "timestamp": timestamp or datetime.now().isoformat(),
+            "tokens": estimate_tokens(message) + estimate_tokens(response)
+        }
+        self._turns.append(turn)
+        self._tokens += turn["tokens"]
+        self._enforce()
+
+    def _over_limit(self) -> bool:
+        if self.max_turns and len(self._turns) > self.max_turns:
+            return True
+        if self.max_tokens and self._tokens > self.max_tokens:
+            return True
+        return False
+
+    def _enforce(self):
+        if self.strategy == "summarize":
+            self._compact()
+        else:
+            # Always keep the newest turn, even when it alone exceeds the token cap
+            while self._over_limit() and len(self._turns) > 1:
+                turn = self._turns.pop(0)
+                self._tokens -= turn["tokens"]
+                self._dropped_turns += 1
+
+    def _compact(self):
+        """Fold the oldest half of memory into one summary turn"""
+        if not self._over_limit() or len(self._turns) < 2:
+            return
+
+        # Keep the newest half verbatim, compact the rest (summary included)
+        keep = len(self._turns) // 2
+        if self.max_turns:
+            keep = min(keep, self.max_turns - 1)
+        keep = max(keep, 1)
+        old, recent = self._turns[:-keep], self._turns[-keep:]
+
+        summary = self.summarizer(old)
+        if self.max_tokens:
+            # Summary may use at most half of the token budget (~4 chars/token)
+            summary = summary[-self.max_tokens * 2:]
+        summary_turn = {
+            "message": "[summary]",
+            "response": summary,
+            "timestamp": old[-1]["timestamp"],
+            "tokens": estimate_tokens(summary),
+            "summary": True
+        }
+        self._summarized_turns += sum(1 for turn in old if not turn.get("summary"))
+        self._summaries += 1
+
+        self._turns = [summary_turn] + recent
+        self._tokens = sum(turn["tokens"] for turn in self._turns)
+
+        # Still over the token cap: drop the oldest verbatim turns, always keeping the newest one
+        while self._over_limit() and len(self._turns) > 2:
+            turn = self._turns.pop(1)
+            self._tokens -= turn["tokens"]
+            self._dropped_turns += 1
+
+    def clear(self):
+        """Remove all turns"""
+        self._turns = []
+        self._tokens = 0
+
+    @property
+    def turns(self) -> List[Dict[str, Any]]:
+        return list(self._turns)
+
+    def __len__(self) -> int:
+        return len(self._turns)
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        return iter(list(self._turns))
+
+    def __getitem__(self, index):
+        return self._turns[index]
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get memory size metrics"""
+        return {
+            "turns": len(self._turns),
+            "tokens": self._tokens,
+            "max_turns": self.max_turns,
+            "max_tokens": self.max_tokens,
+            "strategy": self.strategy,
+            "dropped_turns": self._dropped_turns,
+            "summarized_turns": self._summarized_turns,
+            "summaries": self._summaries
+        }
@@ -0,0 +1 @@
+# Core modules
\ No newline at end of file
@@ -0,0 +1,128 @@
+"""Entry point for user messages (CLI, API)"""
+
+import asyncio
+import logging
+from contextlib import aclosing
+from typing import Any, AsyncIterator, Dict, Optional
+
+from src.core.strands_manager import PRIORITY_HIGH, PRIORITY_NORMAL, AdmissionError, StrandsManager
+
+logger = logging.getLogger(__name__)
+
+
+class MessageHandler:
+    """Dispatch user messages to the registered agent through the StrandsManager"""
+
+    def __init__(self, strands_manager: StrandsManager, agent_name: Optional[str] = None):
+        """
+        Initialize the handler
+
+        Args:
+            strands_manager: Manager that owns the agents and the execution slots
+            agent_name: Agent to dispatch to (default: the manager's default agent)
+        """
+        self.strands_manager = strands_manager
+        self.agent_name = agent_name
+
+    async def priority(self, message: str, user_id: str) -> int:
+        """
+        Priority lane for requests the agent answers without a model call
+        (cached or shared first turns, see BaseAgent.is_cheap), normal lane otherwise
+
+        Message length is not a criterion: a short question can still start
+        a long agent run. Server-side callers (health probes, internal jobs)
+        may also pick the lane explicitly through the `priority` argument.
+        """
+        agent = self.strands_manager.get_agent(self.agent_name)
+        # is_cheap có thể tra state store (SQLite, Redis): chạy ngoài event loop
+        cheap = await asyncio.to_thread(agent.is_cheap, message, self._context(user_id, None))
+        return PRIORITY_HIGH if cheap else PRIORITY_NORMAL
+
+    async def check_admission(self, message: str, user_id: str, priority: Optional[int] = None):
+        """
+        Fail fast when the request would be refused (before a streaming response starts)
+
+        Raises:
+            AdmissionError: User limit (429) or queue (503) is full
+        """
+        if priority is None:
+            priority = await self.priority(message, user_id)
+        self.strands_manager.check_admission(user_id, priority)
+
+    @staticmethod
+    def _context(user_id: str, context: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        return {**(context or {}), "user_id": user_id}
+
+    async def handle_message(
+        self,
+        message: str,
+        user_id: str,
+        context: Optional[Dict[str, Any]] = None,
+        priority: Optional[int] = None
+    ) -> str:
+        """
+        Process a message and return the full answer
+
+        Args:
+            message: User message
+            user_id: User identifier (conversation and FIFO ordering key)
+            context: Extra context passed to the agent
+            priority: PRIORITY_HIGH or PRIORITY_NORMAL (default: self.priority());
+                never taken from client input
+
+        Returns:
+            str: Agent response
+
+        Raises:
+            AdmissionError: Refused by admission control (server saturated)
+            asyncio.TimeoutError: The request did not finish within strands.timeout
+        """
+        if priority is None:
+            priority = await self.priority(message, user_id)
+        context = self._context(user_id, context)
+        return await self.strands_manager.execute(
+            user_id,
+            lambda agent: agent.process_message(message, context),
+            agent_name=self.agent_name,
+            priority=priority
+        )
+
+    async def stream_message(
+        self,
+        message: str,
+        user_id: str,
+        context: Optional[Dict[str, Any]] = None,
+        priority: Optional[int] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Process a message and yield events as they happen
+
+        Yields:
+            Dict[str, Any]: {"type": "delta" | "route" | "tool_start" | "tool_end" |
+                "usage" | "done" | "error", ...} (see BaseAgent.stream_message);
+                a refused request ends with {"type": "error", "status", "retry_after"}
+        """
+        if priority is None:
+            priority = await self.priority(message, user_id)
+        context = self._context(user_id, context)
+        events = self.strands_manager.stream(
+            user_id,
+            lambda agent: agent.stream_message(message, context),
+            agent_name=self.agent_name,
+            priority=priority
+        )
+        try:
+            # aclosing: client ngắt kết nối -> đóng ngay stream bên trong (giải phóng slot, huỷ agent)
+            async with aclosing(events):
+                async for event in events:
+                    yield event
+        except AdmissionError as e:
+            logger.warning(f"Request of user {user_id} refused: {e}")
+            yield {"type": "error", "error": str(e), "status": e.status_code, "retry_after": e.retry_after}
+        except asyncio.TimeoutError:
+            logger.warning(f"Request of user {user_id} timed out")
+            yield {"type": "error", "error": "Request timed out"}
+
+    def cancel(self, user_id: str) -> int:
+        """Cancel the running requests of a user"""
+        return self.strands_manager.cancel(user_id)
@@ -0,0 +1,252 @@
+"""Per-user conversation state shared by API worker processes"""
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Optional
+
+from src.utils.config import Config
+
+logger = logging.getLogger(__name__)
+
+
+class StateStore(ABC):
+    """
+    Key-value store of per-user state (JSON-serializable dicts)
+
+    Every saved state carries a "version" token assigned by the store, so a
+    worker can tell whether another worker updated the user since it last
+    looked. save() is a compare-and-set: it only writes when the stored
+    version is still the one the caller loaded, so two workers can never
+    both write on top of the same version.
+    """
+
+    def __init__(self, ttl_seconds: float = 0):
+        self.ttl_seconds = ttl_seconds
+
+    @abstractmethod
+    def get(self, user_id: str) -> Optional[Dict[str, Any]]:
+        """Get the state of a user (None if absent or expired)"""
+
+    @abstractmethod
+    def save(self, user_id: str, state: Dict[str, Any], expected_version: Optional[str]) -> Optional[str]:
+        """
+        Save the state of a user if it is still at expected_version
+
+        Args:
+            user_id: User identifier
+            state: JSON-serializable state (its "version" key is overwritten)
+            expected_version: Version the caller loaded (None: no state stored)
+
+        Returns:
+            Optional[str]: New version, or None if another writer got there first
+        """
+
+    @abstractmethod
+    def delete(self, user_id: str):
+        """Drop the state of a user"""
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {"backend": type(self).__name__, "ttl_s": self.ttl_seconds}
+
+    @staticmethod
+    def _new_version() -> str:
+        # Token ngẫu nhiên thay vì counter: không trùng lại sau khi state hết hạn/bị xoá
+        return uuid.uuid4().hex
+
+    @staticmethod
+    def _version_of(raw: Optional[str]) -> Optional[str]:
+        return json.loads(raw).get("version") if raw is not None else None
+
+    @staticmethod
+    def _dumps(state: Dict[str, Any]) -> str:
+        # default=str: giá trị không phải JSON (datetime, bytes, ...) được lưu dạng chuỗi
+        return json.dumps(state, ensure_ascii=False, default=str)
+
+
+class InMemoryStateStore(StateStore):
+    """State in this process only (single worker)"""
+
+    def __init__(self, ttl_seconds: float = 0):
+        super().__init__(ttl_seconds)
+        self._states: Dict[str, tuple] = {}
+        self._lock = threading.Lock()
+
+    def _current(self, user_id: str) -> Optional[str]:
+        # Gọi khi đang giữ self._lock
+        entry = self._states.get(user_id)
+        if entry is None:
+            return None
+        raw, updated_at = entry
+        if self.ttl_seconds and time.time() - updated_at > self.ttl_seconds:
+            del self._states[user_id]
+            return None
+        return raw
+
+    def get(self, user_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            raw = self._current(user_id)
+        return json.loads(raw) if raw is not None else None
+
+    def save(self, user_id: str, state: Dict[str, Any], expected_version: Optional[str]) -> Optional[str]:
+        version = self._new_version()
+        raw = self._dumps({**state, "version": version})
+        with self._lock:
+            if self._version_of(self._current(user_id)) != expected_version:
+                return None
+            self._states[user_id] = (raw, time.time())
+        return version
+
+    def delete(self, user_id: str):
+        with self._lock:
+            self._states.pop(user_id, None)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {**super().get_stats(), "users": len(self._states)}
+
+
+class SQLiteStateStore(StateStore):
+    """State in a SQLite file (WAL), shared by every worker on the host"""
+
+    def __init__(self, path: str, ttl_seconds: float = 0):
+        super().__init__(ttl_seconds)
+        self.path = path
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            """CREATE TABLE IF NOT EXISTS user_state (
+                user_id TEXT PRIMARY KEY,
+                state TEXT NOT NULL,
+                updated_at REAL NOT NULL
+            )"""
+        )
+        self._db.commit()
+        self._lock = threading.Lock()
+
+    def _current(self, user_id: str, purge: bool = True) -> Optional[str]:
+        # Gọi khi đang giữ self._lock; purge=False: không xoá (đang trong transaction của save)
+        row = self._db.execute(
+            "SELECT state, updated_at FROM user_state WHERE user_id = ?", (user_id,)
+        ).fetchone()
+        if row is None:
+            return None
+        if self.ttl_seconds and time.time() - row[1] > self.ttl_seconds:
+            if purge:
+                self._db.execute("DELETE FROM user_state WHERE user_id = ?", (user_id,))
+                self._db.commit()
+            return None
+        return row[0]
+
+    def get(self, user_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            raw = self._current(user_id)
+        return json.loads(raw) if raw is not None else None
+
+    def save(self, user_id: str, state: Dict[str, Any], expected_version: Optional[str]) -> Optional[str]:
+        version = self._new_version()
+        raw = self._dumps({**state, "version": version})
+        with self._lock:
+            # BEGIN IMMEDIATE: khoá ghi cả file, worker khác không chen vào giữa đọc và ghi
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                if self._version_of(self._current(user_id, purge=False)) != expected_version:
+                    self._db.rollback()
+                    return None
+                self._db.execute(
+                    "INSERT OR REPLACE INTO user_state (user_id, state, updated_at) VALUES (?, ?, ?)",
+                    (user_id, raw, time.time())
+                )
+                self._db.commit()
+            except BaseException:
+                self._db.rollback()
+                raise
+        return version
+
+    def delete(self, user_id: str):
+        with self._lock:
+            self._db.execute("DELETE FROM user_state WHERE user_id = ?", (user_id,))
+            self._db.commit()
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            (users,) = self._db.execute("SELECT COUNT(*) FROM user_state").fetchone()
+        return {**super().get_stats(), "users": users, "path": self.path}
+
+
+class RedisStateStore(StateStore):
+    """State in Redis (or a Redis-compatible local server), shared across hosts"""
+
+    def __init__(self, url: str, ttl_seconds: float = 0, prefix: str = "chatbot:state:"):
+        super().__init__(ttl_seconds)
+        try:
+            import redis
+        except ImportError:
+            raise ValueError("Redis state store requires the redis package: pip install redis")
+        self.url = url
+        self.prefix = prefix
+        self._client = redis.Redis.from_url(url)
+        self._watch_error = redis.WatchError
+
+    def get(self, user_id: str) -> Optional[Dict[str, Any]]:
+        raw = self._client.get(self.prefix + user_id)
+        return json.loads(raw) if raw is not None else None
+
+    def save(self, user_id: str, state: Dict[str, Any], expected_version: Optional[str]) -> Optional[str]:
+        key = self.prefix + user_id
+        version = self._new_version()
+        raw = self._dumps({**state, "version": version})
+        # WATCH/MULTI/EXEC: EXEC thất bại nếu key bị ghi sau WATCH
+        with self._client.pipeline() as pipe:
+            try:
+                pipe.watch(key)
+                if self._version_of(pipe.get(key)) != expected_version:
+                    return None
+                pipe.multi()
+                # TTL do Redis tự xử lý (EX)
+                pipe.set(key, raw, ex=int(self.ttl_seconds) or None)
+                pipe.execute()
+            except self._watch_error:
+                return None
+        return version
+
+    def delete(self, user_id: str):
+        self._client.delete(self.prefix + user_id)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {**super().get_stats(), "url": self.url}
+
+
+def create_state_store(settings: Optional[Dict[str, Any]] = None) -> StateStore:
+    """
+    Build the state store configured in config.json ("state" section)
+
+    Args:
+        settings: {"backend": "memory" | "sqlite" | "redis", "path", "redis_url", "ttl"}
+            (default: Config().get("state"))
+
+    Returns:
+        StateStore: Configured store
+    """
+    settings = settings if settings is not None else (Config().get("state") or {})
+    backend = settings.get("backend", "memory")
+    ttl = settings.get("ttl", 0)
+
+    if backend == "memory":
+        store = InMemoryStateStore(ttl)
+    elif backend == "sqlite":
+        store = SQLiteStateStore(settings.get("path", ".cache/session_state.sqlite3"), ttl)
+    elif backend == "redis":
+        store = RedisStateStore(settings.get("redis_url", "redis://localhost:6379/0"), ttl)
+    else:
+        raise ValueError(f"Unknown state store backend: {backend}. Use memory, sqlite or redis")
+
+    logger.info(f"Using {type(store).__name__} for conversation state")
+    return store
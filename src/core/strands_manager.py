@@ -0,0 +1,435 @@
+"""Agent registry and bounded dispatch of agent executions"""
+
+import asyncio
+import heapq
+import itertools
+import logging
+import math
+import time
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Optional, TypeVar
+
+from src.agents.base_agent import BaseAgent
+from src.utils.config import Config
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Priority lane: request không cần gọi model (cache, single-flight) hoặc do server chỉ định; NORMAL: còn lại
+PRIORITY_HIGH = 0
+PRIORITY_NORMAL = 1
+
+
+class AdmissionError(Exception):
+    """
+    Request refused by admission control
+
+    Attributes:
+        status_code: 429 (user has too many pending requests) or 503 (server saturated)
+        retry_after: Suggested seconds before retrying
+    """
+
+    def __init__(self, message: str, status_code: int, retry_after: int):
+        super().__init__(message)
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+
+class StrandsManager:
+    """
+    Registry of agents and dispatcher for their executions
+
+    At most `max_active` executions run at the same time (config
+    strands.max_active); further requests wait in FIFO order. Requests of the
+    same user run one after another in arrival order, so a user's turns never
+    interleave in the conversation history. Every request has a deadline
+    (strands.timeout) that covers queueing and execution, and can be
+    cancelled by user.
+
+    Admission control keeps overload from turning into timeouts:
+    - at most `max_queue` requests wait (strands.max_queue), and at most
+      `max_queued_per_user` per user; beyond that requests are refused
+      at once (AdmissionError 503 / 429);
+    - a request waits at most `queue_timeout` seconds for its turn, then is
+      refused (503) instead of running late;
+    - PRIORITY_HIGH requests are served before normal ones and may use
+      `reserved_slots` slots normal requests cannot take, so cheap requests
+      still get through while long ones occupy the other slots. They have
+      their own bound: at most `max_priority_queue` of them wait
+      (strands.max_priority_queue), beyond that they are refused (503).
+    """
+
+    def __init__(
+        self,
+        max_active: Optional[int] = None,
+        timeout: Optional[float] = None,
+        max_queue: Optional[int] = None,
+        max_queued_per_user: Optional[int] = None,
+        queue_timeout: Optional[float] = None,
+        reserved_slots: Optional[int] = None,
+        max_priority_queue: Optional[int] = None
+    ):
+        """
+        Initialize the manager
+
+        Args:
+            max_active: Maximum concurrent agent executions (default: strands.max_active)
+            timeout: Seconds per request, queueing included (default: strands.timeout)
+            max_queue: Maximum normal requests waiting (default: strands.max_queue)
+            max_queued_per_user: Maximum pending requests per user (default: strands.max_queued_per_user)
+            queue_timeout: Maximum seconds waiting for a slot (default: strands.queue_timeout)
+            reserved_slots: Slots only PRIORITY_HIGH requests may use (default: strands.reserved_slots)
+            max_priority_queue: Maximum PRIORITY_HIGH requests waiting (default: strands.max_priority_queue)
+        """
+        config = Config()
+        self.max_active = max_active or config.get("strands.max_active", 10)
+        self.timeout = timeout or config.get("strands.timeout", 300)
+        self.max_queue = max_queue if max_queue is not None else config.get("strands.max_queue", 50)
+        self.max_queued_per_user = (
+            max_queued_per_user if max_queued_per_user is not None
+            else config.get("strands.max_queued_per_user", 3)
+        )
+        self.queue_timeout = queue_timeout or config.get("strands.queue_timeout", 30)
+        reserved = reserved_slots if reserved_slots is not None else config.get("strands.reserved_slots", 1)
+        # Luôn chừa ít nhất một slot cho request thường
+        self.reserved_slots = max(0, min(reserved, self.max_active - 1))
+        self.max_priority_queue = (
+            max_priority_queue if max_priority_queue is not None
+            else config.get("strands.max_priority_queue", 10)
+        )
+        self.agents: Dict[str, BaseAgent] = {}
+        self.default_agent: Optional[str] = None
+
+        self._active = 0
+        # (priority, seq, future) của các request đang chờ slot
+        self._slot_waiters: list = []
+        # user_id -> [lock, requests holding or waiting for it]
+        self._user_locks: Dict[str, list] = {}
+        # request_id -> {"user_id", "task", "started"}
+        self._running: Dict[int, Dict[str, Any]] = {}
+        self._ids = itertools.count(1)
+        self._waiting_user = 0
+        self._waiting_slot = 0
+        # Request PRIORITY_HIGH đang chờ (đã tính trong _waiting_user/_waiting_slot)
+        self._waiting_priority = 0
+        self._metrics = {
+            "submitted": 0,
+            "completed": 0,
+            "failed": 0,
+            "timed_out": 0,
+            "cancelled": 0,
+            "rejected_queue_full": 0,
+            "rejected_priority_full": 0,
+            "rejected_user_limit": 0,
+            "rejected_queue_timeout": 0,
+            "admitted": 0,
+            "admitted_priority": 0,
+            "runs": 0,
+            "total_wait_s": 0.0,
+            "total_run_s": 0.0,
+            "max_wait_s": 0.0
+        }
+
+    def register_agent(self, agent: BaseAgent, default: bool = False):
+        """
+        Register an agent (the first one registered is the default)
+
+        Args:
+            agent: Agent instance
+            default: Make it the default agent
+        """
+        self.agents[agent.name] = agent
+        if default or self.default_agent is None:
+            self.default_agent = agent.name
+        logger.info(f"Registered agent: {agent.name}")
+
+    def get_agent(self, name: Optional[str] = None) -> BaseAgent:
+        """Get a registered agent by name (default agent if name is None)"""
+        name = name or self.default_agent
+        if name not in self.agents:
+            raise ValueError(f"Agent not registered: {name}")
+        return self.agents[name]
+
+    def _user_lock(self, user_id: str) -> asyncio.Lock:
+        entry = self._user_locks.get(user_id)
+        if entry is None:
+            entry = self._user_locks[user_id] = [asyncio.Lock(), 0]
+        entry[1] += 1
+        return entry[0]
+
+    def _release_user(self, user_id: str):
+        entry = self._user_locks.get(user_id)
+        if entry is not None:
+            entry[1] -= 1
+            if entry[1] <= 0:
+                del self._user_locks[user_id]
+
+    def _retry_after(self) -> int:
+        """Seconds until a queued request would likely get a slot (average run time x queue depth)"""
+        runs = self._metrics["runs"]
+        avg_run = self._metrics["total_run_s"] / runs if runs else 1.0
+        queued = self._waiting_user + self._waiting_slot
+        estimate = avg_run * (queued + 1) / self.max_active
+        return max(1, min(math.ceil(estimate), math.ceil(self.queue_timeout)))
+
+    def _check_admission(self, user_id: str, priority: int):
+        """Refuse the request at once when its user or the queue is full"""
+        entry = self._user_locks.get(user_id)
+        if entry is not None and entry[1] > self.max_queued_per_user:
+            self._metrics["rejected_user_limit"] += 1
+            raise AdmissionError(
+                f"Too many pending requests for user {user_id}", 429, self._retry_after()
+            )
+        if priority == PRIORITY_HIGH:
+            if self._active >= self.max_active and self._waiting_priority >= self.max_priority_queue:
+                self._metrics["rejected_priority_full"] += 1
+                raise AdmissionError("Server is busy, priority queue is full", 503, self._retry_after())
+            return
+        queued = self._waiting_user + self._waiting_slot
+        if self._active >= self.max_active - self.reserved_slots and queued >= self.max_queue:
+            self._metrics["rejected_queue_full"] += 1
+            raise AdmissionError("Server is busy, request queue is full", 503, self._retry_after())
+
+    def check_admission(self, user_id: str, priority: int = PRIORITY_NORMAL):
+        """
+        Check that a request would be queued (for callers that must answer before streaming)
+
+        Raises:
+            AdmissionError: User limit (429) or queue (503) is full
+        """
+        self._check_admission(user_id, priority)
+
+    def _dispatch(self):
+        """Hand free slots to waiters, priority lane first"""
+        while self._slot_waiters:
+            priority, _, future = self._slot_waiters[0]
+            if future.done():
+                # Waiter đã timeout/bị huỷ
+                heapq.heappop(self._slot_waiters)
+                continue
+            limit = self.max_active if priority == PRIORITY_HIGH else self.max_active - self.reserved_slots
+            if self._active >= limit:
+                break
+            heapq.heappop(self._slot_waiters)
+            self._active += 1
+            future.set_result(True)
+
+    async def _acquire_slot(self, priority: int, timeout: float):
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._slot_waiters, (priority, next(self._ids), future))
+        self._dispatch()
+        try:
+            await asyncio.wait_for(asyncio.shield(future), timeout)
+        except BaseException:
+            if future.done() and not future.cancelled():
+                # Slot vừa được cấp đúng lúc timeout/huỷ: trả lại
+                self._release_slot()
+            else:
+                future.cancel()
+            raise
+
+    def _release_slot(self):
+        self._active -= 1
+        self._dispatch()
+
+    async def _admit(self, user_id: str, deadline: float, priority: int = PRIORITY_NORMAL) -> float:
+        """Wait for the user's turn, then for a free slot; returns seconds waited"""
+        self._check_admission(user_id, priority)
+        started = time.monotonic()
+        # Thời gian chờ tối đa: queue_timeout (nhưng không quá deadline của request)
+        queue_deadline = min(deadline, started + self.queue_timeout)
+        lock = self._user_lock(user_id)
+        high = priority == PRIORITY_HIGH
+        self._waiting_priority += high
+        try:
+            try:
+                self._waiting_user += 1
+                try:
+                    await asyncio.wait_for(lock.acquire(), max(queue_deadline - time.monotonic(), 0))
+                finally:
+                    self._waiting_user -= 1
+
+                self._waiting_slot += 1
+                try:
+                    await self._acquire_slot(priority, max(queue_deadline - time.monotonic(), 0))
+                except BaseException:
+                    lock.release()
+                    raise
+                finally:
+                    self._waiting_slot -= 1
+            except asyncio.TimeoutError:
+                if queue_deadline >= deadline:
+                    raise
+                self._metrics["rejected_queue_timeout"] += 1
+                raise AdmissionError(
+                    f"Server is busy, no slot within {self.queue_timeout}s", 503, self._retry_after()
+                )
+        except BaseException:
+            self._release_user(user_id)
+            raise
+        finally:
+            self._waiting_priority -= high
+
+        waited = time.monotonic() - started
+        self._metrics["admitted"] += 1
+        if priority == PRIORITY_HIGH:
+            self._metrics["admitted_priority"] += 1
+        self._metrics["total_wait_s"] += waited
+        self._metrics["max_wait_s"] = max(self._metrics["max_wait_s"], waited)
+        return waited
+
+    def _leave(self, user_id: str, request_id: int, started: float):
+        self._running.pop(request_id, None)
+        self._metrics["runs"] += 1
+        self._metrics["total_run_s"] += time.monotonic() - started
+        self._release_slot()
+        entry = self._user_locks.get(user_id)
+        if entry is not None:
+            entry[0].release()
+        self._release_user(user_id)
+
+    def _finish(self, error: Optional[BaseException]):
+        if error is None:
+            self._metrics["completed"] += 1
+        elif isinstance(error, AdmissionError):
+            # Đã đếm trong rejected_*
+            pass
+        elif isinstance(error, asyncio.TimeoutError):
+            self._metrics["timed_out"] += 1
+        elif isinstance(error, asyncio.CancelledError):
+            self._metrics["cancelled"] += 1
+        else:
+            self._metrics["failed"] += 1
+
+    async def execute(
+        self,
+        user_id: str,
+        func: Callable[[BaseAgent], Awaitable[T]],
+        agent_name: Optional[str] = None,
+        timeout: Optional[float] = None,
+        priority: int = PRIORITY_NORMAL
+    ) -> T:
+        """
+        Run func(agent) once the user's earlier requests are done and a slot is free
+
+        Args:
+            user_id: User the request belongs to (FIFO per user)
+            func: Coroutine function receiving the agent
+            agent_name: Registered agent (default agent if None)
+            timeout: Seconds for queueing + execution (default: self.timeout)
+            priority: PRIORITY_HIGH or PRIORITY_NORMAL
+
+        Returns:
+            Result of func
+
+        Raises:
+            AdmissionError: Refused by admission control (queue full or no slot in time)
+            asyncio.TimeoutError: Deadline exceeded (the execution is cancelled)
+            asyncio.CancelledError: Cancelled through cancel()
+        """
+        agent = self.get_agent(agent_name)
+        deadline = time.monotonic() + (timeout or self.timeout)
+        request_id = next(self._ids)
+        self._metrics["submitted"] += 1
+
+        error: Optional[BaseException] = None
+        try:
+            await self._admit(user_id, deadline, priority)
+            started = time.monotonic()
+            task = asyncio.ensure_future(func(agent))
+            self._running[request_id] = {"user_id": user_id, "task": task, "started": started}
+            try:
+                return await asyncio.wait_for(task, max(deadline - time.monotonic(), 0))
+            finally:
+                self._leave(user_id, request_id, started)
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            self._finish(error)
+
+    async def stream(
+        self,
+        user_id: str,
+        func: Callable[[BaseAgent], AsyncIterator[T]],
+        agent_name: Optional[str] = None,
+        timeout: Optional[float] = None,
+        priority: int = PRIORITY_NORMAL
+    ) -> AsyncIterator[T]:
+        """
+        Stream func(agent) under the same admission rules as execute()
+
+        The slot is held until the stream is exhausted, fails, times out or
+        the consumer closes it (e.g. the client disconnected).
+        """
+        agent = self.get_agent(agent_name)
+        deadline = time.monotonic() + (timeout or self.timeout)
+        request_id = next(self._ids)
+        self._metrics["submitted"] += 1
+
+        error: Optional[BaseException] = None
+        try:
+            await self._admit(user_id, deadline, priority)
+            started = time.monotonic()
+            self._running[request_id] = {"user_id": user_id, "task": asyncio.current_task(), "started": started}
+            events = func(agent)
+            try:
+                while True:
+                    try:
+                        event = await asyncio.wait_for(events.__anext__(), max(deadline - time.monotonic(), 0))
+                    except StopAsyncIteration:
+                        break
+                    yield event
+            finally:
+                await events.aclose()
+                self._leave(user_id, request_id, started)
+        except GeneratorExit:
+            # Consumer closed the stream (client disconnected)
+            error = asyncio.CancelledError()
+            raise
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            self._finish(error)
+
+    def cancel(self, user_id: str) -> int:
+        """
+        Cancel the running requests of a user
+
+        Returns:
+            int: Number of requests cancelled
+        """
+        cancelled = 0
+        for request in list(self._running.values()):
+            if request["user_id"] == user_id and not request["task"].done():
+                request["task"].cancel()
+                cancelled += 1
+        return cancelled
+
+    def is_saturated(self) -> bool:
+        """True when normal requests would be refused (all normal slots busy and queue full)"""
+        queued = self._waiting_user + self._waiting_slot
+        return self._active >= self.max_active - self.reserved_slots and queued >= self.max_queue
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Get active/queued requests, outcome and rejection counters and average wait/run times"""
+        metrics = dict(self._metrics)
+        metrics.update({
+            "max_active": self.max_active,
+            "reserved_slots": self.reserved_slots,
+            "max_queue": self.max_queue,
+            "max_priority_queue": self.max_priority_queue,
+            "queued_priority": self._waiting_priority,
+            "active": len(self._running),
+            "queued": self._waiting_user + self._waiting_slot,
+            "queued_for_slot": self._waiting_slot,
+            "queued_behind_user": self._waiting_user,
+            "users": len(self._user_locks),
+            "avg_wait_ms": round(metrics["total_wait_s"] / metrics["admitted"] * 1000, 1) if metrics["admitted"] else 0.0,
+            "avg_run_ms": round(metrics["total_run_s"] / metrics["runs"] * 1000, 1) if metrics["runs"] else 0.0,
+            "max_wait_ms": round(metrics.pop("max_wait_s") * 1000, 1)
+        })
+        metrics["total_wait_s"] = round(metrics["total_wait_s"], 3)
+        metrics["total_run_s"] = round(metrics["total_run_s"], 3)
+        return metrics
@@ -25,11 +25,23 @@ class Config:
             "agent": {
                 "name": "ChatbotAgent",
                 "personality": "helpful",
-                "max_memory": 100
+                "max_memory": 100,
+                "max_memory_tokens": 8000,
+                "memory_strategy": "drop"
             },
             "strands": {
                 "max_active": 10,
-                "timeout": 300
+                "timeout": 300,
+                "max_queue": 50,
+                "max_queued_per_user": 3,
+                "queue_timeout": 30,
+                "reserved_slots": 1,
+                "max_priority_queue": 10
+            },
+            "state": {
+                "backend": "sqlite",
+                "path": ".cache/session_state.sqlite3",
+                "ttl": 86400
             },
             "logging": {
                 "level": "INFO",
@@ -0,0 +1,86 @@
+"""Test SSE relaying of the streaming chat endpoint"""
+
+import sys
+import os
+import asyncio
+import logging
+
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import api.app as app_module
+
+
+class FakeRequest:
+    """Starlette Request stand-in that reports a disconnect after `connected_for` checks"""
+
+    def __init__(self, connected_for: int):
+        self.checks = 0
+        self.connected_for = connected_for
+
+    async def is_disconnected(self) -> bool:
+        self.checks += 1
+        return self.checks > self.connected_for
+
+
+@pytest.fixture(autouse=True)
+def api_globals(monkeypatch):
+    monkeypatch.setattr(app_module, "logger", logging.getLogger("test_api_stream"))
+    monkeypatch.setattr(app_module, "STREAM_KEEPALIVE_SECONDS", 0.01)
+
+
+def test_format_sse():
+    assert app_module.format_sse({"type": "delta", "text": "xin chào"}) == (
+        'event: delta\ndata: {"type": "delta", "text": "xin chào"}\n\n'
+    )
+
+
+def test_relays_events_and_keepalives():
+    async def events():
+        yield {"type": "delta", "text": "a"}
+        await asyncio.sleep(0.05)
+        yield {"type": "done", "response": "a"}
+
+    async def run():
+        return [chunk async for chunk in app_module.sse_source(events(), FakeRequest(100), "u1")]
+
+    chunks = asyncio.run(run())
+    assert chunks[0].startswith("event: delta")
+    assert ": keep-alive\n\n" in chunks
+    assert chunks[-1].startswith("event: done")
+
+
+def test_disconnect_during_keepalive_cancels_agent_run():
+    state = {"cancelled": False, "closed": False}
+
+    async def slow_events():
+        try:
+            yield {"type": "delta", "text": "a"}
+            # Slow model call: only keep-alives are sent meanwhile
+            await asyncio.sleep(10)
+            yield {"type": "done", "response": "a"}
+        except asyncio.CancelledError:
+            state["cancelled"] = True
+            raise
+        finally:
+            state["closed"] = True
+
+    async def run():
+        # Connected for the first event and one keep-alive, then gone
+        return [chunk async for chunk in app_module.sse_source(slow_events(), FakeRequest(2), "u1")]
+
+    chunks = asyncio.run(asyncio.wait_for(run(), timeout=2))
+    assert not any("event: error" in chunk for chunk in chunks)
+    assert state["cancelled"] and state["closed"]
+
+
+def test_error_event():
+    async def failing():
+        yield {"type": "delta", "text": "a"}
+        raise RuntimeError("boom")
+
+    async def run():
+        return [chunk async for chunk in app_module.sse_source(failing(), FakeRequest(100), "u1")]
+
+    chunks = asyncio.run(run())
+    assert chunks[-1].startswith("event: error")
@@ -0,0 +1,128 @@
+"""Test the async Claude client (concurrency limit, stats, streaming on its own pool)"""
+
+import sys
+import os
+import asyncio
+import json
+import threading
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import config
+from bedrock.async_claude import AsyncClaudeClient
+from bedrock.claude import ClaudeClient
+
+
+class BlockingClient:
+    """ClaudeClient stand-in whose calls block until `release` is set"""
+
+    def __init__(self):
+        self.release = threading.Event()
+        self.running = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    def generate_response(self, prompt, model_id=None, max_tokens=None, temperature=None):
+        with self._lock:
+            self.running += 1
+            self.peak = max(self.peak, self.running)
+        self.release.wait(2)
+        with self._lock:
+            self.running -= 1
+        return f"re {prompt}"
+
+
+async def wait_for(condition, timeout=2.0):
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    while not condition():
+        assert loop.time() < deadline, "condition not met in time"
+        await asyncio.sleep(0.005)
+
+
+def test_semaphore_bounds_concurrent_requests():
+    client = BlockingClient()
+    async_client = AsyncClaudeClient(client, max_concurrency=2)
+
+    async def run():
+        requests = asyncio.gather(*(async_client.generate_response(f"p{i}") for i in range(5)))
+        await wait_for(lambda: async_client.get_stats()["waiting"] == 3)
+        assert async_client.get_stats() == {"max_concurrency": 2, "in_flight": 2, "waiting": 3}
+        client.release.set()
+        return await requests
+
+    assert asyncio.run(run()) == [f"re p{i}" for i in range(5)]
+    assert client.peak == 2
+    assert async_client.get_stats() == {"max_concurrency": 2, "in_flight": 0, "waiting": 0}
+    async_client.close()
+
+
+class FakeEventStream:
+    """Bedrock event stream recording the thread that reads it"""
+
+    def __init__(self):
+        self.reader = None
+
+    def __iter__(self):
+        self.reader = threading.current_thread().name
+        for text in ("Xin ", "chào"):
+            delta = {"type": "content_block_delta", "index": 0, "delta": {"type": "text_delta", "text": text}}
+            yield {"chunk": {"bytes": json.dumps(delta).encode("utf-8")}}
+
+    def close(self):
+        pass
+
+
+class FakeRuntime:
+    def __init__(self):
+        self.streams = []
+
+    def invoke_model_with_response_stream(self, modelId, body, contentType):
+        self.streams.append(FakeEventStream())
+        return {"body": self.streams[-1]}
+
+
+def make_client(runtime) -> ClaudeClient:
+    client = ClaudeClient.__new__(ClaudeClient)
+    client.aws_session = None
+    client.bedrock_runtime = runtime
+    client.region_router = None
+    client.default_model = "test-model"
+    client.cache = None
+    client.prompt_cache = False
+    return client
+
+
+def test_astream_reads_on_the_client_pool(monkeypatch):
+    monkeypatch.setattr(config, "RATE_LIMIT_ENABLED", False)
+    runtime = FakeRuntime()
+    async_client = AsyncClaudeClient(make_client(runtime), max_concurrency=1)
+
+    async def run():
+        return [event async for event in async_client.astream("hi")]
+
+    events = asyncio.run(run())
+    assert [event["text"] for event in events if event["type"] == "text"] == ["Xin ", "chào"]
+    assert runtime.streams[0].reader.startswith("claude-async")
+    assert async_client.get_stats()["in_flight"] == 0
+    async_client.close()
+
+
+def test_astream_waits_for_a_slot(monkeypatch):
+    monkeypatch.setattr(config, "RATE_LIMIT_ENABLED", False)
+    async_client = AsyncClaudeClient(make_client(FakeRuntime()), max_concurrency=1)
+
+    async def run():
+        first = async_client.astream("a")
+        await first.__anext__()
+        second = asyncio.ensure_future(second_stream())
+        await wait_for(lambda: async_client.get_stats()["waiting"] == 1)
+        assert async_client.get_stats()["in_flight"] == 1
+        await first.aclose()
+        return await second
+
+    async def second_stream():
+        return [event async for event in async_client.astream("b")]
+
+    assert len(asyncio.run(run())) == 3
+    assert async_client.get_stats() == {"max_concurrency": 1, "in_flight": 0, "waiting": 0}
+    async_client.close()
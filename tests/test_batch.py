@@ -0,0 +1,107 @@
+"""Test batch inference (retries, adaptive concurrency, checkpoints)"""
+
+import sys
+import os
+import io
+import json
+import threading
+
+import pytest
+from botocore.exceptions import ClientError
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import config
+from bedrock import rate_limit
+from bedrock.batch import AdaptiveConcurrency, BatchRunner
+from bedrock.claude import ClaudeClient
+
+
+class FakeRuntime:
+    """bedrock-runtime stub: throttles the first `throttles` calls of each prompt"""
+
+    def __init__(self, throttles: int = 0):
+        self.throttles = throttles
+        self.calls = {}
+        self.lock = threading.Lock()
+
+    def invoke_model(self, modelId, body, contentType):
+        message = json.loads(body)["messages"][-1]["content"]
+        with self.lock:
+            self.calls[message] = self.calls.get(message, 0) + 1
+            count = self.calls[message]
+        if count <= self.throttles:
+            raise ClientError({"Error": {"Code": "ThrottlingException", "Message": "slow down"}}, "InvokeModel")
+        payload = {"content": [{"type": "text", "text": f"echo {message}"}], "usage": {}}
+        return {"body": io.BytesIO(json.dumps(payload).encode("utf-8"))}
+
+
+def make_client(runtime: FakeRuntime) -> ClaudeClient:
+    client = ClaudeClient.__new__(ClaudeClient)
+    client.aws_session = None
+    client.bedrock_runtime = runtime
+    client.region_router = None
+    client.default_model = "test-model"
+    client.cache = None
+    client.prompt_cache = False
+    return client
+
+
+@pytest.fixture(autouse=True)
+def fast_retries(monkeypatch):
+    monkeypatch.setattr(config, "BATCH_BASE_BACKOFF", 0.0)
+    monkeypatch.setattr(config, "RATE_LIMIT_BASE_BACKOFF", 0.0)
+    monkeypatch.setattr(config, "RATE_LIMIT_ENABLED", True)
+    monkeypatch.setattr(rate_limit, "_limiters", {})
+
+
+def test_adaptive_concurrency():
+    concurrency = AdaptiveConcurrency(8)
+    concurrency.on_throttle()
+    concurrency.on_throttle()
+    assert concurrency.limit == 2
+    concurrency.on_success()
+    concurrency.on_success()
+    assert concurrency.limit == 3
+
+
+def test_ordered_results():
+    runner = BatchRunner(client=make_client(FakeRuntime()), max_concurrency=4)
+    results = list(runner.run([f"p{i}" for i in range(10)], ordered=True))
+
+    assert [result["index"] for result in results] == list(range(10))
+    assert results[3]["response"] == "echo p3"
+    assert runner.get_stats()["completed"] == 10
+
+
+def test_runner_owns_retries():
+    runtime = FakeRuntime(throttles=2)
+    runner = BatchRunner(client=make_client(runtime), max_concurrency=1, max_retries=3)
+    result = list(runner.run(["hello"]))[0]
+
+    # Every attempt is one Bedrock call: the rate limiter does not retry on top
+    assert result["response"] == "echo hello"
+    assert result["attempts"] == 3
+    assert runtime.calls["hello"] == 3
+    assert runner.get_stats()["throttled"] == 2
+
+
+def test_retries_exhausted():
+    runtime = FakeRuntime(throttles=10)
+    runner = BatchRunner(client=make_client(runtime), max_concurrency=1, max_retries=2)
+    result = list(runner.run(["hello"]))[0]
+
+    assert result["error"]
+    assert runtime.calls["hello"] == 3
+    assert runner.get_stats()["failed"] == 1
+
+
+def test_checkpoint_resume(tmp_path):
+    checkpoint = str(tmp_path / "batch.jsonl")
+    runtime = FakeRuntime()
+    list(BatchRunner(client=make_client(runtime), checkpoint_path=checkpoint).run(["a", "b"]))
+
+    runner = BatchRunner(client=make_client(runtime), checkpoint_path=checkpoint)
+    results = list(runner.run(["a", "b", "c"], ordered=True))
+
+    assert [result.get("resumed", False) for result in results] == [True, True, False]
+    assert runtime.calls == {"a": 1, "b": 1, "c": 1}
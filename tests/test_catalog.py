@@ -0,0 +1,138 @@
+"""Test the cached Bedrock model catalog"""
+
+import sys
+import os
+import threading
+import time
+
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from bedrock import catalog as catalog_module
+from bedrock.catalog import ModelCatalog, get_model_catalog
+
+
+MODELS = [
+    {
+        "modelId": "anthropic.claude-3-haiku",
+        "providerName": "Anthropic",
+        "inputModalities": ["TEXT", "IMAGE"],
+        "outputModalities": ["TEXT"],
+        "responseStreamingSupported": True,
+        "inferenceTypesSupported": ["ON_DEMAND"],
+    },
+    {
+        "modelId": "anthropic.claude-sonnet-4",
+        "providerName": "Anthropic",
+        "inputModalities": ["TEXT"],
+        "outputModalities": ["TEXT"],
+        "responseStreamingSupported": True,
+        "inferenceTypesSupported": ["INFERENCE_PROFILE"],
+    },
+    {
+        "modelId": "amazon.titan-embed",
+        "providerName": "Amazon",
+        "inputModalities": ["TEXT"],
+        "outputModalities": ["EMBEDDING"],
+        "inferenceTypesSupported": ["ON_DEMAND"],
+        "modelLifecycle": {"status": "LEGACY"},
+    },
+]
+
+PROFILES = [
+    {
+        "inferenceProfileId": "us.anthropic.claude-sonnet-4",
+        "models": [{"modelArn": "arn:aws:bedrock:us-east-1::foundation-model/anthropic.claude-sonnet-4"}],
+    }
+]
+
+
+class FakePaginator:
+    def __init__(self, profiles):
+        self.profiles = profiles
+
+    def paginate(self, **kwargs):
+        yield {"inferenceProfileSummaries": self.profiles}
+
+
+class FakeBedrock:
+    """boto3 "bedrock" client stub"""
+
+    def __init__(self, models=MODELS, delay: float = 0.0):
+        self.models = models
+        self.delay = delay
+        self.calls = 0
+        self.fail = False
+
+    def list_foundation_models(self):
+        self.calls += 1
+        time.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError("AccessDenied")
+        return {"modelSummaries": self.models}
+
+    def get_paginator(self, name):
+        return FakePaginator(PROFILES)
+
+
+def test_lookups_and_filters():
+    client = FakeBedrock()
+    catalog = ModelCatalog("us-east-1", ttl_seconds=300, client=client)
+
+    assert len(catalog.list_models()) == 3
+    assert [m["modelId"] for m in catalog.find_models(provider="anthropic", streaming=True)] == [
+        "anthropic.claude-3-haiku", "anthropic.claude-sonnet-4"
+    ]
+    assert catalog.find_models(output_modality="EMBEDDING") == []
+    assert catalog.find_models(output_modality="EMBEDDING", active_only=False)[0]["modelId"] == "amazon.titan-embed"
+    assert catalog.get_model("us.anthropic.claude-sonnet-4")["modelId"] == "anthropic.claude-sonnet-4"
+    assert catalog.resolve_model_id("anthropic.claude-sonnet-4") == "us.anthropic.claude-sonnet-4"
+    assert catalog.resolve_model_id("anthropic.claude-3-haiku") == "anthropic.claude-3-haiku"
+    assert client.calls == 1
+
+
+def test_failed_refresh_keeps_snapshot():
+    client = FakeBedrock()
+    catalog = ModelCatalog("us-east-1", ttl_seconds=300, client=client)
+    catalog.list_models()
+
+    client.fail = True
+    catalog.refresh()
+    assert len(catalog.list_models()) == 3
+    assert catalog.get_stats()["refresh_errors"] == 1
+
+
+def test_first_load_failure_raises():
+    client = FakeBedrock()
+    client.fail = True
+    with pytest.raises(ValueError):
+        ModelCatalog("us-east-1", client=client).list_models()
+
+
+def test_stale_lookup_does_not_wait_for_refresh():
+    client = FakeBedrock()
+    catalog = ModelCatalog("us-east-1", ttl_seconds=0.01, client=client)
+    catalog.list_models()
+
+    client.delay = 0.5
+    time.sleep(0.02)
+    refresher = threading.Thread(target=catalog.list_models)
+    refresher.start()
+    time.sleep(0.05)
+
+    started = time.perf_counter()
+    assert len(catalog.list_models()) == 3
+    assert time.perf_counter() - started < 0.2
+    refresher.join()
+    assert client.calls == 2
+
+
+def test_catalog_per_credentials(monkeypatch):
+    monkeypatch.setattr(catalog_module, "_catalogs", {})
+    first = get_model_catalog("us-east-1", client=FakeBedrock(), credentials_key="AKIA1")
+    second = get_model_catalog("us-east-1", client=FakeBedrock(models=MODELS[:1]), credentials_key="AKIA2")
+
+    assert first is get_model_catalog("us-east-1", credentials_key="AKIA1")
+    assert second is not first
+    assert len(second.list_models()) == 1
+    assert len(first.list_models()) == 3
@@ -0,0 +1,161 @@
+"""Test Claude streaming (event parsing, async relay, early stop)"""
+
+import sys
+import os
+import asyncio
+import json
+import threading
+import time
+
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import config
+from bedrock import claude as claude_module
+from bedrock.claude import ClaudeClient
+
+
+def chunk(data):
+    return {"chunk": {"bytes": json.dumps(data).encode("utf-8")}}
+
+
+ANSWER = [
+    chunk({"type": "message_start", "message": {"usage": {"input_tokens": 12, "cache_read_input_tokens": 5}}}),
+    chunk({"type": "content_block_start", "index": 0, "content_block": {"type": "text"}}),
+    chunk({"type": "content_block_delta", "index": 0, "delta": {"type": "text_delta", "text": "Xin "}}),
+    chunk({"type": "content_block_delta", "index": 0, "delta": {"type": "text_delta", "text": "chào"}}),
+    chunk({"type": "content_block_start", "index": 1,
+           "content_block": {"type": "tool_use", "id": "t1", "name": "pricing"}}),
+    chunk({"type": "content_block_delta", "index": 1,
+           "delta": {"type": "input_json_delta", "partial_json": "{\"service\""}}),
+    chunk({"type": "message_delta", "delta": {"stop_reason": "tool_use"}, "usage": {"output_tokens": 7}}),
+]
+
+
+class FakeEventStream:
+    """botocore EventStream stand-in; `endless` keeps producing text deltas until closed"""
+
+    def __init__(self, events=(), endless=False):
+        self.events = list(events)
+        self.endless = endless
+        self.closed = threading.Event()
+        self.read = 0
+
+    def __iter__(self):
+        for event in self.events:
+            self.read += 1
+            yield event
+        while self.endless:
+            if self.closed.is_set():
+                raise ConnectionError("stream closed")
+            self.read += 1
+            yield chunk({"type": "content_block_delta", "index": 0, "delta": {"type": "text_delta", "text": "x"}})
+            time.sleep(0.001)
+
+    def close(self):
+        self.closed.set()
+
+
+class FakeRuntime:
+    def __init__(self, stream=None, error=None):
+        self.stream = stream
+        self.error = error
+        self.bodies = []
+
+    def invoke_model_with_response_stream(self, modelId, body, contentType):
+        self.bodies.append(json.loads(body))
+        if self.error is not None:
+            raise self.error
+        return {"body": self.stream}
+
+
+def make_client(runtime) -> ClaudeClient:
+    client = ClaudeClient.__new__(ClaudeClient)
+    client.aws_session = None
+    client.bedrock_runtime = runtime
+    client.region_router = None
+    client.default_model = "test-model"
+    client.cache = None
+    client.prompt_cache = False
+    return client
+
+
+@pytest.fixture(autouse=True)
+def no_rate_limit(monkeypatch):
+    monkeypatch.setattr(config, "RATE_LIMIT_ENABLED", False)
+
+
+def test_stream_events():
+    stream = FakeEventStream(ANSWER)
+    events = list(make_client(FakeRuntime(stream)).chat_stream("hi"))
+
+    assert [e["text"] for e in events if e["type"] == "text"] == ["Xin ", "chào"]
+    tool_events = [e for e in events if e["type"] == "tool_use"]
+    assert tool_events[0] == {"type": "tool_use", "id": "t1", "name": "pricing", "input_delta": ""}
+    assert tool_events[1]["input_delta"] == "{\"service\"" and tool_events[1]["id"] == "t1"
+    usage = events[-1]
+    assert usage["type"] == "usage"
+    assert (usage["input_tokens"], usage["output_tokens"], usage["cache_read_input_tokens"]) == (12, 7, 5)
+    assert usage["stop_reason"] == "tool_use"
+    assert usage["first_token_ms"] is not None
+    assert stream.closed.is_set()
+
+
+def test_stream_error_event():
+    events = list(make_client(FakeRuntime(error=RuntimeError("AccessDenied"))).chat_stream("hi"))
+
+    assert events == [{"type": "error", "error": "AccessDenied"}]
+
+
+def test_explicit_zero_temperature_is_kept():
+    runtime = FakeRuntime(FakeEventStream(ANSWER))
+    list(make_client(runtime).chat_stream("hi", temperature=0.0))
+    list(make_client(runtime).chat_stream("hi"))
+
+    assert runtime.bodies[0]["temperature"] == 0.0
+    assert runtime.bodies[1]["temperature"] == config.BEDROCK_TEMPERATURE
+
+
+def test_astream_relays_every_event():
+    client = make_client(FakeRuntime(FakeEventStream(ANSWER)))
+
+    async def run():
+        return [event async for event in client.astream("hi")]
+
+    events = asyncio.run(run())
+    assert [event["type"] for event in events] == ["text", "text", "tool_use", "tool_use", "usage"]
+    assert events[-1]["output_tokens"] == 7
+
+
+def test_astream_early_stop_closes_the_bedrock_stream():
+    stream = FakeEventStream(endless=True)
+    client = make_client(FakeRuntime(stream))
+
+    async def run():
+        events = client.astream("hi")
+        await events.__anext__()
+        await events.aclose()
+
+    asyncio.run(run())
+    assert stream.closed.wait(2)
+    read = stream.read
+    time.sleep(0.05)
+    assert stream.read == read
+
+
+def test_astream_buffer_is_bounded(monkeypatch):
+    monkeypatch.setattr(claude_module, "STREAM_QUEUE_SIZE", 4)
+    stream = FakeEventStream(endless=True)
+    client = make_client(FakeRuntime(stream))
+
+    async def run():
+        events = client.astream("hi")
+        await events.__anext__()
+        # Slow consumer: the reader must wait for room in the queue
+        await asyncio.sleep(0.1)
+        read = stream.read
+        await events.aclose()
+        return read
+
+    assert asyncio.run(run()) <= 4 + 3
+    assert stream.closed.wait(2)
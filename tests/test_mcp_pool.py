@@ -0,0 +1,129 @@
+"""Test the pooled MCP server sessions (selection, restart, shutdown)"""
+
+import sys
+import os
+import asyncio
+import threading
+import time
+
+import pytest
+from mcp.types import Tool
+from strands.tools.mcp import MCPAgentTool, MCPClient
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import config
+from agent_chatbot_orchestrator.tools.mcp_pool import MCPPool, PooledMCPClient, PooledMCPTool
+
+
+@pytest.fixture(autouse=True)
+def fake_sessions(monkeypatch):
+    """Replace the stdio process of each PooledMCPClient with an in-process flag"""
+    monkeypatch.setattr(config, "MCP_HEALTH_CHECK_INTERVAL", 0)
+
+    def start(self):
+        self.spawns = getattr(self, "spawns", 0) + 1
+        self.running = True
+        return self
+
+    def stop(self, *args):
+        self.running = False
+
+    def list_tools_sync(self, *args, **kwargs):
+        return [MCPAgentTool(Tool(name="search", inputSchema={"type": "object"}), self)]
+
+    async def call_tool_async(self, tool_use_id, name, arguments=None, **kwargs):
+        return {"toolUseId": tool_use_id, "status": "success", "content": [{"text": f"{name} on {id(self)}"}]}
+
+    monkeypatch.setattr(PooledMCPClient, "start", start)
+    monkeypatch.setattr(PooledMCPClient, "stop", stop)
+    monkeypatch.setattr(PooledMCPClient, "list_tools_sync", list_tools_sync)
+    monkeypatch.setattr(PooledMCPClient, "_is_session_active", lambda self: getattr(self, "running", False))
+    monkeypatch.setattr(MCPClient, "call_tool_async", call_tool_async)
+
+
+def make_pool(sessions=2) -> MCPPool:
+    pool = MCPPool()
+    pool.register("docs", lambda: None, sessions=sessions)
+    return pool
+
+
+def call(tool: PooledMCPTool, tool_use_id="t1"):
+    async def run():
+        events = [event async for event in tool.stream({"toolUseId": tool_use_id, "input": {}}, {})]
+        return events[-1]["tool_result"]
+    return asyncio.run(run())
+
+
+def test_sessions_are_used_round_robin():
+    pool = make_pool(sessions=2)
+    sessions = pool._servers["docs"]
+
+    assert [pool.get_client("docs") for _ in range(4)] == [sessions[0], sessions[1], sessions[0], sessions[1]]
+    assert [client.spawns for client in sessions] == [1, 1]
+
+
+def test_unknown_server():
+    with pytest.raises(ValueError):
+        make_pool().get_client("pricing")
+
+
+def test_tools_spread_calls_over_sessions():
+    pool = make_pool(sessions=2)
+    tools = pool.get_tools("docs")
+    assert pool.get_tools("docs") is tools
+    assert isinstance(tools[0], PooledMCPTool) and tools[0].tool_name == "search"
+
+    results = [call(tools[0], f"t{i}") for i in range(4)]
+    sessions = pool._servers["docs"]
+    assert {result["content"][0]["text"] for result in results} == {
+        f"search on {id(sessions[0])}", f"search on {id(sessions[1])}"
+    }
+    assert results[2]["toolUseId"] == "t2"
+
+
+def test_dead_session_is_skipped_and_restarted():
+    pool = make_pool(sessions=2)
+    first, second = pool.get_client("docs"), pool.get_client("docs")
+    first.running = False
+
+    # The live session serves while the dead one restarts in the background
+    assert pool.get_client("docs") is second
+    deadline = time.monotonic() + 2
+    while not first.alive:
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+    assert first.restarts == 1 and first.spawns == 2
+
+
+def test_caller_waits_when_every_session_is_dead():
+    pool = make_pool(sessions=1)
+    client = pool.get_client("docs")
+    client.running = False
+
+    assert pool.get_client("docs") is client
+    assert client.alive and client.restarts == 1
+
+
+def test_tool_keeps_working_after_restart():
+    pool = make_pool(sessions=1)
+    tool = pool.get_tools("docs")[0]
+    pool._servers["docs"][0].running = False
+
+    assert call(tool)["status"] == "success"
+    assert pool._servers["docs"][0].restarts == 1
+
+
+def test_shutdown_stops_sessions_and_monitor():
+    pool = make_pool(sessions=2)
+    clients = [pool.get_client("docs"), pool.get_client("docs")]
+    pool.start_health_monitor(interval=0.01)
+    pool.shutdown()
+
+    assert not any(client.alive for client in clients)
+    pool._monitor.join(1)
+    assert not pool._monitor.is_alive()
+    with pytest.raises(RuntimeError):
+        pool.get_client("docs")
+    # Health checks after shutdown do not respawn anything
+    pool.check_health()
+    assert not any(client.alive for client in clients)
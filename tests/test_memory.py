@@ -0,0 +1,66 @@
+"""Test bounded ConversationMemory (drop and summarize strategies)"""
+
+import sys
+import os
+
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.agents.memory import ConversationMemory, estimate_tokens
+
+
+def test_drop_caps_turns():
+    memory = ConversationMemory(max_turns=3, strategy="drop")
+    for i in range(5):
+        memory.add(f"q{i}", f"a{i}")
+
+    assert [turn["message"] for turn in memory] == ["q2", "q3", "q4"]
+    assert memory.get_stats()["dropped_turns"] == 2
+
+
+def test_drop_caps_tokens():
+    memory = ConversationMemory(max_turns=None, max_tokens=30, strategy="drop")
+    for i in range(10):
+        memory.add(f"q{i}", "x" * 40)
+
+    stats = memory.get_stats()
+    assert stats["tokens"] <= 30
+    assert memory[-1]["message"] == "q9"
+
+
+def test_drop_keeps_newest_turn_over_token_cap():
+    memory = ConversationMemory(max_turns=5, max_tokens=100, strategy="drop")
+    memory.add("hi", "x" * 1000)
+
+    assert len(memory) == 1
+    assert memory[0]["message"] == "hi"
+
+
+def test_summarize_folds_old_turns():
+    memory = ConversationMemory(max_turns=4, strategy="summarize")
+    for i in range(10):
+        memory.add(f"q{i}", f"a{i}")
+
+    assert len(memory) <= 4
+    assert memory[0].get("summary")
+    assert memory[-1]["message"] == "q9"
+    assert memory.get_stats()["summaries"] >= 1
+
+
+def test_summarize_keeps_newest_turn_over_token_cap():
+    memory = ConversationMemory(max_turns=5, max_tokens=100, strategy="summarize")
+    memory.add("first", "short")
+    memory.add("hi", "x" * 1000)
+
+    assert memory[-1]["message"] == "hi"
+
+
+def test_unknown_strategy():
+    with pytest.raises(ValueError):
+        ConversationMemory(strategy="forget")
+
+
+def test_estimate_tokens():
+    assert estimate_tokens("") == 0
+    assert estimate_tokens("abc") == 1
+    assert estimate_tokens("x" * 400) == 100
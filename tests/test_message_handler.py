@@ -0,0 +1,109 @@
+"""Test lane selection of the message handler"""
+
+import sys
+import os
+import asyncio
+import threading
+from types import SimpleNamespace
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from agent_chatbot_orchestrator.response_cache import ResponseCache
+from agent_chatbot_orchestrator.sessions import AgentSessionManager
+from agent_chatbot_orchestrator.single_flight import SingleFlight
+from src.agents.base_agent import BaseAgent
+from src.agents.chatbot_agent import ChatbotAgent
+from src.core.state_store import InMemoryStateStore
+from src.core.message_handler import MessageHandler
+from src.core.strands_manager import PRIORITY_HIGH, PRIORITY_NORMAL, StrandsManager
+
+
+class CachedAgent(BaseAgent):
+    """Agent with a set of prompts it answers without a model call"""
+
+    def __init__(self, cached=()):
+        super().__init__("cached")
+        self.cached = set(cached)
+        self.contexts = []
+        self.threads = []
+
+    def is_cheap(self, message, context=None):
+        self.contexts.append(context)
+        self.threads.append(threading.current_thread())
+        return message in self.cached
+
+    async def process_message(self, message, context=None):
+        return message
+
+
+def make_handler(agent):
+    manager = StrandsManager(max_active=2, timeout=5, max_queue=10, queue_timeout=5, reserved_slots=1)
+    manager.register_agent(agent)
+    return MessageHandler(manager)
+
+
+def test_short_messages_use_the_normal_lane():
+    handler = make_handler(CachedAgent())
+
+    assert asyncio.run(handler.priority("hi", "u1")) == PRIORITY_NORMAL
+    long_question = "Thiết kế kiến trúc multi-region cho toàn bộ hệ thống?"
+    assert asyncio.run(handler.priority(long_question, "u1")) == PRIORITY_NORMAL
+
+
+def test_cheap_requests_use_the_priority_lane():
+    agent = CachedAgent(cached=["s3 là gì?"])
+    handler = make_handler(agent)
+
+    assert asyncio.run(handler.priority("s3 là gì?", "u1")) == PRIORITY_HIGH
+    assert agent.contexts[-1]["user_id"] == "u1"
+
+
+def test_cheapness_is_checked_off_the_event_loop():
+    agent = CachedAgent()
+    handler = make_handler(agent)
+
+    async def run():
+        await handler.check_admission("hi", "u1")
+        return threading.current_thread()
+
+    loop_thread = asyncio.run(run())
+    assert agent.threads and agent.threads[-1] is not loop_thread
+
+
+def test_explicit_priority_is_used():
+    handler = make_handler(CachedAgent())
+
+    async def run():
+        answer = await handler.handle_message("ping", "health", priority=PRIORITY_HIGH)
+        events = [event async for event in handler.stream_message("ping", "health", priority=PRIORITY_HIGH)]
+        return answer, events
+
+    answer, events = asyncio.run(run())
+    assert answer == "ping"
+    assert events[-1] == {"type": "done", "response": "ping"}
+    assert handler.strands_manager.get_metrics()["admitted_priority"] == 2
+
+
+def test_chatbot_first_turn_cache_hit_is_cheap(monkeypatch):
+    cache = ResponseCache(max_entries=10, ttls={}, default_ttl=60, enabled=True)
+    cache.put("orchestrator", "S3 là gì?", "Object storage")
+    sessions = AgentSessionManager(lambda: SimpleNamespace(agent=SimpleNamespace(messages=[])), 10, 60)
+    orchestrator = SimpleNamespace(response_cache=cache, single_flight=SingleFlight(), orchestrator_sessions=sessions)
+    monkeypatch.setitem(sys.modules, "agent_chatbot_orchestrator.orchestrator_agent", orchestrator)
+    store = InMemoryStateStore()
+    chatbot = ChatbotAgent("chatbot", state_store=store)
+
+    assert chatbot.is_cheap("s3 la gi", {"user_id": "u1"})
+    assert not chatbot.is_cheap("EC2 là gì?", {"user_id": "u1"})
+
+    # Later turns depend on the conversation: never cheap
+    sessions.get("u2").agent.messages.append({"role": "user", "content": "hi"})
+    assert not chatbot.is_cheap("S3 là gì?", {"user_id": "u2"})
+    store.save("u3", {"messages": [{"role": "user", "content": "hi"}]}, None)
+    assert not chatbot.is_cheap("S3 là gì?", {"user_id": "u3"})
+
+
+def test_chatbot_without_orchestrator_is_not_cheap(monkeypatch):
+    monkeypatch.delitem(sys.modules, "agent_chatbot_orchestrator.orchestrator_agent", raising=False)
+    chatbot = ChatbotAgent("chatbot", state_store=InMemoryStateStore())
+
+    assert not chatbot.is_cheap("S3 là gì?", {"user_id": "u1"})
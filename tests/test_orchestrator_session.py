@@ -0,0 +1,217 @@
+"""Test the session orchestrator outside of the orchestrator LLM (direct routes, fan-out)"""
+
+import sys
+import os
+import asyncio
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import config
+from agent_chatbot_orchestrator import orchestrator_agent
+from agent_chatbot_orchestrator.orchestrator_agent import OrchestratorSession
+from agent_chatbot_orchestrator.response_cache import ResponseCache
+from agent_chatbot_orchestrator.single_flight import SingleFlight
+
+
+class FakeSpecialist:
+    """Sub-agent answering with its name (or raising `error`)"""
+
+    def __init__(self, name, error=None):
+        self.name = name
+        self.error = error
+        self.messages = []
+
+    def __call__(self, user_input):
+        if self.error is not None:
+            raise self.error
+        self.messages += [{"role": "user", "content": [{"text": user_input}]},
+                          {"role": "assistant", "content": [{"text": self.name}]}]
+        return f"{self.name} answer"
+
+    async def invoke_async(self, user_input):
+        return self(user_input)
+
+
+def make_session(route=None) -> OrchestratorSession:
+    """OrchestratorSession without models: fake specialists and a fixed pre-router decision"""
+    session = OrchestratorSession.__new__(OrchestratorSession)
+    session.specialists = {name: FakeSpecialist(name) for name in ("account", "architect", "docs")}
+    session.agent = SimpleNamespace(messages=[])
+    session.use_router = True
+    session.last_route = None
+    session.state_version = None
+    session.route = lambda user_input: route
+    return session
+
+
+class FakeOrchestratorAgent:
+    """Orchestrator LLM stand-in: calls the given tools (name, status), then answers"""
+
+    def __init__(self, tools=()):
+        self.tools = tools
+        self.messages = []
+
+    def __call__(self, user_input):
+        uses = [{"toolUse": {"toolUseId": name, "name": name, "input": {"user_input": user_input}}}
+                for name, _ in self.tools]
+        results = [{"toolResult": {"toolUseId": name, "status": status, "content": [{"text": name}]}}
+                   for name, status in self.tools]
+        self.messages += [{"role": "user", "content": [{"text": user_input}]}]
+        if uses:
+            self.messages += [{"role": "assistant", "content": uses}, {"role": "user", "content": results}]
+        self.messages += [{"role": "assistant", "content": [{"text": "final"}]}]
+        return "final"
+
+
+@pytest.fixture(autouse=True)
+def cache(monkeypatch):
+    cache = ResponseCache(
+        max_entries=10, ttls={"account": 60, "architect": 30, "docs": 3600, "orchestrator": 600},
+        default_ttl=60, enabled=True
+    )
+    monkeypatch.setattr(orchestrator_agent, "response_cache", cache)
+    return cache
+
+
+def test_fan_out_from_a_running_event_loop():
+    session = make_session({"specialists": ["architect", "docs"]})
+
+    async def handler():
+        # Synchronous call from code that already runs an event loop (FastAPI, Jupyter)
+        return session("serverless và S3")
+
+    answer = asyncio.run(handler())
+    assert "architect answer" in answer and "docs answer" in answer
+    assert [m["content"][0]["text"] for m in session.agent.messages] == ["serverless và S3", answer]
+
+
+def test_fan_out_from_plain_code():
+    session = make_session({"specialists": ["architect", "docs"]})
+
+    assert "docs answer" in session("serverless và S3")
+
+
+def cached_ttl(cache, prompt):
+    entry = cache._entries.get(("orchestrator", prompt))
+    return None if entry is None else round(entry["expires_at"] - time.monotonic())
+
+
+def test_cached_with_the_shortest_specialist_ttl(cache):
+    make_session({"specialists": ["docs"]})("what is s3")
+    make_session({"specialists": ["architect", "docs"]})("serverless s3")
+
+    assert cached_ttl(cache, "what is s3") == 600
+    assert cached_ttl(cache, "serverless s3") == 30
+
+
+def test_account_answers_are_not_cached_by_the_orchestrator(cache):
+    make_session({"specialists": ["account"]})("my buckets")
+    make_session({"specialists": ["account", "docs"]})("my buckets and s3 docs")
+
+    assert not cache.contains("orchestrator", "my buckets")
+    assert not cache.contains("orchestrator", "my buckets and s3 docs")
+
+
+def test_failed_fan_out_branch_is_not_cached(cache):
+    session = make_session({"specialists": ["architect", "docs"]})
+    session.specialists["docs"] = FakeSpecialist("docs", error=RuntimeError("throttled"))
+
+    answer = session("serverless s3")
+    assert "throttled" in answer
+    assert not cache.contains("orchestrator", "serverless s3")
+
+
+@pytest.mark.parametrize("tools, ttl", [
+    ((), 600),
+    ((("get_architect_agent", "success"),), 30),
+    ((("get_account_agent", "success"),), None),
+    ((("get_docs_agent", "error"),), None),
+    ((("ask_specialists", "success"),), None),
+])
+def test_orchestrator_llm_turn_cached_by_tool_calls(cache, tools, ttl):
+    session = make_session()
+    session.agent = FakeOrchestratorAgent(tools)
+
+    assert session("what is s3") == "final"
+    assert cached_ttl(cache, "what is s3") == ttl
+
+
+class GatedSpecialist(FakeSpecialist):
+    """Specialist whose async answer waits for `gate`"""
+
+    def __init__(self, name, gate):
+        super().__init__(name)
+        self.gate = gate
+
+    async def invoke_async(self, user_input):
+        while not self.gate.is_set():
+            await asyncio.sleep(0.005)
+        return self(user_input)
+
+
+@pytest.fixture
+def flights(monkeypatch):
+    """Fresh single-flight; shared turns run on sessions built here (list `built`)"""
+    monkeypatch.setattr(config, "SINGLE_FLIGHT_ENABLED", True)
+    monkeypatch.setattr(orchestrator_agent, "single_flight", SingleFlight())
+    gate = threading.Event()
+    built = []
+
+    def build(use_router):
+        session = make_session({"specialists": ["architect", "docs"]})
+        session.specialists = {name: GatedSpecialist(name, gate) for name in ("architect", "docs")}
+        built.append(session)
+        return session
+
+    monkeypatch.setattr(orchestrator_agent, "OrchestratorSession", build)
+    return SimpleNamespace(gate=gate, built=built)
+
+
+async def collect(session, prompt):
+    return [event async for event in session.stream_async(prompt)]
+
+
+def history(session):
+    return [m["content"][0]["text"] for m in session.agent.messages]
+
+
+def test_shared_first_turn_runs_on_a_session_of_its_own(flights):
+    leader, follower = make_session(), make_session()
+
+    async def run():
+        first = asyncio.ensure_future(collect(leader, "serverless s3"))
+        await asyncio.sleep(0.05)
+        second = asyncio.ensure_future(collect(follower, "serverless s3"))
+        await asyncio.sleep(0.01)
+        flights.gate.set()
+        return await asyncio.gather(first, second)
+
+    first, second = asyncio.run(run())
+    assert first == second
+    assert len(flights.built) == 1
+    answer = first[-1]["content"]
+    assert history(leader) == history(follower) == ["serverless s3", answer]
+    assert leader.last_route == {"specialists": ["architect", "docs"]}
+    # The leader's own specialists were not used
+    assert all(not specialist.messages for specialist in leader.specialists.values())
+
+
+def test_leader_disconnect_leaves_its_session_untouched(flights):
+    leader, follower = make_session(), make_session()
+
+    async def run():
+        events = leader.stream_async("serverless s3")
+        await events.__anext__()
+        second = asyncio.ensure_future(collect(follower, "serverless s3"))
+        await asyncio.sleep(0.01)
+        await events.aclose()
+        flights.gate.set()
+        return await second
+
+    answer = asyncio.run(run())[-1]["content"]
+    assert history(leader) == []
+    assert history(follower) == ["serverless s3", answer]
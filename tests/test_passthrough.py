@@ -0,0 +1,81 @@
+"""Test returning specialist output as the orchestrator's final answer"""
+
+import sys
+import os
+from types import SimpleNamespace
+
+import pytest
+from strands.hooks import AfterToolsEvent, HookRegistry
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from agent_chatbot_orchestrator import passthrough
+from agent_chatbot_orchestrator.passthrough import PassthroughHook, get_passthrough_stats, record_saved
+
+SPECIALISTS = ["get_account_agent", "get_architect_agent", "get_docs_agent"]
+
+
+@pytest.fixture(autouse=True)
+def stats(monkeypatch):
+    monkeypatch.setattr(passthrough, "_stats", dict.fromkeys(passthrough._stats, 0))
+
+
+def tool_batch(*calls):
+    """Orchestrator agent whose last message requested `calls`, and the tool result message"""
+    uses = [{"toolUse": {"toolUseId": f"t{i}", "name": name, "input": {}}} for i, (name, _, _) in enumerate(calls)]
+    results = [
+        {"toolResult": {"toolUseId": f"t{i}", "status": status, "content": [{"text": text}]}}
+        for i, (_, status, text) in enumerate(calls)
+    ]
+    agent = SimpleNamespace(messages=[
+        {"role": "user", "content": [{"text": "S3 là gì?"}]},
+        {"role": "assistant", "content": [{"text": "Hỏi docs"}] + uses},
+    ])
+    return AfterToolsEvent(agent=agent, message={"role": "user", "content": results}, invocation_state={})
+
+
+def test_single_specialist_result_ends_the_turn():
+    registry = HookRegistry()
+    registry.add_hook(PassthroughHook(SPECIALISTS))
+    event = tool_batch(("get_docs_agent", "success", "S3 là object storage"))
+
+    registry.invoke_callbacks(event)
+
+    assert event.end_turn == "S3 là object storage"
+    stats = get_passthrough_stats()
+    assert stats["passthrough_turns"] == 1
+    assert stats["output_tokens_saved"] > 0
+
+
+def test_several_specialist_results_are_joined():
+    event = tool_batch(("get_docs_agent", "success", "docs"), ("get_architect_agent", "success", "architect"))
+
+    PassthroughHook(SPECIALISTS).on_after_tools(event)
+
+    assert event.end_turn == "docs\n\narchitect"
+
+
+def test_failed_tool_lets_the_model_continue():
+    event = tool_batch(("get_docs_agent", "success", "docs"), ("get_account_agent", "error", "AccessDenied"))
+
+    PassthroughHook(SPECIALISTS).on_after_tools(event)
+
+    assert event.end_turn is False
+    stats = get_passthrough_stats()
+    assert stats["skipped_errors"] == 1 and stats["passthrough_turns"] == 0
+
+
+def test_other_tool_lets_the_model_continue():
+    event = tool_batch(("get_docs_agent", "success", "docs"), ("calculator", "success", "42"))
+
+    PassthroughHook(SPECIALISTS).on_after_tools(event)
+
+    assert event.end_turn is False
+    assert get_passthrough_stats()["output_tokens_saved"] == 0
+
+
+def test_direct_routes_are_counted_separately():
+    record_saved("x" * 40, direct_route=True)
+
+    stats = get_passthrough_stats()
+    assert stats["direct_routes"] == 1 and stats["passthrough_turns"] == 0
+    assert stats["output_tokens_saved"] == 10
@@ -0,0 +1,120 @@
+"""Test the adaptive Bedrock rate limiter"""
+
+import sys
+import os
+import threading
+import time
+
+import pytest
+from botocore.exceptions import ClientError
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import config
+from bedrock.rate_limit import (
+    AdaptiveRateLimiter, RateLimitTimeout, BATCH, INTERACTIVE,
+    backoff_delay, is_retryable_error, is_throttling_error
+)
+
+
+def client_error(code: str) -> ClientError:
+    return ClientError({"Error": {"Code": code, "Message": code}}, "InvokeModel")
+
+
+@pytest.fixture(autouse=True)
+def fast_backoff(monkeypatch):
+    monkeypatch.setattr(config, "RATE_LIMIT_BASE_BACKOFF", 0.0)
+    monkeypatch.setattr(config, "RATE_LIMIT_COOLDOWN", 0.0)
+
+
+def test_error_classification():
+    assert is_throttling_error(client_error("ThrottlingException"))
+    assert is_retryable_error(client_error("ServiceUnavailableException"))
+    assert not is_retryable_error(client_error("ValidationException"))
+    assert not is_retryable_error(ValueError("bad input"))
+
+
+def test_backoff_delay_is_capped():
+    for attempt in range(10):
+        assert 0 <= backoff_delay(attempt, 1.0, 5.0) <= 5.0
+
+
+def test_throttle_halves_rate_and_success_raises_it():
+    limiter = AdaptiveRateLimiter("model", max_rate=10, min_rate=1, burst=5, increase=1)
+    limiter.on_throttle()
+    assert limiter.rate == 5
+    limiter.on_throttle()
+    limiter.on_throttle()
+    limiter.on_throttle()
+    assert limiter.rate == 1
+    limiter.on_success()
+    assert limiter.rate == 2
+
+
+def test_acquire_times_out_when_bucket_is_empty():
+    limiter = AdaptiveRateLimiter("model", max_rate=0.1, min_rate=0.1, burst=1)
+    limiter.acquire(timeout=1)
+    with pytest.raises(RateLimitTimeout):
+        limiter.acquire(timeout=0.1)
+    assert limiter.get_stats()["timeouts"] == 1
+
+
+def test_batch_waits_for_interactive():
+    limiter = AdaptiveRateLimiter("model", max_rate=20, min_rate=20, burst=1)
+    limiter.acquire()
+    order = []
+
+    def take(priority):
+        limiter.acquire(priority, timeout=5)
+        order.append(priority)
+
+    batch = threading.Thread(target=take, args=(BATCH,))
+    batch.start()
+    time.sleep(0.01)
+    interactive = threading.Thread(target=take, args=(INTERACTIVE,))
+    interactive.start()
+    batch.join()
+    interactive.join()
+
+    assert order == [INTERACTIVE, BATCH]
+
+
+def test_call_retries_transient_errors():
+    limiter = AdaptiveRateLimiter("model", max_rate=100, burst=100)
+    calls = []
+
+    def flaky():
+        calls.append(1)
+        if len(calls) < 3:
+            raise client_error("ThrottlingException")
+        return "ok"
+
+    assert limiter.call(flaky, max_retries=4) == "ok"
+    assert len(calls) == 3
+    assert limiter.get_stats()["retries"] == 2
+
+
+def test_call_without_retries():
+    limiter = AdaptiveRateLimiter("model", max_rate=100, burst=100)
+    calls = []
+
+    def throttled():
+        calls.append(1)
+        raise client_error("ThrottlingException")
+
+    with pytest.raises(ClientError):
+        limiter.call(throttled, max_retries=0)
+    assert len(calls) == 1
+    assert limiter.get_stats()["throttled"] == 1
+
+
+def test_call_does_not_retry_client_errors():
+    limiter = AdaptiveRateLimiter("model", max_rate=100, burst=100)
+    calls = []
+
+    def invalid():
+        calls.append(1)
+        raise client_error("ValidationException")
+
+    with pytest.raises(ClientError):
+        limiter.call(invalid, max_retries=4)
+    assert len(calls) == 1
@@ -0,0 +1,151 @@
+"""Test latency/health-based routing of Bedrock Runtime requests across regions"""
+
+import sys
+import os
+import time
+
+import pytest
+from botocore.config import Config as BotocoreConfig
+from botocore.exceptions import ClientError, EndpointConnectionError
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import config
+from bedrock.session import RegionRouter
+
+
+class FakeRegionClient:
+    """bedrock-runtime stub of one region"""
+
+    def __init__(self, region, error=None, tokens=100, delay=0.0):
+        self.region = region
+        self.error = error
+        self.tokens = tokens
+        self.delay = delay
+        self.calls = 0
+
+    def invoke_model(self, **kwargs):
+        self.calls += 1
+        time.sleep(self.delay)
+        if self.error is not None:
+            raise self.error
+        return {
+            "region": self.region,
+            "ResponseMetadata": {"HTTPHeaders": {"x-amzn-bedrock-output-token-count": str(self.tokens)}}
+        }
+
+    def invoke_model_with_response_stream(self, **kwargs):
+        return self.invoke_model(**kwargs)
+
+
+class FakeSession:
+    def __init__(self, clients):
+        self.clients = clients
+
+    def client(self, service, region_name, config):
+        return self.clients[region_name]
+
+
+def client_error(code):
+    return ClientError({"Error": {"Code": code, "Message": code}}, "InvokeModel")
+
+
+def make_router(clients):
+    return RegionRouter(FakeSession(clients), list(clients), BotocoreConfig())
+
+
+@pytest.fixture(autouse=True)
+def router_config(monkeypatch):
+    monkeypatch.setattr(config, "BEDROCK_REGION_WINDOW", 100)
+    monkeypatch.setattr(config, "BEDROCK_REGION_COOLDOWN", 10.0)
+
+
+def test_failing_region_drops_in_ranking():
+    clients = {
+        "us-east-1": FakeRegionClient("us-east-1", error=client_error("ServiceUnavailableException")),
+        "us-west-2": FakeRegionClient("us-west-2"),
+    }
+    router = make_router(clients)
+
+    for _ in range(20):
+        assert router.invoke("invoke_model")["region"] == "us-west-2"
+
+    # Cooldown after the first failure: the broken region is not tried again
+    assert clients["us-east-1"].calls == 1
+    assert router.ranked_regions()[0] == "us-west-2"
+    assert router.get_stats()["us-east-1"]["cooling_down"]
+
+
+def test_failing_region_ranks_last_after_cooldown():
+    clients = {
+        "us-east-1": FakeRegionClient("us-east-1", error=EndpointConnectionError(endpoint_url="https://x")),
+        "us-west-2": FakeRegionClient("us-west-2"),
+    }
+    router = make_router(clients)
+    router.invoke("invoke_model")
+    router._stats["us-east-1"].cooldown_until = 0.0
+
+    assert router.ranked_regions() == ["us-west-2", "us-east-1"]
+
+
+def test_non_retryable_error_is_raised():
+    clients = {
+        "us-east-1": FakeRegionClient("us-east-1", error=client_error("ValidationException")),
+        "us-west-2": FakeRegionClient("us-west-2"),
+    }
+    router = make_router(clients)
+
+    with pytest.raises(ClientError):
+        router.invoke("invoke_model")
+    assert clients["us-west-2"].calls == 0
+
+
+def test_every_region_failing_raises_last_error():
+    clients = {
+        "us-east-1": FakeRegionClient("us-east-1", error=client_error("ThrottlingException")),
+        "us-west-2": FakeRegionClient("us-west-2", error=client_error("ThrottlingException")),
+    }
+    router = make_router(clients)
+
+    with pytest.raises(ClientError):
+        router.invoke("invoke_model")
+    assert router.get_stats()["us-west-2"]["throttles"] == 1
+
+
+def test_invoke_latency_is_normalized_by_output_tokens():
+    clients = {"us-east-1": FakeRegionClient("us-east-1", tokens=100, delay=0.05)}
+    router = make_router(clients)
+    router.invoke("invoke_model")
+
+    stats = router._stats["us-east-1"]
+    assert not stats.latencies
+    assert 0.0005 <= stats.token_latencies[0] < 0.005
+
+
+def test_long_answers_do_not_make_a_region_look_slow():
+    router = make_router({"us-east-1": FakeRegionClient("us-east-1"), "us-west-2": FakeRegionClient("us-west-2")})
+    for _ in range(5):
+        # us-east-1: 5s for 1000 tokens, us-west-2: 1s for 100 tokens
+        router._record("us-east-1", 5.0 / 1000, ok=True, per_token=True)
+        router._record("us-west-2", 1.0 / 100, ok=True, per_token=True)
+
+    assert router.ranked_regions()[0] == "us-east-1"
+
+
+def test_streaming_latency_is_time_to_first_byte():
+    clients = {"us-east-1": FakeRegionClient("us-east-1", delay=0.02)}
+    router = make_router(clients)
+    router.invoke("invoke_model_with_response_stream")
+
+    stats = router._stats["us-east-1"]
+    assert not stats.token_latencies
+    assert stats.latencies[0] >= 0.02
+
+
+def test_ranking_by_p95():
+    router = make_router({"us-east-1": FakeRegionClient("us-east-1"), "us-west-2": FakeRegionClient("us-west-2")})
+    for _ in range(5):
+        router._record("us-east-1", 0.3, ok=True)
+        router._record("us-west-2", 0.1, ok=True)
+
+    assert router.ranked_regions()[0] == "us-west-2"
+    assert router.get_stats()["us-east-1"]["score"] > router.get_stats()["us-west-2"]["score"]
@@ -0,0 +1,175 @@
+"""Test the exact-match Claude request cache (memory LRU + SQLite)"""
+
+import sys
+import os
+import io
+import json
+
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import config
+from bedrock.cache import RequestCache, make_cache_key
+from bedrock.claude import ClaudeClient
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "cache" / "claude.sqlite3")
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("bedrock.cache.time.time", lambda: now[0])
+    return now
+
+
+def make_cache(db_path, **kwargs):
+    options = {"memory_entries": 10, "max_entries": 100, "max_bytes": 10_000, "ttl_seconds": 0, "max_temperature": 0.2}
+    options.update(kwargs)
+    return RequestCache(db_path, **options)
+
+
+def body(text="hi", **kwargs):
+    request = {"messages": [{"role": "user", "content": text}], "max_tokens": 100, "temperature": 0.0}
+    request.update(kwargs)
+    return request
+
+
+def test_key_covers_what_determines_the_output():
+    key = make_cache_key("model-a", body())
+
+    assert make_cache_key("model-a", dict(reversed(list(body().items())))) == key
+    assert make_cache_key("model-a", body(anthropic_version="bedrock-2023-05-31")) == key
+    assert make_cache_key("model-b", body()) != key
+    assert make_cache_key("model-a", body("hello")) != key
+    assert make_cache_key("model-a", body(max_tokens=200)) != key
+    assert make_cache_key("model-a", body(system="You are terse")) != key
+
+
+def test_only_low_temperature_requests_are_cacheable(db_path):
+    cache = make_cache(db_path)
+
+    assert cache.cacheable(body(temperature=0.2))
+    assert cache.cacheable({"messages": []})
+    assert not cache.cacheable(body(temperature=0.7))
+
+
+def test_memory_then_disk_hit(db_path):
+    cache = make_cache(db_path)
+    cache.put("k", "answer", "model-a")
+    assert cache.get("k") == "answer"
+
+    cache._memory.clear()
+    assert cache.get("k") == "answer"
+    assert cache.get("missing") is None
+    stats = cache.get_stats()
+    assert (stats["memory_hits"], stats["disk_hits"], stats["misses"]) == (1, 1, 1)
+
+
+def test_persists_across_instances(db_path):
+    first = make_cache(db_path)
+    first.put("k", "answer")
+    first.close()
+
+    second = make_cache(db_path)
+    assert second.get("k") == "answer"
+    assert second.get_stats()["disk_hits"] == 1
+
+
+def test_ttl_expiry(db_path, clock):
+    cache = make_cache(db_path, ttl_seconds=60)
+    cache.put("k", "answer")
+
+    clock[0] += 30
+    assert cache.get("k") == "answer"
+    clock[0] += 31
+    assert cache.get("k") is None
+    stats = cache.get_stats()
+    assert stats["expired"] == 1 and stats["disk_entries"] == 0
+
+
+def test_zero_ttl_never_expires(db_path, clock):
+    cache = make_cache(db_path, ttl_seconds=0)
+    cache.put("k", "answer")
+
+    clock[0] += 10 ** 9
+    assert cache.get("k") == "answer"
+
+
+def test_memory_tier_is_lru(db_path):
+    cache = make_cache(db_path, memory_entries=2)
+    cache.put("a", "1")
+    cache.put("b", "2")
+    cache.get("a")
+    cache.put("c", "3")
+
+    assert list(cache._memory) == ["a", "c"]
+    assert cache.get_stats()["memory_evictions"] == 1
+    # Evicted from memory only: still served from disk
+    assert cache.get("b") == "2"
+
+
+def test_disk_evicts_least_recently_used_rows(db_path, clock):
+    cache = make_cache(db_path, max_entries=2)
+    for key in ("a", "b"):
+        clock[0] += 1
+        cache.put(key, key)
+    clock[0] += 1
+    cache._memory.clear()
+    cache.get("a")
+    clock[0] += 1
+    cache.put("c", "c")
+
+    cache._memory.clear()
+    assert cache.get("b") is None
+    assert cache.get("a") == "a" and cache.get("c") == "c"
+    assert cache.get_stats()["disk_evictions"] == 1
+
+
+def test_disk_size_limit(db_path, clock):
+    cache = make_cache(db_path, max_bytes=10)
+    cache.put("a", "12345")
+    clock[0] += 1
+    cache.put("b", "123456")
+    cache.put("huge", "x" * 11)
+
+    stats = cache.get_stats()
+    assert stats["disk_entries"] == 1 and stats["disk_bytes"] == 6
+    assert stats["skipped"] == 1
+    assert cache.get("a") is None and cache.get("huge") is None
+
+
+def test_clear(db_path):
+    cache = make_cache(db_path)
+    cache.put("k", "answer")
+    cache.clear()
+
+    assert cache.get("k") is None
+    assert cache.get_stats()["disk_entries"] == 0
+
+
+class FakeRuntime:
+    def __init__(self):
+        self.calls = 0
+
+    def invoke_model(self, modelId, body, contentType):
+        self.calls += 1
+        return {"body": io.BytesIO(json.dumps({"content": [{"text": f"answer {self.calls}"}]}).encode())}
+
+
+def test_chat_is_served_from_cache(db_path, monkeypatch):
+    monkeypatch.setattr(config, "RATE_LIMIT_ENABLED", False)
+    client = ClaudeClient.__new__(ClaudeClient)
+    client.aws_session = None
+    client.bedrock_runtime = FakeRuntime()
+    client.region_router = None
+    client.default_model = "test-model"
+    client.cache = make_cache(db_path)
+    client.prompt_cache = False
+
+    assert client.chat("hi", temperature=0.0) == "answer 1"
+    assert client.chat("hi", temperature=0.0) == "answer 1"
+    assert client.chat("hi", temperature=0.9) == "answer 2"
+    assert client.bedrock_runtime.calls == 2
@@ -0,0 +1,164 @@
+"""Test the response cache and how specialists use it"""
+
+import sys
+import os
+import asyncio
+
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from agent_chatbot_orchestrator import orchestrator_agent
+from agent_chatbot_orchestrator.lazy import LazyComponent
+from agent_chatbot_orchestrator.response_cache import ResponseCache, normalize_prompt
+
+
+def make_cache(**kwargs):
+    options = {"max_entries": 10, "ttls": {"docs": 60, "account": 0}, "default_ttl": 60, "enabled": True}
+    options.update(kwargs)
+    return ResponseCache(**options)
+
+
+def test_normalize_prompt():
+    assert normalize_prompt("  S3 là gì?? ") == "s3 la gi"
+
+
+def test_exact_hit_after_normalization():
+    cache = make_cache()
+    cache.put("docs", "S3 là gì?", "Object storage")
+
+    assert cache.get("docs", "s3 la gi") == "Object storage"
+    assert cache.get("architect", "S3 là gì?") is None
+    assert cache.get_stats()["by_agent"]["docs"]["hits"] == 1
+
+
+def test_contains_does_not_count_lookups():
+    cache = make_cache()
+    cache.put("docs", "S3 là gì?", "Object storage")
+
+    assert cache.contains("docs", "s3 la gi")
+    assert not cache.contains("docs", "EC2 là gì?")
+    assert not cache.contains("account", "S3 là gì?")
+    assert cache.get_stats()["by_agent"]["docs"]["hits"] == 0
+
+
+def test_zero_ttl_disables_agent():
+    cache = make_cache()
+    cache.put("account", "my buckets", "bucket-a")
+
+    assert cache.get("account", "my buckets") is None
+
+
+def test_expiry(monkeypatch):
+    cache = make_cache()
+    now = [1000.0]
+    monkeypatch.setattr("agent_chatbot_orchestrator.response_cache.time.monotonic", lambda: now[0])
+    cache.put("docs", "what is s3", "Object storage")
+
+    now[0] += 61
+    assert cache.get("docs", "what is s3") is None
+    assert cache.get_stats()["by_agent"]["docs"]["expired"] == 1
+
+
+def test_lru_eviction():
+    cache = make_cache(max_entries=2)
+    cache.put("docs", "a", "1")
+    cache.put("docs", "b", "2")
+    cache.get("docs", "a")
+    cache.put("docs", "c", "3")
+
+    assert cache.get("docs", "b") is None
+    assert cache.get("docs", "a") == "1"
+    assert cache.get("docs", "c") == "3"
+
+
+def test_semantic_hit():
+    vectors = {"what is s3": [1.0, 0.0], "explain s3": [0.99, 0.1], "what is ec2": [0.0, 1.0]}
+    cache = make_cache(embedder=lambda text: vectors[text], similarity_threshold=0.9)
+    cache.put("docs", "what is s3", "Object storage")
+
+    assert cache.get("docs", "explain s3") == "Object storage"
+    assert cache.get("docs", "what is ec2") is None
+    assert cache.get_stats()["by_agent"]["docs"]["semantic_hits"] == 1
+
+
+class FakeAgent:
+    """Sub-agent with its own history that answers with a counter"""
+
+    def __init__(self):
+        self.messages = []
+        self.calls = 0
+
+    def __call__(self, user_input):
+        self.calls += 1
+        self.messages.append({"role": "user", "content": [{"text": user_input}]})
+        answer = f"answer {self.calls}"
+        self.messages.append({"role": "assistant", "content": [{"text": answer}]})
+        return answer
+
+    async def invoke_async(self, user_input):
+        return self(user_input)
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    cache = make_cache()
+    monkeypatch.setattr(orchestrator_agent, "response_cache", cache)
+    return cache
+
+
+def test_specialist_cache_only_for_first_turn(cache):
+    first, second = FakeAgent(), FakeAgent()
+    orchestrator_agent.invoke_agent_cached(first, "docs", "what is s3")
+    follow_up = orchestrator_agent.invoke_agent_cached(first, "docs", "còn region us-west-2 thì sao?")
+
+    # Another session asking the same follow-up must not get the first session's answer
+    other = orchestrator_agent.invoke_agent_cached(second, "docs", "còn region us-west-2 thì sao?")
+    assert follow_up == "answer 2"
+    assert other == "answer 1"
+    assert second.calls == 1
+
+
+def test_specialist_cache_hit_enters_history(cache):
+    cache.put("docs", "what is s3", "Object storage")
+    agent = FakeAgent()
+
+    assert orchestrator_agent.invoke_agent_cached(agent, "docs", "what is s3") == "Object storage"
+    assert agent.calls == 0
+    assert [m["content"][0]["text"] for m in agent.messages] == ["what is s3", "Object storage"]
+
+
+def test_specialist_cache_hit_on_unbuilt_component(cache):
+    cache.put("docs", "what is s3", "Object storage")
+    component = LazyComponent("docs", FakeAgent)
+
+    answer = asyncio.run(orchestrator_agent.invoke_agent_async(component, "what is s3", "docs"))
+    assert answer == "Object storage"
+    assert not component.is_loaded
+    assert len(component.get().messages) == 2
+
+
+def test_pending_cached_turn_counts_as_history(cache):
+    cache.put("docs", "what is s3", "Object storage")
+    # Another session's follow-up answer, cached under the same prompt
+    cache.put("docs", "còn region us-west-2 thì sao?", "other session")
+    component = LazyComponent("docs", FakeAgent)
+
+    asyncio.run(orchestrator_agent.invoke_agent_async(component, "what is s3", "docs"))
+    assert component.has_pending_callbacks
+    follow_up = asyncio.run(orchestrator_agent.invoke_agent_async(component, "còn region us-west-2 thì sao?", "docs"))
+
+    assert follow_up == "answer 1"
+    assert [m["content"][0]["text"] for m in component.get().messages] == [
+        "what is s3", "Object storage", "còn region us-west-2 thì sao?", "answer 1"
+    ]
+    assert not component.has_pending_callbacks
+
+
+def test_put_with_explicit_ttl(monkeypatch):
+    cache = make_cache()
+    now = [1000.0]
+    monkeypatch.setattr("agent_chatbot_orchestrator.response_cache.time.monotonic", lambda: now[0])
+    cache.put("orchestrator", "what is s3", "Object storage", ttl=10)
+
+    now[0] += 11
+    assert cache.get("orchestrator", "what is s3") is None
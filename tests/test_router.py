@@ -0,0 +1,72 @@
+"""Test the deterministic pre-router of the orchestrator"""
+
+import sys
+import os
+
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from agent_chatbot_orchestrator.router import PreRouter, normalize_text
+
+
+@pytest.fixture
+def router():
+    return PreRouter(threshold=0.75)
+
+
+def test_normalize_text():
+    assert normalize_text("Vẽ  Sơ Đồ") == "ve so do"
+
+
+@pytest.mark.parametrize("query, specialists", [
+    ("Account của tôi hiện tại ở region us-east-1 có những resource nào?", ["account"]),
+    ("list my ec2 instances", ["account"]),
+    ("Vẽ sơ đồ kiến trúc serverless với Lambda", ["architect"]),
+    ("Cách cấu hình S3 lifecycle theo hướng dẫn", ["docs"]),
+])
+def test_routes_clear_queries(router, query, specialists):
+    decision = router.route(query)
+    assert decision["source"] == "rules"
+    assert decision["specialists"] == specialists
+
+
+@pytest.mark.parametrize("query", [
+    "list the differences between SQS and SNS",
+    "Liệt kê các loại instance EC2 hỗ trợ GPU",
+    "What is S3?",
+    "design a REST API",
+])
+def test_single_generic_match_falls_back_to_llm(router, query):
+    assert router.route(query)["source"] == "llm"
+
+
+def test_multi_intent_fan_out(router):
+    decision = router.route("List my EC2 instances and draw a diagram of a serverless architecture")
+    assert decision["source"] == "rules"
+    assert sorted(decision["specialists"]) == ["account", "architect"]
+
+
+def test_classifier_used_below_threshold():
+    router = PreRouter(threshold=0.75, classifier=lambda text: (["docs", "unknown"], 0.9))
+    decision = router.route("What is S3?")
+    assert decision["source"] == "classifier"
+    assert decision["specialists"] == ["docs"]
+
+
+def test_classifier_error_falls_back():
+    def failing(text):
+        raise RuntimeError("boom")
+
+    router = PreRouter(threshold=0.75, classifier=failing)
+    assert router.route("What is S3?")["source"] == "llm"
+    assert router.get_stats()["classifier_errors"] == 1
+
+
+def test_stats(router):
+    router.route("list my ec2 instances")
+    router.route("What is S3?")
+    stats = router.get_stats()
+    assert stats["total"] == 2
+    assert stats["hits"] == 1
+    assert stats["hit_rate"] == 0.5
+    assert stats["by_specialist"] == {"account": 1}
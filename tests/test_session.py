@@ -0,0 +1,140 @@
+"""Test AWS session setup (identity cache, validation modes, credential refresh)"""
+
+import sys
+import os
+import gc
+import time
+
+import boto3
+import pytest
+from botocore.credentials import Credentials
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import config
+from bedrock.session import AWSSession, clear_identity_cache
+
+
+class FakeSTS:
+    """STS client counting get_caller_identity calls (or failing with `error`)"""
+
+    def __init__(self):
+        self.calls = 0
+        self.error = None
+
+    def get_caller_identity(self):
+        self.calls += 1
+        if self.error is not None:
+            raise self.error
+        return {"Account": "123456789012", "Arn": "arn:aws:iam::123456789012:user/dev", "UserId": "AID"}
+
+
+@pytest.fixture
+def sts(monkeypatch):
+    sts = FakeSTS()
+    monkeypatch.setattr(boto3.Session, "client", lambda self, name, **kwargs: sts)
+    clear_identity_cache()
+    yield sts
+    clear_identity_cache()
+
+
+def create(access_key="AKIA1", validate="eager") -> AWSSession:
+    aws_session = AWSSession()
+    aws_session.create_session(access_key_id=access_key, secret_access_key="secret", validate=validate)
+    return aws_session
+
+
+def test_identity_is_cached_per_credentials(sts):
+    first = create()
+    second = create()
+    assert sts.calls == 1
+    assert second.get_caller_identity()["Account"] == "123456789012"
+    assert sts.calls == 1
+
+    create("AKIA2")
+    assert sts.calls == 2
+    first.get_caller_identity(refresh=True)
+    assert sts.calls == 3
+
+
+def test_identity_expires_with_temporary_credentials(sts, monkeypatch):
+    monkeypatch.setattr(config, "AWS_IDENTITY_CACHE_TTL", 900)
+    monkeypatch.setattr(AWSSession, "_credentials_expiry", lambda self: time.time() - 1)
+    monkeypatch.setattr(config, "AWS_CREDENTIAL_REFRESH_INTERVAL", 0)
+    aws_session = create()
+
+    aws_session.get_caller_identity()
+    assert sts.calls == 2
+
+
+def test_eager_validation_raises_on_bad_credentials(sts):
+    sts.error = RuntimeError("InvalidClientTokenId")
+
+    with pytest.raises(ValueError, match="InvalidClientTokenId"):
+        create(validate="eager")
+
+
+def test_deferred_validation_runs_in_background(sts):
+    sts.error = RuntimeError("InvalidClientTokenId")
+
+    aws_session = create(validate="deferred")
+    aws_session._validation_thread.join(2)
+
+    assert sts.calls == 1
+    assert "InvalidClientTokenId" in aws_session.validation_error
+
+
+def test_validation_off_skips_sts(sts):
+    create(validate="off")
+
+    assert sts.calls == 0
+
+
+def test_unknown_validation_mode(sts):
+    with pytest.raises(ValueError, match="Unknown validation mode"):
+        create(validate="lazy")
+
+
+@pytest.fixture
+def refreshes(monkeypatch):
+    """Temporary credentials refreshed every 10 ms; counts refreshes"""
+    count = [0]
+    monkeypatch.setattr(config, "AWS_CREDENTIAL_REFRESH_INTERVAL", 0.01)
+    monkeypatch.setattr(AWSSession, "_credentials_expiry", lambda self: time.time() + 3600)
+
+    def get_frozen_credentials(self):
+        count[0] += 1
+
+    monkeypatch.setattr(Credentials, "get_frozen_credentials", get_frozen_credentials)
+    return count
+
+
+def wait_until(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "condition not met in time"
+        time.sleep(0.005)
+
+
+def test_long_lived_keys_need_no_refresh(sts):
+    assert create(validate="off")._refresh_thread is None
+
+
+def test_refresh_thread_stops_on_close(sts, refreshes):
+    aws_session = create(validate="off")
+    thread = aws_session._refresh_thread
+    wait_until(lambda: refreshes[0] >= 2)
+
+    aws_session.close()
+    thread.join(1)
+    assert not thread.is_alive()
+
+
+def test_refresh_thread_stops_when_session_is_discarded(sts, refreshes):
+    aws_session = create(validate="off")
+    thread = aws_session._refresh_thread
+    wait_until(lambda: refreshes[0] >= 1)
+
+    del aws_session
+    gc.collect()
+    thread.join(1)
+    assert not thread.is_alive()
@@ -0,0 +1,97 @@
+"""Test session-scoped agents (LRU/TTL eviction, spare session) and preload hooks"""
+
+import sys
+import os
+import itertools
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from agent_chatbot_orchestrator import lazy
+from agent_chatbot_orchestrator.sessions import AgentSessionManager
+
+
+class Factory:
+    """Builds numbered agents"""
+
+    def __init__(self):
+        self.ids = itertools.count(1)
+
+    def __call__(self):
+        return {"id": next(self.ids)}
+
+
+def test_one_agent_per_session():
+    sessions = AgentSessionManager(Factory(), max_sessions=10, ttl_seconds=60)
+
+    first = sessions.get("a")
+    assert sessions.get("a") is first
+    assert sessions.get("b") is not first
+    assert sessions.get_stats()["active_sessions"] == 2
+
+
+def test_least_recently_used_session_is_evicted():
+    sessions = AgentSessionManager(Factory(), max_sessions=2, ttl_seconds=60)
+    sessions.get("a")
+    sessions.get("b")
+    sessions.get("a")
+    sessions.get("c")
+
+    assert "a" in sessions and "c" in sessions
+    assert "b" not in sessions
+    assert sessions.get_stats()["evicted_lru"] == 1
+
+
+def test_idle_session_expires():
+    sessions = AgentSessionManager(Factory(), max_sessions=10, ttl_seconds=0.02)
+    old = sessions.get("a")
+    time.sleep(0.03)
+
+    assert sessions.get("a") is not old
+    assert sessions.get_stats()["evicted_ttl"] == 1
+
+
+def test_peek_does_not_create_or_refresh():
+    sessions = AgentSessionManager(Factory(), max_sessions=2, ttl_seconds=60)
+    assert sessions.peek("a") is None
+    assert "a" not in sessions
+
+    first = sessions.get("a")
+    sessions.get("b")
+    assert sessions.peek("a") is first
+    # peek did not make "a" recently used: it is the one evicted
+    sessions.get("c")
+    assert "a" not in sessions
+
+
+def test_new_session_takes_the_spare():
+    factory = Factory()
+    sessions = AgentSessionManager(factory, max_sessions=10, ttl_seconds=60)
+    sessions.prewarm(lambda: {"id": "warm"})
+    assert sessions.get_stats()["spare_ready"]
+
+    assert sessions.get("a") == {"id": "warm"}
+    assert not sessions.get_stats()["spare_ready"]
+    assert sessions.get("b") == {"id": 1}
+
+
+def test_prewarm_keeps_the_first_spare():
+    sessions = AgentSessionManager(Factory(), max_sessions=10, ttl_seconds=60)
+    sessions.prewarm()
+    sessions.prewarm()
+
+    assert sessions.get("a") == {"id": 1}
+    assert sessions.get("b") == {"id": 3}
+
+
+def test_preload_hook_runs_once_and_is_reported(monkeypatch):
+    monkeypatch.setattr(lazy, "_components", {})
+    calls = []
+    hook = lazy.preload_hook("warm_sessions", lambda: calls.append(1))
+    component = lazy.lazy_component("model", lambda: "model")
+
+    report = {item["name"]: item for item in lazy.preload(["warm_sessions"])}
+    lazy.preload(["warm_sessions"])
+
+    assert calls == [1]
+    assert hook.is_loaded and report["warm_sessions"]["loaded"]
+    assert not report["model"]["loaded"] and not component.is_loaded
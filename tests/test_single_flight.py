@@ -0,0 +1,165 @@
+"""Test single-flight sharing of identical in-flight requests"""
+
+import sys
+import os
+import asyncio
+import threading
+import time
+from contextlib import aclosing
+
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from agent_chatbot_orchestrator.single_flight import FlightAborted, SingleFlight
+
+
+class Producer:
+    """Event stream factory counting executions; waits for `release` before finishing"""
+
+    def __init__(self, events=("a", "b", "c"), error=None):
+        self.events = events
+        self.error = error
+        self.executions = 0
+        self.cancelled = False
+        self.release = threading.Event()
+
+    async def stream(self):
+        self.executions += 1
+        try:
+            yield self.events[0]
+            while not self.release.is_set():
+                await asyncio.sleep(0.005)
+            for event in self.events[1:]:
+                yield event
+            if self.error is not None:
+                raise self.error
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+
+
+async def collect(events):
+    async with aclosing(events):
+        return [event async for event in events]
+
+
+def wait_until(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "condition not met in time"
+        time.sleep(0.005)
+
+
+def test_identical_requests_share_one_execution():
+    flights = SingleFlight()
+    producer = Producer()
+
+    async def run():
+        leader, is_leader = flights.subscribe("docs", "S3 là gì?", producer.stream)
+        assert flights.in_flight("docs", "s3 la gi")
+        follower, is_follower_leader = flights.subscribe("docs", "s3 la gi", producer.stream)
+        assert is_leader and not is_follower_leader
+        producer.release.set()
+        return await asyncio.gather(collect(leader), collect(follower))
+
+    assert asyncio.run(run()) == [["a", "b", "c"], ["a", "b", "c"]]
+    assert producer.executions == 1
+    stats = flights.get_stats()
+    assert stats["shared"] == 1 and stats["in_flight"] == 0
+
+
+def test_different_agents_do_not_share():
+    flights = SingleFlight()
+    producer = Producer()
+    producer.release.set()
+
+    async def run():
+        first, _ = flights.subscribe("docs", "hello", producer.stream)
+        second, leader = flights.subscribe("pricing", "hello", producer.stream)
+        assert leader
+        return await asyncio.gather(collect(first), collect(second))
+
+    asyncio.run(run())
+    assert producer.executions == 2
+
+
+def test_followers_survive_the_end_of_the_leader_loop():
+    flights = SingleFlight()
+    producer = Producer()
+    follower_events = []
+    joined = threading.Event()
+
+    def leader_run():
+        # Streamlit: the leader's script run ends while its answer is still streaming;
+        # asyncio.run cancels the pending consumer task
+        async def run():
+            events, _ = flights.subscribe("orchestrator", "hello", producer.stream)
+            asyncio.ensure_future(collect(events))
+            await asyncio.to_thread(joined.wait, 2)
+        asyncio.run(run())
+
+    def follower_run():
+        async def run():
+            events, leader = flights.subscribe("orchestrator", "hello", producer.stream)
+            assert not leader
+            joined.set()
+            follower_events.extend(await collect(events))
+        asyncio.run(run())
+
+    leader = threading.Thread(target=leader_run)
+    leader.start()
+    wait_until(lambda: producer.executions == 1)
+    follower = threading.Thread(target=follower_run)
+    follower.start()
+    leader.join(2)
+    producer.release.set()
+    follower.join(2)
+
+    assert follower_events == ["a", "b", "c"]
+    assert not producer.cancelled
+
+
+def test_execution_is_cancelled_when_nobody_listens():
+    flights = SingleFlight()
+    producer = Producer()
+
+    async def run():
+        events, _ = flights.subscribe("docs", "hello", producer.stream)
+        async with aclosing(events):
+            await events.__anext__()
+
+    asyncio.run(run())
+    wait_until(lambda: producer.cancelled)
+    stats = flights.get_stats()
+    assert stats["abandoned"] == 1 and stats["in_flight"] == 0
+
+
+def test_errors_reach_every_subscriber():
+    flights = SingleFlight()
+    producer = Producer(error=ValueError("boom"))
+    producer.release.set()
+
+    async def run():
+        leader, _ = flights.subscribe("docs", "hello", producer.stream)
+        follower, _ = flights.subscribe("docs", "hello", producer.stream)
+        return await asyncio.gather(collect(leader), collect(follower), return_exceptions=True)
+
+    results = asyncio.run(run())
+    assert all(isinstance(result, ValueError) for result in results)
+
+
+def test_cancelled_execution_is_not_a_cancellation_for_followers():
+    flights = SingleFlight()
+    producer = Producer()
+
+    async def run():
+        events, _ = flights.subscribe("docs", "hello", producer.stream)
+        flight = next(iter(flights._flights.values()))
+        async with aclosing(events):
+            await events.__anext__()
+            flight.task.cancel()
+            with pytest.raises(FlightAborted):
+                await events.__anext__()
+
+    asyncio.run(run())
+    assert flights.get_stats()["aborted"] == 1
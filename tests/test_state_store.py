@@ -0,0 +1,115 @@
+"""Test per-user conversation state shared by API workers"""
+
+import sys
+import os
+import time
+from types import SimpleNamespace
+
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.agents.chatbot_agent import ChatbotAgent
+from src.core.state_store import InMemoryStateStore, SQLiteStateStore, create_state_store
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def store(request, tmp_path):
+    if request.param == "memory":
+        return InMemoryStateStore()
+    return SQLiteStateStore(str(tmp_path / "state.sqlite3"))
+
+
+def make_session():
+    """OrchestratorSession stand-in (history + loaded state version)"""
+    return SimpleNamespace(agent=SimpleNamespace(messages=[]), state_version=None)
+
+
+def turn(session, text):
+    session.agent.messages += [{"role": "user", "content": text}, {"role": "assistant", "content": f"re {text}"}]
+
+
+def test_store_assigns_versions(store):
+    first = store.save("u1", {"messages": [1]}, None)
+    second = store.save("u1", {"messages": [1, 2]}, first)
+
+    assert first and second and first != second
+    assert store.get("u1") == {"messages": [1, 2], "version": second}
+
+
+def test_save_is_compare_and_set(store):
+    version = store.save("u1", {"messages": [1]}, None)
+
+    assert store.save("u1", {"messages": [2]}, None) is None
+    assert store.save("u1", {"messages": [2]}, "stale") is None
+    assert store.save("u1", {"messages": [2]}, version) is not None
+
+
+def test_expired_state(store):
+    store.ttl_seconds = 0.01
+    store.save("u1", {"messages": [1]}, None)
+    time.sleep(0.02)
+
+    assert store.get("u1") is None
+    assert store.save("u1", {"messages": [2]}, None) is not None
+
+
+def test_shared_sqlite_file(tmp_path):
+    path = str(tmp_path / "state.sqlite3")
+    version = SQLiteStateStore(path).save("u1", {"messages": [1]}, None)
+
+    assert SQLiteStateStore(path).get("u1")["version"] == version
+
+
+def test_unknown_backend():
+    with pytest.raises(ValueError):
+        create_state_store({"backend": "nope"})
+
+
+def test_rebuilt_session_reloads_history(store):
+    chatbot = ChatbotAgent("chatbot", state_store=store)
+    session = make_session()
+    start = chatbot._load_state("u1", session)
+    turn(session, "a")
+    chatbot._save_state("u1", session, start)
+
+    # Session evicted from the cache (LRU/TTL) and rebuilt empty
+    rebuilt = make_session()
+    start = chatbot._load_state("u1", rebuilt)
+    assert start == 2
+    turn(rebuilt, "b")
+    chatbot._save_state("u1", rebuilt, start)
+
+    assert [m["content"] for m in store.get("u1")["messages"]] == ["a", "re a", "b", "re b"]
+
+
+def test_concurrent_workers_do_not_overwrite_each_other(store):
+    # Two workers with their own sessions of the same user
+    worker_a, worker_b = ChatbotAgent("a", state_store=store), ChatbotAgent("b", state_store=store)
+    session_a, session_b = make_session(), make_session()
+    start_a = worker_a._load_state("u1", session_a)
+    start_b = worker_b._load_state("u1", session_b)
+    turn(session_a, "a")
+    turn(session_b, "b")
+
+    worker_a._save_state("u1", session_a, start_a)
+    worker_b._save_state("u1", session_b, start_b)
+
+    stored = store.get("u1")
+    assert [m["content"] for m in stored["messages"]] == ["a", "re a", "b", "re b"]
+    assert session_b.state_version == stored["version"]
+    assert session_b.agent.messages == stored["messages"]
+
+    # Worker A sees B's turn on its next load
+    worker_a._load_state("u1", session_a)
+    assert session_a.agent.messages == stored["messages"]
+
+
+def test_deleted_state_starts_new_conversation(store):
+    chatbot = ChatbotAgent("chatbot", state_store=store)
+    session = make_session()
+    turn(session, "a")
+    chatbot._save_state("u1", session, 0)
+
+    store.delete("u1")
+    assert chatbot._load_state("u1", session) == 0
+    assert session.state_version is None
@@ -0,0 +1,230 @@
+"""Test bounded dispatch and admission control of agent executions"""
+
+import sys
+import os
+import asyncio
+
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.agents.base_agent import BaseAgent
+from src.core.strands_manager import PRIORITY_HIGH, PRIORITY_NORMAL, AdmissionError, StrandsManager
+
+
+class EchoAgent(BaseAgent):
+    async def process_message(self, message, context=None):
+        return message
+
+
+def make_manager(**kwargs) -> StrandsManager:
+    options = {"max_active": 2, "timeout": 5, "max_queue": 10, "max_queued_per_user": 3,
+               "queue_timeout": 5, "reserved_slots": 0}
+    options.update(kwargs)
+    manager = StrandsManager(**options)
+    manager.register_agent(EchoAgent("echo"))
+    return manager
+
+
+def test_runs_func_with_registered_agent():
+    manager = make_manager()
+
+    async def run():
+        return await manager.execute("u1", lambda agent: agent.process_message("hi"))
+
+    assert asyncio.run(run()) == "hi"
+    metrics = manager.get_metrics()
+    assert metrics["completed"] == 1
+    assert metrics["active"] == 0
+    assert metrics["users"] == 0
+
+
+def test_unknown_agent():
+    with pytest.raises(ValueError):
+        make_manager().get_agent("missing")
+
+
+def test_requests_of_a_user_run_in_order():
+    manager = make_manager(max_active=4)
+    order = []
+
+    async def turn(index):
+        order.append(("start", index))
+        await asyncio.sleep(0.01)
+        order.append(("end", index))
+
+    async def run():
+        await asyncio.gather(*(manager.execute("u1", lambda agent, i=i: turn(i)) for i in range(3)))
+
+    asyncio.run(run())
+    assert order == [("start", 0), ("end", 0), ("start", 1), ("end", 1), ("start", 2), ("end", 2)]
+
+
+def test_max_active_bounds_concurrency():
+    manager = make_manager(max_active=2)
+    running = {"now": 0, "peak": 0}
+
+    async def work(agent):
+        running["now"] += 1
+        running["peak"] = max(running["peak"], running["now"])
+        await asyncio.sleep(0.01)
+        running["now"] -= 1
+
+    async def run():
+        await asyncio.gather(*(manager.execute(f"u{i}", work) for i in range(6)))
+
+    asyncio.run(run())
+    assert running["peak"] == 2
+    assert manager.get_metrics()["completed"] == 6
+
+
+def test_user_limit_is_refused_with_429():
+    manager = make_manager(max_queued_per_user=1)
+
+    async def run():
+        blocker = asyncio.ensure_future(manager.execute("u1", lambda agent: asyncio.sleep(0.05)))
+        queued = asyncio.ensure_future(manager.execute("u1", lambda agent: asyncio.sleep(0)))
+        await asyncio.sleep(0)
+        with pytest.raises(AdmissionError) as refused:
+            await manager.execute("u1", lambda agent: asyncio.sleep(0))
+        await asyncio.gather(blocker, queued)
+        return refused.value
+
+    error = asyncio.run(run())
+    assert error.status_code == 429
+    assert manager.get_metrics()["rejected_user_limit"] == 1
+
+
+def test_full_queue_is_refused_with_503():
+    manager = make_manager(max_active=1, max_queue=1)
+
+    async def run():
+        running = asyncio.ensure_future(manager.execute("u1", lambda agent: asyncio.sleep(0.05)))
+        queued = asyncio.ensure_future(manager.execute("u2", lambda agent: asyncio.sleep(0)))
+        await asyncio.sleep(0.01)
+        assert manager.is_saturated()
+        with pytest.raises(AdmissionError) as refused:
+            await manager.execute("u3", lambda agent: asyncio.sleep(0))
+        await asyncio.gather(running, queued)
+        return refused.value
+
+    assert asyncio.run(run()).status_code == 503
+
+
+def test_queue_timeout_is_refused_with_503():
+    manager = make_manager(max_active=1, queue_timeout=0.02)
+
+    async def run():
+        running = asyncio.ensure_future(manager.execute("u1", lambda agent: asyncio.sleep(0.2)))
+        await asyncio.sleep(0)
+        with pytest.raises(AdmissionError) as refused:
+            await manager.execute("u2", lambda agent: asyncio.sleep(0))
+        await running
+        return refused.value
+
+    assert asyncio.run(run()).status_code == 503
+    assert manager.get_metrics()["rejected_queue_timeout"] == 1
+
+
+def test_deadline_cancels_execution():
+    manager = make_manager()
+
+    async def run():
+        await manager.execute("u1", lambda agent: asyncio.sleep(1), timeout=0.02)
+
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(run())
+    metrics = manager.get_metrics()
+    assert metrics["timed_out"] == 1
+    assert metrics["active"] == 0
+
+
+def test_cancel_running_request():
+    manager = make_manager()
+
+    async def run():
+        task = asyncio.ensure_future(manager.execute("u1", lambda agent: asyncio.sleep(1)))
+        await asyncio.sleep(0.01)
+        assert manager.cancel("u1") == 1
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(run())
+    assert manager.get_metrics()["cancelled"] == 1
+
+
+def test_priority_lane_is_served_first():
+    manager = make_manager(max_active=1)
+    order = []
+
+    async def work(label):
+        order.append(label)
+        await asyncio.sleep(0.01)
+
+    async def run():
+        running = asyncio.ensure_future(manager.execute("u0", lambda agent: work("running")))
+        await asyncio.sleep(0)
+        normal = asyncio.ensure_future(manager.execute("u1", lambda agent: work("normal")))
+        await asyncio.sleep(0)
+        high = asyncio.ensure_future(
+            manager.execute("u2", lambda agent: work("high"), priority=PRIORITY_HIGH)
+        )
+        await asyncio.gather(running, normal, high)
+
+    asyncio.run(run())
+    assert order == ["running", "high", "normal"]
+
+
+def test_stream_holds_slot_until_closed():
+    manager = make_manager(max_active=1)
+
+    async def events(agent):
+        yield 1
+        yield 2
+        yield 3
+
+    async def run():
+        stream = manager.stream("u1", events)
+        first = await stream.__anext__()
+        assert manager.get_metrics()["active"] == 1
+        await stream.aclose()
+        return first
+
+    assert asyncio.run(run()) == 1
+    metrics = manager.get_metrics()
+    assert metrics["active"] == 0
+    assert metrics["cancelled"] == 1
+    assert metrics["users"] == 0
+
+
+def test_stream_yields_every_event():
+    manager = make_manager()
+
+    async def events(agent):
+        for index in range(3):
+            yield index
+
+    async def run():
+        return [event async for event in manager.stream("u1", events, priority=PRIORITY_NORMAL)]
+
+    assert asyncio.run(run()) == [0, 1, 2]
+    assert manager.get_metrics()["completed"] == 1
+
+
+def test_priority_lane_is_bounded():
+    manager = make_manager(max_active=1, max_priority_queue=1)
+
+    async def run():
+        running = asyncio.ensure_future(manager.execute("u0", lambda agent: asyncio.sleep(0.05)))
+        waiting = asyncio.ensure_future(
+            manager.execute("u1", lambda agent: asyncio.sleep(0), priority=PRIORITY_HIGH)
+        )
+        await asyncio.sleep(0.01)
+        with pytest.raises(AdmissionError) as refused:
+            await manager.execute("u2", lambda agent: asyncio.sleep(0), priority=PRIORITY_HIGH)
+        await asyncio.gather(running, waiting)
+        return refused.value
+
+    assert asyncio.run(run()).status_code == 503
+    metrics = manager.get_metrics()
+    assert metrics["rejected_priority_full"] == 1
+    assert metrics["queued_priority"] == 0